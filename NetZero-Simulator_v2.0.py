@@ -1,11 +1,9 @@
 from flask import Flask, render_template, request, jsonify
-import plotly.graph_objects as go
-import plotly.utils
 import json
-import numpy as np
-from datetime import datetime
 import os
-import glob
+
+from engine import FIXED_DATA, calculate_scenario
+from scenario_store import ScenarioStore
 
 app = Flask(__name__)
 
@@ -13,41 +11,16 @@ app = Flask(__name__)
 VERSION = "2.0"
 APP_NAME = "한국 탄소중립 경로 시뮬레이터"
 
-# 기본 데이터
-FIXED_DATA = {
-    2018: 6.591, 2019: 6.361, 2020: 5.874, 2021: 6.131,
-    2022: 5.974, 2023: 5.995, 2024: 5.912, 2025: 5.841,
-    2026: 5.702, 2027: 5.533, 2028: 5.302, 2029: 5.008, 2030: 4.129
-}
-
-BASE_EMISSION = 6.591  # 2018년 기준 배출량
-
-def calculate_scenario(budget, target_year, r35, r40, r45):
-    """시나리오 계산 함수"""
-    targets = {
-        2030: FIXED_DATA[2030],
-        2035: BASE_EMISSION * (1 - r35 / 100),
-        2040: BASE_EMISSION * (1 - r40 / 100),
-        2045: BASE_EMISSION * (1 - r45 / 100),
-        target_year: 0
-    }
-    
-    scenario = []
-    for year in range(2030, target_year + 1):
-        if year <= 2035:
-            value = targets[2030] + (targets[2035] - targets[2030]) * ((year - 2030) / 5)
-        elif year <= 2040:
-            value = targets[2035] + (targets[2040] - targets[2035]) * ((year - 2035) / 5)
-        elif year <= 2045:
-            value = targets[2040] + (targets[2045] - targets[2040]) * ((year - 2040) / 5)
-        else:
-            value = targets[2045] * (1 - ((year - 2045) / (target_year - 2045)))
-        scenario.append({'year': year, 'value': value})
-    
-    return scenario
+# 저장된 시나리오 색인 (시작 시 기존 파일과 동기화)
+scenario_index = ScenarioStore('saved_scenarios', pattern='scenario_*.json')
+scenario_index.sync()
 
 def create_chart(fixed_data, scenario_data, saved_scenarios=None):
     """Plotly 차트 생성"""
+    # plotly는 불러오는 시간이 길어 차트를 처음 만들 때 import (워커 시작 시간 단축)
+    import plotly.graph_objects as go
+    import plotly.utils
+    
     fig = go.Figure()
     
     # 고정 데이터 (2018-2030)
@@ -137,58 +110,11 @@ def create_chart(fixed_data, scenario_data, saved_scenarios=None):
 
 def get_next_scenario_number():
     """다음 시나리오 번호를 가져오는 함수"""
-    saved_scenarios_dir = 'saved_scenarios'
-    if not os.path.exists(saved_scenarios_dir):
-        return 1
-    
-    # 기존 시나리오 파일들을 확인하여 다음 번호 결정
-    existing_files = glob.glob(os.path.join(saved_scenarios_dir, 'scenario_*.json'))
-    if not existing_files:
-        return 1
-    
-    # 파일명에서 번호 추출
-    numbers = []
-    for file in existing_files:
-        try:
-            with open(file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if 'scenario_number' in data:
-                    numbers.append(data['scenario_number'])
-        except:
-            continue
-    
-    return max(numbers) + 1 if numbers else 1
+    return scenario_index.next_scenario_number()
 
 def get_next_scenario_name():
     """다음 시나리오 이름을 가져오는 함수"""
-    saved_scenarios_dir = 'saved_scenarios'
-    if not os.path.exists(saved_scenarios_dir):
-        return "시나리오 1"
-    
-    # 기존 시나리오 파일들을 확인하여 다음 번호 결정
-    existing_files = glob.glob(os.path.join(saved_scenarios_dir, 'scenario_*.json'))
-    if not existing_files:
-        return "시나리오 1"
-    
-    # 기존 시나리오 이름들에서 번호 추출
-    existing_numbers = []
-    for file in existing_files:
-        try:
-            with open(file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                name = data.get('name', '')
-                if name.startswith('시나리오 '):
-                    try:
-                        number = int(name.split(' ')[1])
-                        existing_numbers.append(number)
-                    except:
-                        continue
-        except:
-            continue
-    
-    # 다음 번호 결정
-    next_number = max(existing_numbers) + 1 if existing_numbers else 1
-    return f"시나리오 {next_number}"
+    return f"시나리오 {scenario_index.next_name_number()}"
 
 @app.route('/')
 def index():
@@ -243,11 +169,6 @@ def save_scenario():
     scenario = data.get('scenario', [])
     scenario_name = data.get('name', '').strip()
     
-    # saved_scenarios 폴더가 없으면 생성
-    saved_scenarios_dir = 'saved_scenarios'
-    if not os.path.exists(saved_scenarios_dir):
-        os.makedirs(saved_scenarios_dir)
-    
     # 시나리오 이름이 없으면 기본값 설정
     if not scenario_name:
         scenario_name = get_next_scenario_name()
@@ -256,102 +177,68 @@ def save_scenario():
     scenario_number = get_next_scenario_number()
     
     # 저장할 데이터 구성
-    save_data = {
-        'name': scenario_name,
-        'scenario_number': scenario_number,
-        'created_at': datetime.now().isoformat(),
-        'version': VERSION,
-        'data': scenario,
-        'settings': {
-            'budget': data.get('budget', 87.4),
-            'target_year': data.get('target_year', 2050),
-            'r35': data.get('r35', 50),
-            'r40': data.get('r40', 70),
-            'r45': data.get('r45', 85)
-        }
+    settings = {
+        'budget': data.get('budget', 87.4),
+        'target_year': data.get('target_year', 2050),
+        'r35': data.get('r35', 50),
+        'r40': data.get('r40', 70),
+        'r45': data.get('r45', 85)
     }
-    
-    # 파일명 생성
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"scenario_{timestamp}.json"
-    filepath = os.path.join(saved_scenarios_dir, filename)
+    extra = {'scenario_number': scenario_number, 'version': VERSION, 'data': scenario}
     
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(save_data, f, ensure_ascii=False, indent=2)
+        # 설정은 내용 해시별로 한 번만 저장 (이름과 설정이 모두 같으면 기존 시나리오 반환)
+        filename, saved, created = scenario_index.save(scenario_name, settings, extra=extra, prefix='scenario_')
         
         return jsonify({
             'success': True, 
             'filename': filename,
             'name': scenario_name,
-            'scenario_number': scenario_number
+            'scenario_number': saved.get('scenario_number'),
+            'duplicate': not created
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/load_scenarios', methods=['GET'])
 def load_scenarios():
-    """저장된 시나리오 목록을 가져오는 함수"""
-    saved_scenarios_dir = 'saved_scenarios'
-    scenarios = []
-    
-    if not os.path.exists(saved_scenarios_dir):
-        return jsonify(scenarios)
-    
-    # 저장된 시나리오 파일들을 읽어오기
-    scenario_files = glob.glob(os.path.join(saved_scenarios_dir, 'scenario_*.json'))
-    
-    for file in scenario_files:
-        try:
-            with open(file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                scenarios.append({
-                    'filename': os.path.basename(file),
-                    'name': data.get('name', 'Unknown'),
-                    'created_at': data.get('created_at', ''),
-                    'scenario_number': data.get('scenario_number', 0),
-                    'version': data.get('version', 'Unknown')
-                })
-        except Exception as e:
-            print(f"Error loading scenario {file}: {e}")
-            continue
-    
-    # 생성일 기준으로 정렬 (최신순)
-    scenarios.sort(key=lambda x: x['created_at'], reverse=True)
-    
-    return jsonify(scenarios)
+    """저장된 시나리오 목록을 가져오는 함수 (offset/limit/q/order 쿼리 파라미터 지원)"""
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', type=int)
+    query = request.args.get('q', '').strip() or None
+    descending = request.args.get('order', 'desc') != 'asc'
+    
+    # 생성일 기준으로 정렬 (기본 최신순)
+    scenarios = scenario_index.list_scenarios(offset=offset, limit=limit, query=query, descending=descending)
+    for scenario in scenarios:
+        scenario['scenario_number'] = scenario['scenario_number'] or 0
+        scenario['version'] = scenario['version'] or 'Unknown'
+    
+    response = jsonify(scenarios)
+    response.headers['X-Total-Count'] = str(scenario_index.count(query))
+    return response
 
 @app.route('/load_scenario/<filename>', methods=['GET'])
 def load_scenario(filename):
     """특정 시나리오를 불러오는 함수"""
-    saved_scenarios_dir = 'saved_scenarios'
-    filepath = os.path.join(saved_scenarios_dir, filename)
-    
-    if not os.path.exists(filepath):
-        return jsonify({'success': False, 'error': 'File not found'}), 404
-    
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = scenario_index.load(filename)
         
         return jsonify({
             'success': True,
             'data': data
         })
+    except FileNotFoundError:
+        return jsonify({'success': False, 'error': 'File not found'}), 404
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/delete_scenario/<filename>', methods=['DELETE'])
 def delete_scenario(filename):
     """시나리오를 삭제하는 함수"""
-    saved_scenarios_dir = 'saved_scenarios'
-    filepath = os.path.join(saved_scenarios_dir, filename)
-    
-    if not os.path.exists(filepath):
-        return jsonify({'success': False, 'error': 'File not found'}), 404
-    
     try:
-        os.remove(filepath)
+        if not scenario_index.delete(filename):
+            return jsonify({'success': False, 'error': 'File not found'}), 404
         return jsonify({'success': True})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
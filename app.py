@@ -2,53 +2,151 @@ import os
 # 항상 app.py가 있는 폴더에서 실행되도록 현재 작업 디렉토리 변경
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
-from flask import Flask, render_template, request, jsonify, send_from_directory, session, redirect, url_for
+from flask import Flask, Response, render_template, request, jsonify, send_file, send_from_directory, session, redirect, url_for
+import hashlib
 import json
-from datetime import datetime, date
+from datetime import date, timedelta
 import math
 
+import cache
+import compression
+import cube
+import engine
+import event_log
+import inventory
+import jobs
+import live
+import metrics
+import montecarlo
+import pareto
+import scenario_archive
+import scenario_store
+import sectors
+import sensitivity
+import solver
+import sweep
+
 app = Flask(__name__, static_folder='static')
 app.secret_key = 'your-secret-key-change-this-in-production'  # 세션을 위한 시크릿 키
 
 # 통계 파일 경로
 STATS_FILE = 'stats.json'
 
-def load_stats():
-    """통계 데이터 로드"""
-    if os.path.exists(STATS_FILE):
-        try:
-            with open(STATS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            return {}
-    return {}
-
-def save_stats(stats):
-    """통계 데이터 저장"""
-    with open(STATS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(stats, f, ensure_ascii=False, indent=2)
+# 방문/계산 이벤트 로그 (STATS_FLUSH_INTERVAL초마다 events/에 추가, STATS_COMPACT_INTERVAL초마다 집계)
+# 기존 stats.json의 일별 방문자 수는 처음 한 번 집계로 옮긴다.
+usage_log = event_log.EventLog(
+    'events',
+    flush_interval=float(os.environ.get('STATS_FLUSH_INTERVAL', event_log.FLUSH_INTERVAL)),
+    compact_interval=float(os.environ.get('STATS_COMPACT_INTERVAL', event_log.COMPACT_INTERVAL)),
+    legacy_stats=STATS_FILE
+)
+
+# 관리자 페이지의 일별 방문자 표에 표시할 기간 (일)
+ADMIN_DAYS = 90
+
+# /calculate 결과 캐시 (CALC_CACHE_DIR 지정 시 워커 간 디스크 공유, 예: /dev/shm/netzero-cache)
+result_cache = cache.ResultCache(
+    maxsize=int(os.environ.get('CALC_CACHE_SIZE', 1024)),
+    directory=os.environ.get('CALC_CACHE_DIR') or None
+)
+
+# 요청 계측 (METRICS_DIR 지정 시 워커별 스냅샷을 합산하여 /metrics에 출력)
+request_metrics = metrics.Metrics(directory=os.environ.get('METRICS_DIR') or None)
+request_metrics.init_app(app)
+request_metrics.add_collector('cache_hits_total', '/calculate 결과 캐시 적중 수', lambda: result_cache.hits)
+request_metrics.add_collector('cache_misses_total', '/calculate 결과 캐시 실패 수', lambda: result_cache.misses)
+request_metrics.add_collector('cache_evictions_total', '/calculate 결과 캐시 제거 수', lambda: result_cache.evictions)
+
+# 응답 압축 (정적 파일은 시작 시 gzip/brotli 압축본과 해시 URL 생성, JSON/HTML은 COMPRESS_MIN_SIZE 이상이면 압축)
+response_compression = compression.Compression(
+    min_size=int(os.environ.get('COMPRESS_MIN_SIZE', compression.MIN_SIZE))
+)
+response_compression.init_app(app)
+
+# 저장된 시나리오 색인 (시작 시 기존 JSON 파일과 동기화)
+scenario_index = scenario_store.ScenarioStore('saved_scenarios')
+scenario_index.sync()
+scenario_index.prune_objects()
+
+# 지역/가스별 배출량 인벤토리 (INVENTORY_DIR의 CSV/JSON을 data/에 캐시, 파일이 바뀌면 다시 만듦)
+inventories = inventory.Inventories(os.environ.get('INVENTORY_DIR', inventory.INVENTORY_DIR))
+
+# 사전 계산 결과 큐브 (python cube.py로 생성, 없으면 실시간 계산)
+result_cube = cube.ResultCube(os.environ.get('RESULT_CUBE_FILE', cube.CUBE_FILE))
+
+# 백그라운드 작업 큐 (JOB_WORKERS개 프로세스, 상태와 결과는 jobs/ 폴더에 JOB_TTL초 동안 보관)
+job_queue = jobs.JobQueue('jobs', workers=int(os.environ.get('JOB_WORKERS', jobs.WORKERS)),
+                          ttl=float(os.environ.get('JOB_TTL', jobs.TTL)))
+
+# 몬테카를로 청크 병렬 계산 풀 (워커 프로세스마다 MONTE_CARLO_WORKERS개 프로세스, 모든 요청이 공유)
+simulation_pool = montecarlo.SimulationPool(int(os.environ.get('MONTE_CARLO_WORKERS', montecarlo.WORKERS)))
+
+# 슬라이더 실시간 계산 채널 (SSE, LIVE_DIR 지정 시 최신 파라미터를 워커 간 파일로 공유)
+live_channels = live.LiveChannels(max_channels=int(os.environ.get('LIVE_MAX_CHANNELS', live.MAX_CHANNELS)),
+                                  directory=os.environ.get('LIVE_DIR') or None)
+request_metrics.add_collector('live_dropped_total', '실시간 채널에서 새 값이 도착하여 버린 계산 수',
+                              lambda: live_channels.dropped)
+
+# 간결한 /calculate 응답 형식의 MIME 타입
+COMPACT_MIMETYPE = 'application/vnd.netzero.compact+json'
+
+# 차트 trace 스타일 (과거 배출량, 탄소예산 경로)
+CHART_TRACE_STYLES = [
+    {
+        'type': 'scatter',
+        'mode': 'lines+markers',
+        'name': '과거 배출량 및 2030 NDC',
+        'line': {'color': '#2E86AB', 'width': 3},
+        'marker': {'size': 6}
+    },
+    {
+        'type': 'scatter',
+        'mode': 'lines+markers',
+        'name': '탄소예산 경로',
+        'line': {'color': '#A23B72', 'width': 3},
+        'marker': {'color': '#A23B72'}
+    }
+]
+
+# 차트 레이아웃 (요청과 무관한 고정값)
+CHART_LAYOUT = {
+    'xaxis': {'title': '연도'},
+    'yaxis': {'title': '배출량 (억tCO₂)'},
+    'hovermode': 'closest',
+    'showlegend': True,
+    'legend': {
+        'x': 0.95,
+        'y': 0.95,
+        'xanchor': 'right',
+        'yanchor': 'top',
+        'bgcolor': 'rgba(255,255,255,0.8)',
+        'bordercolor': 'rgba(0,0,0,0.2)',
+        'borderwidth': 1
+    },
+    'plot_bgcolor': 'rgba(0,0,0,0)',
+    'paper_bgcolor': 'rgba(0,0,0,0)',
+    'margin': {'l': 60, 'r': 40, 't': 40, 'b': 60}
+}
 
 def increment_visit_count():
-    """오늘 방문자 수 증가"""
-    stats = load_stats()
-    today = date.today().isoformat()
-    
-    # 디버깅을 위한 로그 추가
-    print(f"DEBUG: Today's date: {today}")
-    print(f"DEBUG: Current stats: {stats}")
-    
-    if today not in stats:
-        stats[today] = {'visits': 0}
-    
-    stats[today]['visits'] += 1
-    print(f"DEBUG: Updated stats: {stats}")
-    save_stats(stats)
+    """오늘 방문자 수 증가 (메모리에 누적, 주기적으로 이벤트 로그에 저장)"""
+    usage_log.record('visit')
+
+def parse_day(value, default):
+    """쿼리 파라미터의 날짜 (YYYY-MM-DD, 없으면 default)"""
+    return date.fromisoformat(value) if value else default
 
 @app.route('/')
 def index():
     """메인 페이지 - 방문자 수 증가"""
     increment_visit_count()
-    return render_template('index.html', app_name='한국 탄소중립 경로 시뮬레이터', version='2.0')
+    response = app.make_response(
+        render_template('index.html', app_name='한국 탄소중립 경로 시뮬레이터', version='2.0')
+    )
+    # 정적 파일 URL에 해시가 들어가므로 페이지는 매번 재검증 (바뀌지 않았으면 304)
+    response.add_etag()
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 @app.route('/admin')
 def admin():
@@ -56,15 +154,53 @@ def admin():
     if 'admin_logged_in' not in session:
         return render_template('admin_login.html')
     
-    stats = load_stats()
-    today = date.today().isoformat()
+    # 아직 집계하지 않은 이벤트까지 반영
+    usage_log.compact()
+    today = date.today()
+    first_day = usage_log.first_day() or today
+    totals = usage_log.totals(first_day, today)
+    
+    # 최근 ADMIN_DAYS일의 일별 방문자 수 (방문이 있는 날만, 최신순)
+    recent = usage_log.series('day', max(first_day, today - timedelta(days=ADMIN_DAYS - 1)), today)
+    stats = {item['start']: {'visits': item['visit'], 'calculations': item['calculate']}
+             for item in reversed(recent) if item['visit'] or item['calculate']}
+    max_visits = max((data['visits'] for data in stats.values()), default=0)
     
-    # 최대 방문자 수 계산 (비율 표시용)
-    max_visits = 0
-    if stats:
-        max_visits = max(data['visits'] for data in stats.values())
+    summary = {
+        'total_visits': totals['visit'],
+        'today_visits': usage_log.totals(today, today)['visit'],
+        'avg_visits': totals['visit'] / ((today - first_day).days + 1),
+        'total_calculations': totals['calculate']
+    }
+    top_combos = usage_log.top_combos(today - timedelta(days=ADMIN_DAYS - 1), today)
     
-    return render_template('admin_stats.html', stats=stats, today=today, max_visits=max_visits)
+    return render_template('admin_stats.html', stats=stats, today=today.isoformat(), max_visits=max_visits,
+                           summary=summary, top_combos=top_combos, admin_days=ADMIN_DAYS)
+
+@app.route('/admin/stats')
+def admin_stats():
+    """이용 통계 조회 (start/end 날짜 구간, period=day|week|month 추이, top개 인기 파라미터 조합)"""
+    if 'admin_logged_in' not in session:
+        return jsonify({'error': '관리자 로그인이 필요합니다.'}), 401
+    try:
+        usage_log.compact()
+        today = date.today()
+        end = parse_day(request.args.get('end'), today)
+        start = parse_day(request.args.get('start'), usage_log.first_day() or end)
+        if start > end:
+            raise ValueError('start가 end보다 늦습니다.')
+        period = request.args.get('period', 'day')
+        top = min(max(request.args.get('top', 10, type=int), 0), 100)
+        return jsonify({
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'totals': usage_log.totals(start, end),
+            'period': period,
+            'series': usage_log.series(period, start, end),
+            'top_combos': usage_log.top_combos(start, end, top)
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
 
 @app.route('/admin/login', methods=['POST'])
 def admin_login():
@@ -87,58 +223,32 @@ def admin_logout():
 def calculate():
     """시나리오 계산"""
     try:
-        data = request.get_json()
-        
-        budget = float(data['budget'])
-        target_year = int(data['target_year'])
-        r35 = float(data['r35'])
-        r40 = float(data['r40'])
-        r45 = float(data['r45'])
-        
-        # 고정 데이터 (2018-2030)
-        fixed_data = {
-            2018: 6.591, 2019: 6.361, 2020: 5.874, 2021: 6.131,
-            2022: 5.974, 2023: 5.995, 2024: 5.912, 2025: 5.841,
-            2026: 5.702, 2027: 5.533, 2028: 5.302, 2029: 5.008, 2030: 4.129
-        }
-        
-        base_emission = 6.591  # 2018년 기준 배출량
+        params = calculation_params(request.get_json())
+        budget, target_year, r35, r40, r45, milestones, shapes, region_inventory = params
         
-        # 목표값 설정
-        targets = {
-            2030: fixed_data[2030],
-            2035: base_emission * (1 - r35 / 100),
-            2040: base_emission * (1 - r40 / 100),
-            2045: base_emission * (1 - r45 / 100),
-            target_year: 0
-        }
+        # 같은 파라미터의 계산 결과가 캐시에 있으면 그대로 반환
+        cache_key = cache.make_key(*params)
+        usage_log.record('calculate', usage_combo(*params))
+        if wants_compact_response():
+            return calculate_compact(*params, cache_key)
+        cached_body = result_cache.get(cache_key)
+        request_metrics.mark('cache')
+        if cached_body is not None:
+            return app.response_class(cached_body, mimetype='application/json')
         
         # 시나리오 계산 (2030년부터)
+        key_years = [*(sorted(milestones) if milestones is not None else engine.MILESTONE_YEARS), target_year]
         scenario_data = []
-        for year in range(2030, target_year + 1):
-            if year <= 2035:
-                # 2030-2035: 선형 보간
-                value = targets[2030] + (targets[2035] - targets[2030]) * ((year - 2030) / 5)
-            elif year <= 2040:
-                # 2035-2040: 선형 보간
-                value = targets[2035] + (targets[2040] - targets[2035]) * ((year - 2035) / 5)
-            elif year <= 2045:
-                # 2040-2045: 선형 보간
-                value = targets[2040] + (targets[2045] - targets[2040]) * ((year - 2040) / 5)
-            else:
-                # 2045-목표연도: 선형 감소
-                value = targets[2045] * (1 - ((year - 2045) / (target_year - 2045)))
-            
+        for item in engine.calculate_scenario(*params):
             # 사용자가 조절하는 해의 점 크기 결정
-            key_years = [2035, 2040, 2045, target_year]
-            marker_size = 9 if year in key_years else 6  # 1.5배 크기
-            
-            scenario_data.append({'year': year, 'value': value, 'marker_size': marker_size})
+            item['marker_size'] = 9 if item['year'] in key_years else 6  # 1.5배 크기
+            scenario_data.append(item)
         
         # 전체 데이터 생성 (2018-목표연도)
         all_data = []
         
         # 고정 데이터 추가 (2018-2030)
+        fixed_data = engine.FIXED_DATA if region_inventory is None else region_inventory.fixed_data
         for year in range(2018, 2030):
             all_data.append({'year': year, 'value': fixed_data[year]})
         
@@ -149,6 +259,7 @@ def calculate():
         emissions_from_2020 = [d['value'] for d in all_data if d['year'] >= 2020]
         total_emission = sum(emissions_from_2020)
         over_emission = max(0, total_emission - budget)
+        request_metrics.mark('compute')
         
         # 차트 데이터 생성
         chart_data = {
@@ -156,64 +267,528 @@ def calculate():
                 {
                     'x': [d['year'] for d in all_data if d['year'] <= 2030],
                     'y': [d['value'] for d in all_data if d['year'] <= 2030],
-                    'type': 'scatter',
-                    'mode': 'lines+markers',
-                    'name': '과거 배출량 및 2030 NDC',
-                    'line': {'color': '#2E86AB', 'width': 3},
-                    'marker': {'size': 6}
+                    **CHART_TRACE_STYLES[0]
                 },
                 {
                     'x': [d['year'] for d in all_data if d['year'] >= 2030],
                     'y': [d['value'] for d in all_data if d['year'] >= 2030],
-                    'type': 'scatter',
-                    'mode': 'lines+markers',
-                    'name': '탄소예산 경로',
-                    'line': {'color': '#A23B72', 'width': 3},
+                    **CHART_TRACE_STYLES[1],
                     'marker': {
                         'size': [d.get('marker_size', 6) for d in all_data if d['year'] >= 2030],
-                        'color': '#A23B72'
+                        **CHART_TRACE_STYLES[1]['marker']
                     }
                 }
             ],
-            'layout': {
-                'xaxis': {'title': '연도'},
-                'yaxis': {'title': '배출량 (억tCO₂)'},
-                'hovermode': 'closest',
-                'showlegend': True,
-                'legend': {
-                    'x': 0.95,
-                    'y': 0.95,
-                    'xanchor': 'right',
-                    'yanchor': 'top',
-                    'bgcolor': 'rgba(255,255,255,0.8)',
-                    'bordercolor': 'rgba(0,0,0,0.2)',
-                    'borderwidth': 1
-                },
-                'plot_bgcolor': 'rgba(0,0,0,0)',
-                'paper_bgcolor': 'rgba(0,0,0,0)',
-                'margin': {'l': 60, 'r': 40, 't': 40, 'b': 60}
-            }
+            'layout': CHART_LAYOUT
         }
         
         result = {
-            'scenario': {
-                'budget': budget,
-                'target_year': target_year,
-                'r35': r35,
-                'r40': r40,
-                'r45': r45
-            },
+            'scenario': scenario_settings(*params),
             'total_emission': round(total_emission, 3),
             'over_emission': round(over_emission, 3),
             'chart': json.dumps(chart_data),
             'all_data': all_data
         }
+        request_metrics.mark('chart')
         
-        return jsonify(result)
+        response = jsonify(result)
+        request_metrics.mark('serialize')
+        result_cache.set(cache_key, response.get_data())
+        return response
         
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+def calculation_params(data):
+    """/calculate 요청의 시나리오 파라미터와 인벤토리"""
+    return (*scenario_params(data), request_inventory(data))
+
+def scenario_params(data):
+    """시나리오 설정의 파라미터 (기준연도(milestones)를 지정하면 r35/r40/r45는 생략 가능)"""
+    budget = float(data['budget'])
+    target_year = int(data['target_year'])
+    milestones, shapes = pathway_options(data)
+    r35, r40, r45 = (float(data[key]) if milestones is None else data.get(key) for key in ('r35', 'r40', 'r45'))
+    return budget, target_year, r35, r40, r45, milestones, shapes
+
+def request_inventory(data):
+    """요청의 지역/가스(region, gas) 인벤토리 (engine.py의 기본 인벤토리면 None)
+
+    지정하지 않으면 기본 지역/가스이며, 인벤토리 파일에 KR/GHG가 있으면 그 값을 사용한다.
+    기본 지역/가스는 인벤토리 캐시를 읽거나 만들지 못해도 engine.py의 고정 데이터로 계산한다.
+    """
+    region, gas = data.get('region'), data.get('gas')
+    try:
+        found = inventories.get(region, gas)
+    except (OSError, ValueError):
+        if (region or inventory.DEFAULT_REGION, gas or inventory.DEFAULT_GAS) != (
+                inventory.DEFAULT_REGION, inventory.DEFAULT_GAS):
+            raise
+        return None
+    return None if found is inventory.DEFAULT else found
+
+def pathway_options(data):
+    """요청의 기준연도 설정({연도: 감축률})과 구간 형태 (지정하지 않으면 None)"""
+    milestones = data.get('milestones')
+    if milestones is not None:
+        milestones = {int(year): rate for year, rate in milestones.items()}
+    return milestones, data.get('shapes')
+
+def scenario_settings(budget, target_year, r35, r40, r45, milestones=None, shapes=None, region_inventory=None):
+    """응답에 포함할 시나리오 설정 (기준연도/구간 형태/지역·가스는 지정한 경우에만)"""
+    settings = {
+        'budget': budget,
+        'target_year': target_year,
+        'r35': r35,
+        'r40': r40,
+        'r45': r45
+    }
+    if milestones is not None:
+        settings['milestones'] = {str(year): rate for year, rate in sorted(milestones.items())}
+    if shapes is not None:
+        settings['shapes'] = shapes
+    if region_inventory is not None:
+        settings['region'] = region_inventory.region
+        settings['gas'] = region_inventory.gas
+    return settings
+
+def usage_combo(budget, target_year, r35, r40, r45, milestones=None, shapes=None, region_inventory=None):
+    """이용 통계에 기록할 파라미터 조합 (시나리오 설정의 간결한 JSON)"""
+    return json.dumps(scenario_settings(budget, target_year, r35, r40, r45, milestones, shapes, region_inventory),
+                      ensure_ascii=False, separators=(',', ':'))
+
+def wants_compact_response():
+    """간결한 응답 형식 요청 여부 (?format=compact 또는 Accept 헤더)"""
+    if request.args.get('format') == 'compact':
+        return True
+    return any(mimetype == COMPACT_MIMETYPE for mimetype, _ in request.accept_mimetypes)
+
+def calculate_compact(budget, target_year, r35, r40, r45, milestones, shapes, region_inventory, cache_key):
+    """간결한 형식의 계산 결과
+
+    연도는 시작 연도와 길이로, 배출량은 precision 자리로 반올림한 배열로 보내고
+    고정 차트 레이아웃은 생략한다 (/chart_layout). 같은 결과를 다시 요청하면 ETag로 304 응답.
+    ETag는 응답 본문의 해시이므로 엔진이나 데이터가 바뀌면 같은 파라미터라도 달라진다.
+    """
+    precision = min(max(request.args.get('precision', 3, type=int), 0), 10)
+    key = cache_key + ('compact', precision)
+
+    body = result_cache.get(key)
+    request_metrics.mark('cache')
+    if body is None:
+        payload = compact_payload(budget, target_year, r35, r40, r45, milestones, shapes, region_inventory,
+                                  precision)
+        request_metrics.mark('compute')
+        body = jsonify(payload).get_data()
+        request_metrics.mark('serialize')
+        result_cache.set(key, body)
+
+    etag = hashlib.sha1(body).hexdigest()
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.vary.add('Accept')
+    return response
+
+def compact_payload(budget, target_year, r35, r40, r45, milestones, shapes, region_inventory=None, precision=3):
+    """간결한 형식의 계산 결과 dict (/calculate?format=compact, 실시간 채널 공용)"""
+    result = engine.calculate_batch(budget, target_year, r35, r40, r45, milestones, shapes, region_inventory)
+    length = engine.pathway_length(target_year)
+    return {
+        'scenario': scenario_settings(budget, target_year, r35, r40, r45, milestones, shapes, region_inventory),
+        'total_emission': round(float(result['total_emission'][0]), 3),
+        'over_emission': round(float(result['over_emission'][0]), 3),
+        'start_year': engine.START_YEAR,
+        'length': length,
+        'values': round_list(result['pathways'][0][:length], precision),
+        'split_year': engine.SCENARIO_START_YEAR,
+        'key_years': [*(sorted(milestones) if milestones is not None else engine.MILESTONE_YEARS), target_year]
+    }
+
+@app.route('/live/stream')
+def live_stream():
+    """실시간 계산 채널 열기 (SSE). 'ready' 이벤트의 channel로 POST /live/<channel>에 파라미터를 보내면
+    가장 최근 파라미터의 간결한 형식 결과를 'result' 이벤트로 받음 (이전 결과 대비 diff 또는 전체 values)"""
+    try:
+        channel = live_channels.open()
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 503
+    response = Response(live_channels.stream(channel, live_result), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/live/<channel_id>', methods=['POST'])
+def live_update(channel_id):
+    """실시간 채널에 슬라이더 값 전달 (계산하지 않고 최신 값만 교체, 다른 워커의 채널이면 seq는 null)"""
+    data = request.get_json()
+    try:
+        calculation_params(data)  # 채널에서 계산하기 전에 잘못된 값을 바로 알림
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        seq = live_channels.update(channel_id, data)
+    except KeyError:
+        return jsonify({'error': '채널을 찾을 수 없습니다.'}), 404
+    return jsonify({'seq': seq}), 202
+
+@app.route('/live/<channel_id>', methods=['DELETE'])
+def live_close(channel_id):
+    """실시간 채널 닫기 (SSE 스트림을 끝내고 점유한 스레드를 돌려줌)"""
+    live_channels.close(channel_id)
+    return '', 204
+
+def live_result(data):
+    """실시간 채널의 계산 결과 (data: /calculate와 같은 요청 파라미터)"""
+    params = calculation_params(data)
+    usage_log.record('calculate', usage_combo(*params))
+    return compact_payload(*params)
+
+@app.route('/chart_layout')
+def chart_layout():
+    """고정 차트 레이아웃 및 trace 스타일 (간결한 응답 형식과 함께 사용, 장기 캐시)"""
+    response = jsonify({'layout': CHART_LAYOUT, 'traces': CHART_TRACE_STYLES})
+    response.cache_control.public = True
+    response.cache_control.max_age = 86400
+    response.add_etag()
+    return response.make_conditional(request)
+
+def round_list(values, ndigits=3):
+    """배열을 /calculate와 같은 방식(round)으로 반올림한 리스트로 변환"""
+    return [round(v, ndigits) for v in values.tolist()]
+
+@app.route('/calculate_batch', methods=['POST'])
+def calculate_batch():
+    """여러 시나리오 일괄 계산 (파라미터 배열 → 열 단위 결과)"""
+    try:
+        data = request.get_json()
+        milestones, shapes = pathway_options(data)
+        region_inventory = request_inventory(data)
+        params = (data['budget'], data['target_year'],
+                  *(data[key] if milestones is None else data.get(key) for key in ('r35', 'r40', 'r45')))
+
+        # 국가 기본 경로에서 연도별 경로가 필요 없으면 사전 계산 큐브에서 누적 배출량만 조회
+        if (data.get('include_pathways') or milestones is not None or shapes is not None
+                or region_inventory is not None):
+            result = engine.calculate_batch(*params, milestones=milestones, shapes=shapes,
+                                            inventory=region_inventory)
+        else:
+            result = result_cube.total_emission(*params)
+
+        response = {
+            'count': len(result['total_emission']),
+            'target_year': result['target_year'].tolist(),
+            'total_emission': round_list(result['total_emission']),
+            'over_emission': round_list(result['over_emission'])
+        }
+
+        # 연도별 경로는 요청한 경우에만 포함 (목표연도 이후는 0)
+        if data.get('include_pathways'):
+            response['years'] = result['years'].tolist()
+            response['pathways'] = [round_list(row) for row in result['pathways']]
+
+        return jsonify(response)
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/inventories')
+def list_inventories():
+    """사용 가능한 지역/가스 인벤토리 목록 (/calculate, /calculate_batch의 region, gas)과 읽지 못한 파일"""
+    try:
+        return jsonify({
+            'default': {'region': inventory.DEFAULT_REGION, 'gas': inventory.DEFAULT_GAS},
+            'inventories': [item.describe() for item in inventories.list()],
+            'errors': inventories.errors
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/calculate_sectors', methods=['POST'])
+def calculate_sectors():
+    """부문별 배출 경로 계산 (부문별 기준연도/구간 형태/목표연도/예산, 국가 합계)"""
+    try:
+        data = request.get_json()
+        
+        # 부문 비율은 국가 인벤토리 기준이므로 region/gas와 관계없이 KR/GHG 인벤토리를 사용
+        result = sectors.calculate(data['budget'], data['target_year'], data.get('sectors'),
+                                   inventory=request_inventory({}))
+        national = result['national']
+        
+        return jsonify({
+            'count': len(national['total_emission']),
+            'years': result['years'].tolist(),
+            'national': {
+                'target_year': national['target_year'].tolist(),
+                'values': [round_list(row) for row in national['pathway']],
+                'total_emission': round_list(national['total_emission']),
+                'over_emission': round_list(national['over_emission'])
+            },
+            'sectors': {
+                key: {
+                    'name': sectors.SECTORS[key]['name'],
+                    'target_year': result['target_year'][i].tolist(),
+                    'values': [round_list(row) for row in result['pathways'][i]],
+                    'total_emission': round_list(result['total_emission'][i]),
+                    'budget': round_list(result['budget'][i]),
+                    'over_emission': round_list(result['over_emission'][i])
+                }
+                for i, key in enumerate(result['sectors'])
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/solve', methods=['POST'])
+def solve():
+    """탄소예산 역산 (예산을 맞추는 감축률 또는 목표연도 계산)"""
+    try:
+        data = request.get_json()
+        solve_for = data.get('solve_for', 'r35')
+
+        # 역산 대상 파라미터는 생략 가능
+        params = {key: data.get(key, 0) if key == solve_for else data[key]
+                  for key in ('target_year', 'r35', 'r40', 'r45')}
+
+        result = solver.solve(data['budget'], solve_for=solve_for, inventory=request_inventory(data), **params)
+
+        return jsonify({
+            'solve_for': solve_for,
+            'count': len(result['value']),
+            'value': result['value'].tolist(),
+            'feasible': result['feasible'].tolist(),
+            'total_emission': round_list(result['total_emission']),
+            'over_emission': round_list(result['over_emission'])
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/sensitivity', methods=['POST'])
+def sensitivity_analysis():
+    """누적/초과 배출량의 파라미터별 민감도 (토네이도 차트용, 스칼라 대신 배열을 전달하면 일괄 계산)"""
+    try:
+        data = request.get_json()
+        result = sensitivity.sensitivity(
+            data['budget'], data['target_year'], data['r35'], data['r40'], data['r45'],
+            rate_delta=data.get('rate_delta', sensitivity.RATE_DELTA),
+            year_delta=data.get('year_delta', sensitivity.YEAR_DELTA),
+            inventory=request_inventory(data)
+        )
+
+        parameters = {}
+        for key, item in result['parameters'].items():
+            parameters[key] = {
+                'derivative': {name: round_list(values, 6) for name, values in item['derivative'].items()},
+                'low': item['low'].tolist(),
+                'high': item['high'].tolist(),
+                'total_emission': {end: round_list(values) for end, values in item['total_emission'].items()},
+                'over_emission': {end: round_list(values) for end, values in item['over_emission'].items()}
+            }
+        return jsonify({
+            'count': len(result['total_emission']),
+            'total_emission': round_list(result['total_emission']),
+            'over_emission': round_list(result['over_emission']),
+            'parameters': parameters,
+            'order': result['order']
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/pareto', methods=['POST'])
+def pareto_front():
+    """탄소예산 초과량 vs 최대 연간 감축률 파레토 최적 경로 (early_effort=true면 2035년 감축률도 목적에 포함)"""
+    try:
+        data = request.get_json()
+        result = pareto.pareto_front(
+            data['budget'],
+            step=data.get('step', pareto.STEP),
+            year_min=data.get('target_year_min', solver.TARGET_YEAR_MIN),
+            year_max=data.get('target_year_max', solver.TARGET_YEAR_MAX),
+            early_effort=bool(data.get('early_effort', False)),
+            inventory=request_inventory(data)
+        )
+        return jsonify({
+            'candidates': result['candidates'],
+            'count': len(result['target_year']),
+            'target_year': result['target_year'].tolist(),
+            'r35': result['r35'].tolist(),
+            'r40': result['r40'].tolist(),
+            'r45': result['r45'].tolist(),
+            'total_emission': round_list(result['total_emission']),
+            'over_emission': round_list(result['over_emission']),
+            'max_reduction': round_list(result['max_reduction'])
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/compare', methods=['POST'])
+def compare():
+    """여러 시나리오 비교 (저장된 시나리오 파일명 및/또는 직접 입력한 설정을 한 번에 계산)"""
+    try:
+        data = request.get_json()
+        
+        entries = []
+        for filename in data.get('filenames', []):
+            saved = scenario_index.load(filename)
+            entries.append({'filename': filename, 'name': saved['name'], 'settings': saved['settings']})
+        for i, settings in enumerate(data.get('scenarios', [])):
+            entries.append({'filename': None, 'name': settings.get('name', f'시나리오 {i + 1}'), 'settings': settings})
+        if not entries:
+            raise ValueError('비교할 시나리오가 없습니다.')
+        
+        # 기준연도와 구간 형태가 같은 시나리오끼리 묶어 한 번에 계산
+        region_inventory = request_inventory(data)
+        params = [scenario_params(entry['settings']) for entry in entries]
+        groups = {}
+        for i, (_, _, _, _, _, milestones, shapes) in enumerate(params):
+            key = (None if milestones is None else tuple(sorted(milestones)), json.dumps(shapes))
+            groups.setdefault(key, []).append(i)
+        total, over, pathways = [None] * len(entries), [None] * len(entries), [None] * len(entries)
+        for (milestone_years, _), members in groups.items():
+            budget, target_year, r35, r40, r45, _, shapes = zip(*(params[i] for i in members))
+            milestones = None if milestone_years is None else {
+                year: [params[i][5][year] for i in members] for year in milestone_years
+            }
+            result = engine.calculate_batch(budget, target_year, r35, r40, r45, milestones, shapes[0],
+                                            inventory=region_inventory)
+            for row, i in enumerate(members):
+                total[i] = float(result['total_emission'][row])
+                over[i] = float(result['over_emission'][row])
+                pathways[i] = result['pathways'][row][:engine.pathway_length(params[i][1])]
+        
+        # 기준 시나리오 대비 차이 (기본: 첫 번째 시나리오)
+        reference = int(data.get('reference', 0))
+        
+        scenarios = []
+        for i, entry in enumerate(entries):
+            budget, target_year, r35, r40, r45, milestones, shapes = params[i]
+            scenarios.append({
+                'filename': entry['filename'],
+                'name': entry['name'],
+                'settings': scenario_settings(budget, target_year, r35, r40, r45, milestones, shapes),
+                'values': round_list(pathways[i]),
+                'key_years': [*(sorted(milestones) if milestones is not None else engine.MILESTONE_YEARS),
+                              target_year],
+                'total_emission': round(total[i], 3),
+                'over_emission': round(over[i], 3),
+                'delta_total_emission': round(total[i] - total[reference], 3),
+                'delta_over_emission': round(over[i] - over[reference], 3)
+            })
+        
+        return jsonify({
+            'success': True,
+            'start_year': engine.START_YEAR,
+            'reference': reference,
+            'scenarios': scenarios
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@app.route('/monte_carlo', methods=['POST'])
+def monte_carlo():
+    """몬테카를로 불확실성 분석 (연도별 분위수 밴드와 탄소예산 이내 확률)"""
+    try:
+        data = request.get_json()
+        
+        # 파라미터는 숫자(고정값) 또는 분포 설정 dict, 병렬 프로세스 수는 서버 설정(요청의 workers는 무시)
+        specs = {key: data[key] for key in montecarlo.PARAMS if key in data}
+        result = montecarlo.run(
+            specs,
+            samples=data.get('samples', 100_000),
+            seed=data.get('seed'),
+            percentiles=data.get('percentiles', montecarlo.DEFAULT_PERCENTILES),
+            inventory=request_inventory(data),
+            pool=simulation_pool
+        )
+        
+        return jsonify(montecarlo.summarize(result))
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/export_sweep', methods=['POST'])
+def export_sweep():
+    """파라미터 격자 스윕 결과를 CSV/NDJSON으로 스트리밍 (gzip 선택)"""
+    try:
+        data = request.get_json()
+        
+        # 각 파라미터는 숫자, 숫자 목록 또는 {'start', 'stop', 'step'} 범위
+        grid = sweep.Grid(data, request_inventory(data))
+        fmt = data.get('format', 'csv')
+        chunks = sweep.stream(grid, fmt, data.get('precision', 3))
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+    
+    filename = f'sweep.{fmt}'
+    mimetype = sweep.FORMATS[fmt]
+    if data.get('gzip'):
+        chunks = sweep.gzip_stream(chunks)
+        filename += '.gz'
+        mimetype = 'application/gzip'
+    
+    return Response(chunks, mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename={filename}',
+        'X-Total-Count': str(grid.size)
+    })
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """백그라운드 작업 제출 (kind: monte_carlo 또는 export_sweep, params: 해당 엔드포인트의 요청 본문)"""
+    try:
+        data = request.get_json()
+        params = data.get('params', {})
+        status = job_queue.submit(data['kind'], params, request_inventory(params))
+        return jsonify(status), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """작업 상태와 진행률"""
+    status = job_queue.status(job_id)
+    if status is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+    return jsonify(status)
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    """완료된 작업의 결과 (몬테카를로는 JSON, 스윕은 CSV/NDJSON 파일)"""
+    status = job_queue.status(job_id)
+    if status is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+    path = job_queue.result_path(job_id)
+    if path is None:
+        return jsonify({'error': '작업이 완료되지 않았습니다.', 'status': status['status']}), 409
+    
+    if status['kind'] == 'monte_carlo':
+        return send_file(os.path.abspath(path), mimetype='application/json')
+    params = status['params']
+    fmt = params.get('format', 'csv')
+    filename = f'sweep.{fmt}.gz' if params.get('gzip') else f'sweep.{fmt}'
+    mimetype = 'application/gzip' if params.get('gzip') else sweep.FORMATS[fmt]
+    return send_file(os.path.abspath(path), mimetype=mimetype, as_attachment=True, download_name=filename)
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """작업 취소"""
+    status = job_queue.cancel(job_id)
+    if status is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+    return jsonify(status)
+
+@app.route('/cache_stats')
+def cache_stats():
+    """계산 결과 캐시 통계 (모니터링용)"""
+    return jsonify(result_cache.stats())
+
 @app.route('/save_scenario', methods=['POST'])
 def save_scenario():
     """시나리오 저장"""
@@ -226,49 +801,30 @@ def save_scenario():
             # 이름이 없으면 자동 생성
             name = get_next_scenario_name_util()
         
-        # 저장 디렉토리 생성
-        os.makedirs('saved_scenarios', exist_ok=True)
-        
-        # 파일명 생성
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{timestamp}_{name.replace(' ', '_')}.json"
-        filepath = os.path.join('saved_scenarios', filename)
-        
-        # 시나리오 데이터 저장
-        scenario_data = {
-            'name': name,
-            'created_at': datetime.now().isoformat(),
-            'settings': scenario
-        }
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(scenario_data, f, ensure_ascii=False, indent=2)
+        # 설정은 내용 해시별로 한 번만 저장 (이름과 설정이 모두 같으면 기존 시나리오 반환)
+        filename, _, created = scenario_index.save(name, scenario)
         
-        return jsonify({'success': True, 'name': name})
+        return jsonify({'success': True, 'name': name, 'filename': filename, 'duplicate': not created})
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/load_scenarios')
 def load_scenarios():
-    """저장된 시나리오 목록"""
+    """저장된 시나리오 목록 (offset/limit/q/order 쿼리 파라미터로 페이지 조회 및 이름 검색)"""
     try:
-        scenarios = []
-        if os.path.exists('saved_scenarios'):
-            for filename in os.listdir('saved_scenarios'):
-                if filename.endswith('.json'):
-                    filepath = os.path.join('saved_scenarios', filename)
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        scenarios.append({
-                            'filename': filename,
-                            'name': data['name'],
-                            'created_at': data['created_at']
-                        })
-        
-        # 생성일 기준 내림차순 정렬
-        scenarios.sort(key=lambda x: x['created_at'], reverse=True)
-        return jsonify(scenarios)
+        offset = request.args.get('offset', 0, type=int)
+        limit = request.args.get('limit', type=int)
+        query = request.args.get('q', '').strip() or None
+        descending = request.args.get('order', 'desc') != 'asc'
+        
+        # 생성일 기준 정렬 (기본 내림차순)
+        scenarios = scenario_index.list_scenarios(offset=offset, limit=limit, query=query, descending=descending)
+        
+        response = jsonify([{'filename': s['filename'], 'name': s['name'], 'created_at': s['created_at']}
+                            for s in scenarios])
+        response.headers['X-Total-Count'] = str(scenario_index.count(query))
+        return response
         
     except Exception as e:
         return jsonify([])
@@ -277,9 +833,7 @@ def load_scenarios():
 def load_scenario(filename):
     """특정 시나리오 불러오기"""
     try:
-        filepath = os.path.join('saved_scenarios', filename)
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = scenario_index.load(filename)
         
         return jsonify({'success': True, 'data': data})
         
@@ -290,9 +844,7 @@ def load_scenario(filename):
 def delete_scenario(filename):
     """시나리오 삭제"""
     try:
-        filepath = os.path.join('saved_scenarios', filename)
-        if os.path.exists(filepath):
-            os.remove(filepath)
+        if scenario_index.delete(filename):
             return jsonify({'success': True})
         else:
             return jsonify({'success': False, 'error': '파일을 찾을 수 없습니다.'})
@@ -300,6 +852,40 @@ def delete_scenario(filename):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/export_scenarios')
+def export_scenarios():
+    """저장된 시나리오 일괄 내보내기 (format=zip|tar|ndjson, q로 이름 검색, 파일 하나씩 스트리밍)"""
+    try:
+        fmt = request.args.get('format', 'zip')
+        query = request.args.get('q', '').strip() or None
+        if fmt not in scenario_archive.FORMATS:
+            raise ValueError(f'지원하지 않는 형식입니다: {fmt} ({", ".join(scenario_archive.FORMATS)} 중 선택)')
+        mimetype, extension = scenario_archive.FORMATS[fmt]
+        response = Response(scenario_archive.export_stream(scenario_index, fmt, query), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename=scenarios.{extension}'
+        response.headers['X-Total-Count'] = str(scenario_index.count(query))
+        return response
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@app.route('/import_scenarios', methods=['POST'])
+def import_scenarios():
+    """시나리오 일괄 가져오기 (multipart 'file' 또는 요청 본문, 내용이 같은 시나리오는 건너뜀)"""
+    try:
+        upload = request.files.get('file')
+        stream = upload.stream if upload else request.stream
+        fmt = request.args.get('format')
+        if fmt is None:
+            # 형식을 지정하지 않으면 업로드 파일 확장자로 판단
+            filename = (upload.filename if upload else '') or ''
+            fmt = next((key for key, (_, extension) in scenario_archive.FORMATS.items()
+                        if filename.endswith('.' + extension) or (key == 'tar' and filename.endswith('.tgz'))),
+                       'zip')
+        result = scenario_archive.import_stream(scenario_index, stream, fmt)
+        return jsonify({'success': True, **result})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
 @app.route('/get_next_scenario_name')
 def get_next_scenario_name():
     """다음 시나리오 이름 생성"""
@@ -311,32 +897,7 @@ def get_next_scenario_name():
 
 # --- 유틸 함수 추가 ---
 def get_next_scenario_name_util():
-    scenarios = []
-    if os.path.exists('saved_scenarios'):
-        for filename in os.listdir('saved_scenarios'):
-            if filename.endswith('.json'):
-                filepath = os.path.join('saved_scenarios', filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        scenarios.append(data['name'])
-                except Exception as e:
-                    print(f"파일 읽기 오류: {filepath} - {e}")
-    print('현재 시나리오 이름 목록:', scenarios)
-    existing_numbers = []
-    for name in scenarios:
-        if name.startswith('시나리오 '):
-            try:
-                num = int(name.split(' ')[1])
-                existing_numbers.append(num)
-            except:
-                pass
-    if existing_numbers:
-        next_num = max(existing_numbers) + 1
-    else:
-        next_num = 1
-    print('다음 시나리오 번호:', next_num)
-    return f'시나리오 {next_num}'
+    return f'시나리오 {scenario_index.next_name_number()}'
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
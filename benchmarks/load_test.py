@@ -0,0 +1,516 @@
+# 부하 테스트: 로컬에서 서버를 띄우고 브라우저 사용 흐름을 흉내 낸 가상 사용자로 동시 접속 성능 측정
+#
+# 가상 사용자 한 명은 다음 세션을 반복한다 (index.html의 실제 요청 순서).
+#   1. 접속: GET / → GET /load_scenarios (비교 목록) → 0.5초 뒤 POST /calculate (기본 시나리오)
+#   2. 슬라이더 조작: 슬라이더를 끌다가 멈출 때마다 300ms 디바운스 후 POST /calculate
+#   3. 일부 사용자는 저장(GET /get_next_scenario_name → POST /save_scenario → GET /load_scenarios)
+#      이나 비교(GET /load_scenarios → POST /compare)를 함
+# --live를 지정하면 슬라이더 조작을 페이지처럼 실시간 채널(SSE)로 계산한다. 조작을 시작할 때
+# GET /live/stream으로 채널을 열고, 멈출 때마다 300ms 디바운스 후 POST /live/<채널>로 값을 보낸 뒤
+# 그 값의 결과 이벤트를 기다리고(LIVE result), 조작이 끝나면 DELETE /live/<채널>로 닫는다. 채널이 모두
+# 사용 중이면(503) 오류로 기록하고 그 세션은 /calculate로 계산한다.
+#
+# 사용법:
+#   python benchmarks/load_test.py                                  # gthread:1x32 서버, 사용자 10/50명
+#   python benchmarks/load_test.py --server sync:4 --server gthread:2x16 --users 10,50,100
+#   python benchmarks/load_test.py --server flask --duration 30     # Flask 개발 서버
+#   python benchmarks/load_test.py --live --users 10,30             # 실시간 채널(SSE) 사용
+#   python benchmarks/load_test.py --url http://127.0.0.1:5000      # 이미 실행 중인 서버
+#   python benchmarks/load_test.py --output result.json             # 결과 저장
+#   python benchmarks/load_test.py --baseline result.json           # 저장한 결과와 비교 (p95가 느려지면 종료 코드 1)
+#
+# 서버는 임시 폴더에 앱 파일을 복사하여 실행하므로 저장소의 시나리오/통계 파일을 건드리지 않는다.
+import argparse
+import gzip
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_SERVERS = ['gthread:1x32']
+DEFAULT_USERS = '10,50'
+DURATION = 20.0         # 초, 사용자 수마다 측정하는 시간
+STARTUP_TIMEOUT = 60.0  # 초, 서버가 응답할 때까지 기다리는 최대 시간
+REQUEST_TIMEOUT = 30.0  # 초, 요청 하나의 최대 시간
+DEBOUNCE = 0.3          # 초, index.html의 debouncedCalculateScenario 지연
+PERCENTILES = (50, 95, 99)
+MIN_COMPARE_REQUESTS = 20  # 기준 비교에 쓸 최소 요청 수 (표본이 적은 경로의 p95는 잡음이 큼)
+APP_FILES = ('templates', 'static')  # 최상위 *.py와 함께 임시 폴더에 복사할 폴더
+
+SLIDERS = {'target_year': (2040, 2050), 'r35': (0, 100), 'r40': (0, 100), 'r45': (0, 100)}
+DEFAULT_PARAMS = {'budget': 87.4, 'target_year': 2050, 'r35': 55, 'r40': 70, 'r45': 85}
+
+
+# --- 서버 실행 ---
+
+def parse_server(spec):
+    """서버 설정 문자열 → (이름, 실행 인자)
+
+    sync:N (동기 워커 N개), gthread:NxT (스레드 워커 N개 × 스레드 T개), flask (개발 서버, 스레드)
+    """
+    kind, _, size = spec.partition(':')
+    if kind == 'flask':
+        return spec, None
+    if kind == 'sync':
+        workers, threads = int(size or 1), 1
+    elif kind == 'gthread':
+        workers, _, threads = (size or '1x32').partition('x')
+        workers, threads = int(workers), int(threads or 32)
+    else:
+        raise ValueError(f'알 수 없는 서버 설정: {spec} (sync:N, gthread:NxT, flask 중 선택)')
+    return spec, ['--workers', str(workers), '--worker-class', kind, '--threads', str(threads)]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def prepare_workdir():
+    """앱 파일만 복사한 임시 작업 폴더 (결과 큐브가 있으면 그대로 사용)"""
+    workdir = tempfile.mkdtemp(prefix='netzero-load-')
+    for name in os.listdir(ROOT):
+        source = os.path.join(ROOT, name)
+        if name.endswith('.py') and os.path.isfile(source):
+            shutil.copy2(source, workdir)
+        elif name in APP_FILES:
+            shutil.copytree(source, os.path.join(workdir, name))
+    return workdir
+
+
+def start_server(spec, workdir):
+    """서버 프로세스와 주소"""
+    _, gunicorn_args = parse_server(spec)
+    port = free_port()
+    env = dict(os.environ)
+    cube_file = os.path.join(ROOT, 'data', 'emission_cube.npy')
+    if os.path.exists(cube_file):
+        env.setdefault('RESULT_CUBE_FILE', cube_file)
+    if gunicorn_args is None:
+        command = [sys.executable, '-c',
+                   f'import app; app.app.run(host="127.0.0.1", port={port}, threaded=True)']
+    else:
+        command = [sys.executable, '-m', 'gunicorn', 'app:app', '--bind', f'127.0.0.1:{port}',
+                   '--log-level', 'warning', *gunicorn_args]
+    # 서버 로그는 파이프 대신 파일로 (개발 서버는 요청마다 로그를 남기므로 파이프가 차면 멈춤)
+    log_path = os.path.join(workdir, 'server.log')
+    with open(log_path, 'wb') as log:
+        process = subprocess.Popen(command, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+    url = f'http://127.0.0.1:{port}'
+    wait_ready(url, process, log_path)
+    return process, url
+
+
+def wait_ready(url, process=None, log_path=None):
+    """서버가 GET /에 응답할 때까지 대기"""
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
+                raise RuntimeError(f'서버가 시작되지 않았습니다:\n{f.read()}')
+        client = Client(url)
+        try:
+            client.request('GET', '/')
+            return
+        except (OSError, http.client.HTTPException):
+            time.sleep(0.2)
+        finally:
+            client.close()
+    raise RuntimeError(f'서버가 {STARTUP_TIMEOUT:g}초 안에 응답하지 않았습니다: {url}')
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+# --- 가상 사용자 ---
+
+class Client:
+    """연결을 재사용하는 HTTP 클라이언트 (서버가 연결을 닫으면 다시 연결)"""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.conn = None
+
+    def request(self, method, path, payload=None):
+        """(상태 코드, JSON 본문 또는 None)"""
+        body = None if payload is None else json.dumps(payload).encode('utf-8')
+        headers = {'Accept-Encoding': 'gzip'}  # 브라우저처럼 압축 응답을 받음
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=REQUEST_TIMEOUT)
+            try:
+                self.conn.request(method, path, body, headers)
+                response = self.conn.getresponse()
+                data = response.read()
+                if response.will_close:
+                    self.close()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # 유휴 연결을 서버가 닫은 경우 한 번만 다시 시도
+                self.close()
+                if attempt:
+                    raise
+        if response.getheader('Content-Type', '').startswith('application/json'):
+            if response.getheader('Content-Encoding') == 'gzip':
+                data = gzip.decompress(data)
+            try:
+                return response.status, json.loads(data)
+            except ValueError:
+                pass
+        return response.status, None
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class LiveStream:
+    """실시간 계산 채널(SSE) 연결 (channel이 None이면 채널을 열지 못함)"""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=REQUEST_TIMEOUT)
+        self.channel = None
+        self.conn.request('GET', '/live/stream', headers={'Accept': 'text/event-stream'})
+        self.response = self.conn.getresponse()
+        if self.response.status == 200:
+            event, data = self.next_event()
+            if event == 'ready':
+                self.channel = data['channel']
+
+    def next_event(self):
+        """다음 이벤트 (이름, 데이터) (연결 유지용 주석은 건너뜀)"""
+        event = data = None
+        while True:
+            line = self.response.readline()
+            if not line:
+                raise http.client.IncompleteRead(b'')
+            line = line.decode('utf-8').rstrip('\r\n')
+            if not line:
+                if event is not None:
+                    return event, data
+            elif line.startswith('event: '):
+                event = line[len('event: '):]
+            elif line.startswith('data: '):
+                data = json.loads(line[len('data: '):])
+
+    def wait_result(self, seq):
+        """seq 이후 값의 결과를 받을 때까지 대기 (성공 여부, seq가 None이면 다음 결과)"""
+        while True:
+            event, data = self.next_event()
+            if event in ('result', 'failed') and data.get('seq', 0) >= (seq or 0):
+                return event == 'result'
+
+    def close(self):
+        self.conn.close()
+
+
+class User:
+    """index.html 사용 흐름을 흉내 내는 가상 사용자 (요청마다 (경로, 시작 시각, 지연, 성공 여부) 기록)"""
+
+    def __init__(self, url, seed, stop_at, records, live=False):
+        self.url = url
+        self.client = Client(url)
+        self.random = random.Random(seed)
+        self.stop_at = stop_at
+        self.records = records
+        self.live = live
+        self.params = dict(DEFAULT_PARAMS)
+
+    def call(self, method, path, payload=None, route=None):
+        wall, started = time.time(), time.perf_counter()
+        try:
+            status, data = self.client.request(method, path, payload)
+            ok = status < 400 and not (isinstance(data, dict) and data.get('success') is False)
+        except (OSError, http.client.HTTPException):
+            self.client.close()
+            data, ok = None, False
+        self.record(route or f'{method} {path}', wall, started, ok)
+        return data
+
+    def record(self, route, wall, started, ok):
+        self.records.append((route, wall, time.perf_counter() - started, ok))
+
+    def open_live(self):
+        """실시간 채널 열기 (ready 이벤트까지의 시간 기록, 열지 못하면 None)"""
+        wall, started = time.time(), time.perf_counter()
+        stream = None
+        try:
+            stream = LiveStream(self.url)
+        except (OSError, http.client.HTTPException, ValueError):
+            pass
+        ok = stream is not None and stream.channel is not None
+        self.record('GET /live/stream', wall, started, ok)
+        if stream is not None and not ok:
+            stream.close()
+        return stream if ok else None
+
+    def drag_live(self, stream, key, value):
+        """디바운스 후 슬라이더 값을 채널로 보내고 결과를 기다림 (채널을 쓸 수 없으면 False)"""
+        self.params[key] = value
+        wall, started = time.time(), time.perf_counter()  # 값을 보낸 시점부터 결과까지
+        data = self.call('POST', f'/live/{stream.channel}', self.params, route='POST /live/<channel>')
+        if not isinstance(data, dict) or 'seq' not in data:
+            return False
+        seq = data['seq']  # 다른 워커가 받았으면 None
+        try:
+            ok = stream.wait_result(seq)
+        except (OSError, http.client.HTTPException, ValueError):
+            ok = False
+        self.record('LIVE result', wall, started, ok)
+        return ok
+
+    def close_live(self, stream):
+        self.call('DELETE', f'/live/{stream.channel}', route='DELETE /live/<channel>')
+        stream.close()
+
+    def think(self, low, high):
+        """사용자 대기 (측정 시간이 끝나면 False)"""
+        delay = self.random.uniform(low, high)
+        if time.monotonic() + delay >= self.stop_at:
+            return False
+        time.sleep(delay)
+        return True
+
+    def run(self):
+        try:
+            while time.monotonic() < self.stop_at:
+                self.session()
+        finally:
+            self.client.close()
+
+    def session(self):
+        # 1. 접속
+        self.params = dict(DEFAULT_PARAMS)
+        self.call('GET', '/')
+        self.call('GET', '/load_scenarios')
+        if not self.think(0.5, 0.5):
+            return
+        self.call('POST', '/calculate', self.params)
+
+        # 2. 슬라이더 조작 (멈출 때마다 디바운스 후 계산, --live면 실시간 채널로 계산)
+        stream = self.open_live() if self.live else None
+        try:
+            for _ in range(self.random.randint(2, 6)):
+                key = self.random.choice(list(SLIDERS))
+                low, high = SLIDERS[key]
+                target = self.random.randint(low, high)
+                for _ in range(self.random.randint(1, 3)):
+                    if not self.think(DEBOUNCE, DEBOUNCE + 0.7):
+                        return
+                    current = self.params[key]
+                    value = current + round((target - current) * self.random.uniform(0.3, 1.0))
+                    if stream is not None and not self.drag_live(stream, key, value):
+                        # 페이지처럼 채널을 닫고 일반 계산 요청으로 대신 계산
+                        self.close_live(stream)
+                        stream = None
+                    if stream is None:
+                        self.params[key] = value
+                        self.call('POST', '/calculate', self.params)
+        finally:
+            if stream is not None:
+                self.close_live(stream)
+
+        # 3. 저장 / 비교
+        choice = self.random.random()
+        if choice < 0.3 and self.think(1.0, 3.0):
+            data = self.call('GET', '/get_next_scenario_name')
+            name = (data or {}).get('next_name', '시나리오')
+            self.call('POST', '/save_scenario', {'scenario': self.params, 'name': name})
+            self.call('GET', '/load_scenarios')
+        elif choice < 0.5 and self.think(1.0, 3.0):
+            listing = self.call('GET', '/load_scenarios')
+            filenames = [item['filename'] for item in (listing or [])]
+            if filenames:
+                picked = self.random.sample(filenames, min(len(filenames), self.random.randint(1, 3)))
+                self.call('POST', '/compare', {'filenames': picked})
+        self.think(2.0, 5.0)
+
+
+def run_users(url, users, duration, seed, offset=0, live=False):
+    """users명의 가상 사용자를 스레드로 duration초 동안 실행하여 요청 기록 반환"""
+    records = []
+    stop_at = time.monotonic() + duration
+    threads = []
+    for i in range(users):
+        user = User(url, seed * 1_000_003 + offset + i, stop_at, records, live)
+        threads.append(threading.Thread(target=user.run, daemon=True))
+    for thread in threads:
+        thread.start()
+        time.sleep(min(0.05, 1.0 / max(users, 1)))  # 동시에 접속하지 않도록 조금씩 나누어 시작
+    for thread in threads:
+        thread.join(timeout=duration + REQUEST_TIMEOUT * 2)
+    return records
+
+
+def _run_users_process(args):
+    return run_users(*args)
+
+
+def generate_load(url, users, duration, processes, seed, live=False):
+    """가상 사용자를 processes개 프로세스에 나누어 실행 (부하 생성기 자체의 GIL 병목 방지)"""
+    processes = max(1, min(processes, users))
+    if processes == 1:
+        return run_users(url, users, duration, seed, live=live)
+    shares = [users // processes + (i < users % processes) for i in range(processes)]
+    offsets = [sum(shares[:i]) for i in range(processes)]
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.map(_run_users_process,
+                           [(url, share, duration, seed, offset, live) for share, offset in zip(shares, offsets)])
+    return [record for result in results for record in result]
+
+
+# --- 집계 및 보고 ---
+
+def percentile(ordered, q):
+    """정렬된 값의 q 백분위수 (nearest-rank)"""
+    if not ordered:
+        return 0.0
+    rank = max(1, min(len(ordered), int(-(-q * len(ordered) // 100))))
+    return ordered[rank - 1]
+
+
+def summarize(records):
+    """경로별 요청 수, 오류 수, 처리량(req/s)과 지연시간 백분위수(ms)"""
+    if not records:
+        return {}
+    started = min(record[1] for record in records)
+    ended = max(record[1] + record[2] for record in records)
+    elapsed = max(ended - started, 1e-9)
+
+    groups = {}
+    for route, _, latency, ok in records:
+        groups.setdefault(route, []).append((latency, ok))
+    groups['total'] = [(latency, ok) for _, _, latency, ok in records]
+
+    summary = {}
+    for route, items in groups.items():
+        latencies = sorted(latency * 1000 for latency, _ in items)
+        summary[route] = {
+            'requests': len(items),
+            'errors': sum(1 for _, ok in items if not ok),
+            'throughput': len(items) / elapsed,
+            **{f'p{q}': percentile(latencies, q) for q in PERCENTILES},
+            'max': latencies[-1],
+        }
+    return summary
+
+
+def print_summary(server, users, summary):
+    print()
+    print(f'[{server}, 사용자 {users}명]')
+    print(f"{'route':<30} {'requests':>9} {'errors':>7} {'req/s':>8} "
+          + ' '.join(f'{"p" + str(q) + "(ms)":>9}' for q in PERCENTILES) + f" {'max(ms)':>9}")
+    print('-' * (58 + 10 * (len(PERCENTILES) + 1)))
+    for route in sorted(summary, key=lambda r: (r == 'total', r)):
+        item = summary[route]
+        print(f"{route:<30} {item['requests']:>9} {item['errors']:>7} {item['throughput']:>8.1f} "
+              + ' '.join(f"{item[f'p{q}']:>9.1f}" for q in PERCENTILES) + f" {item['max']:>9.1f}")
+
+
+def compare(results, baseline, threshold):
+    """기준 결과와 경로별 p95 비교, 느려진 항목 목록 반환 (요청 수가 적은 경로는 표시만 함)"""
+    regressions = []
+    print()
+    print(f"{'server / users / route':<55} {'p95(ms)':>9} {'baseline':>9} {'change':>9}")
+    print('-' * 86)
+    for key, summary in results.items():
+        for route, item in sorted(summary.items()):
+            previous = baseline.get(key, {}).get(route)
+            if previous is None:
+                continue
+            change = (item['p95'] - previous['p95']) / previous['p95'] if previous['p95'] else 0.0
+            flag = ''
+            enough = min(item['requests'], previous['requests']) >= MIN_COMPARE_REQUESTS
+            if change > threshold and enough:
+                flag = '  << REGRESSION'
+                regressions.append(f'{key} {route}')
+            elif not enough:
+                flag = '  (표본 부족)'
+            print(f"{key + ' ' + route:<55} {item['p95']:9.1f} {previous['p95']:9.1f} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='한국 탄소중립 경로 시뮬레이터 부하 테스트')
+    parser.add_argument('--server', action='append',
+                        help='서버 설정 (sync:N, gthread:NxT, flask, 여러 번 지정 가능, 기본 gthread:1x32)')
+    parser.add_argument('--url', help='이미 실행 중인 서버 주소 (지정하면 서버를 띄우지 않음)')
+    parser.add_argument('--users', default=DEFAULT_USERS, help=f'동시 사용자 수 목록 (기본 {DEFAULT_USERS})')
+    parser.add_argument('--duration', type=float, default=DURATION, help=f'사용자 수마다 측정 시간(초, 기본 {DURATION:g})')
+    parser.add_argument('--processes', type=int, default=1, help='부하 생성 프로세스 수 (사용자가 많을 때)')
+    parser.add_argument('--live', action='store_true', help='슬라이더 계산에 실시간 채널(SSE) 사용')
+    parser.add_argument('--seed', type=int, default=0, help='가상 사용자 난수 시드')
+    parser.add_argument('--output', help='결과를 JSON으로 저장할 경로')
+    parser.add_argument('--baseline', help='비교할 이전 결과 JSON')
+    parser.add_argument('--threshold', type=float, default=0.25, help='회귀로 판단할 p95 증가 비율 (기본 0.25)')
+    args = parser.parse_args()
+
+    user_counts = [int(count) for count in args.users.split(',') if count.strip()]
+    servers = [args.url] if args.url else (args.server or DEFAULT_SERVERS)
+    for spec in ([] if args.url else servers):
+        parse_server(spec)
+
+    results = {}
+    for server in servers:
+        workdir = process = None
+        try:
+            if args.url:
+                url = args.url.rstrip('/')
+                wait_ready(url)
+            else:
+                workdir = prepare_workdir()
+                print(f'서버 시작: {server}', flush=True)
+                process, url = start_server(server, workdir)
+            for users in user_counts:
+                print(f'  사용자 {users}명, {args.duration:g}초 측정 중...', flush=True)
+                records = generate_load(url, users, args.duration, args.processes, args.seed, args.live)
+                summary = summarize(records)
+                label = f'{server} live' if args.live else server
+                results[f'{label} users={users}'] = summary
+                print_summary(label, users, summary)
+        finally:
+            if process is not None:
+                stop_server(process)
+            if workdir is not None:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f'\n결과 저장: {args.output}')
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)}개 항목의 p95가 기준보다 {args.threshold:.0%} 이상 느려졌습니다.')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,386 @@
+# 성능 벤치마크: 계산 엔진, Flask 라우트, 시나리오 색인, 이용 통계 이벤트 로그
+#
+# 사용법:
+#   python benchmarks/run_benchmarks.py            # 실행 후 기준값(baseline.json)과 비교
+#   python benchmarks/run_benchmarks.py --save     # 결과를 기준값으로 저장
+#
+# 기준값은 측정한 컴퓨터에 따라 다르므로 저장소에 넣지 않는다 (.gitignore). 비교할 컴퓨터에서 먼저 --save로 저장한다.
+#   python benchmarks/run_benchmarks.py -k kernel  # 이름에 'kernel'이 포함된 항목만 실행
+#
+# 기준값보다 --threshold(기본 25%) 이상 느려진 항목이 있으면 종료 코드 1을 반환한다.
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import cube  # noqa: E402
+import engine  # noqa: E402
+import event_log  # noqa: E402
+import inventory  # noqa: E402
+import scenario_store  # noqa: E402
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+MIN_REPEATS = 5
+MAX_REPEATS = 1000
+MIN_DURATION = 0.2  # 항목당 최소 측정 시간 (초)
+
+BENCHMARKS = []
+_tempdirs = []
+
+
+def _tempdir(prefix):
+    """실행 후 삭제할 임시 디렉토리 생성"""
+    path = tempfile.mkdtemp(prefix=prefix)
+    _tempdirs.append(path)
+    return path
+
+
+def benchmark(name):
+    """벤치마크 함수 등록 (함수는 (준비 함수, 측정 대상 함수)를 반환)"""
+    def decorator(func):
+        BENCHMARKS.append((name, func))
+        return func
+    return decorator
+
+
+def measure(target):
+    """target을 반복 실행하여 1회 실행 시간(초)의 중앙값/최솟값 측정"""
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < MAX_REPEATS:
+        t0 = time.perf_counter()
+        target()
+        timings.append(time.perf_counter() - t0)
+        if len(timings) >= MIN_REPEATS and time.perf_counter() - started >= MIN_DURATION:
+            break
+    return {'median': statistics.median(timings), 'min': min(timings), 'repeats': len(timings)}
+
+
+# --- 계산 엔진 ---
+
+def _kernel(target_year, size):
+    def setup():
+        rng = np.random.default_rng(0)
+        params = (87.4, np.full(size, target_year), rng.uniform(0, 100, size),
+                  rng.uniform(0, 100, size), rng.uniform(0, 100, size))
+        return lambda: engine.calculate_batch(*params)
+    return setup
+
+
+for _target_year in (2040, 2045, 2050):
+    for _size in (1, 1_000, 100_000):
+        benchmark(f'kernel[target={_target_year},n={_size}]')(_kernel(_target_year, _size))
+
+
+# --- 사전 계산 결과 큐브 ---
+
+@benchmark('cube[lookup n=100000]')
+def _cube_lookup():
+    path = os.path.join(_tempdir('netzero-bench-cube-'), 'emission_cube.npy')
+    cube.build(path)
+    result_cube = cube.ResultCube(path)
+    rng = np.random.default_rng(0)
+    size = 100_000
+    params = (87.4, rng.integers(2040, 2051, size), rng.integers(0, 101, size),
+              rng.integers(0, 101, size), rng.integers(0, 101, size))
+    return lambda: result_cube.total_emission(*params)
+
+
+# --- 지역/가스별 인벤토리 ---
+
+def _inventories(count):
+    """지역 count개의 CSV 인벤토리가 있는 임시 폴더의 Inventories"""
+    workdir = _tempdir('netzero-bench-inventory-')
+    os.makedirs(os.path.join(workdir, 'inventories'))
+    with open(os.path.join(workdir, 'inventories', 'regions.csv'), 'w', encoding='utf-8') as f:
+        f.write('region,gas,year,value\n')
+        for i in range(count):
+            for year in inventory.YEARS.tolist():
+                f.write(f'R{i:05d},GHG,{year},{engine.FIXED_DATA[year] / count:.6f}\n')
+    return inventory.Inventories(os.path.join(workdir, 'inventories'), os.path.join(workdir, 'data'))
+
+
+@benchmark('inventory[rebuild n=1000]')
+def _inventory_rebuild():
+    inventories = _inventories(1000)
+    path = os.path.join(inventories.directory, 'regions.csv')
+    touched = [os.stat(path).st_mtime_ns]
+
+    def run():
+        # 수정 시각을 바꿔 원본 파일이 바뀐 것으로 만든 뒤 다시 읽기
+        touched[0] += 1
+        os.utime(path, ns=(touched[0], touched[0]))
+        inventories.refresh(force=True)
+    return run
+
+
+@benchmark('inventory[get + calculate n=1000 regions]')
+def _inventory_get():
+    inventories = _inventories(1000)
+    return lambda: engine.calculate_batch(87.4, 2045, 50, 70, 85, inventory=inventories.get('R00500', 'GHG'))
+
+
+# --- Flask 라우트 (테스트 클라이언트) ---
+
+_app_state = {}
+
+
+def _client():
+    """임시 작업 디렉토리에서 동작하는 app 테스트 클라이언트 (저장소 파일을 건드리지 않음)"""
+    if 'client' not in _app_state:
+        import app as app_module
+        import cache
+
+        workdir = _tempdir('netzero-bench-')
+        os.chdir(workdir)
+        app_module.scenario_index = scenario_store.ScenarioStore('saved_scenarios')
+        app_module.usage_log = event_log.EventLog(
+            os.path.join(workdir, 'events'), flush_interval=3600, compact_interval=3600
+        )
+        app_module.result_cache = cache.ResultCache(maxsize=0)  # 계산 비용을 측정하도록 캐시 비활성화
+
+        client = app_module.app.test_client()
+        for i in range(3):
+            client.post('/save_scenario', json={'scenario': _params(i), 'name': ''})
+        _app_state.update(client=client, module=app_module)
+    return _app_state['client']
+
+
+def _params(i=0):
+    return {'budget': 87.4, 'target_year': 2040 + i % 11, 'r35': 50 + i % 7, 'r40': 70, 'r45': 85}
+
+
+def _route(method, path, payload=None):
+    def setup():
+        client = _client()
+        send = getattr(client, method)
+        if payload is None:
+            return lambda: send(path)
+        return lambda: send(path, json=payload() if callable(payload) else payload)
+    return setup
+
+
+def _compare_payload():
+    filenames = [s['filename'] for s in _client().get('/load_scenarios').get_json()]
+    return {'filenames': filenames, 'scenarios': [_params(5)]}
+
+
+benchmark('route[GET /]')(_route('get', '/'))
+benchmark('route[POST /calculate]')(_route('post', '/calculate', _params()))
+benchmark('route[POST /calculate?format=compact]')(_route('post', '/calculate?format=compact', _params()))
+benchmark('route[POST /calculate_batch n=1000]')(_route('post', '/calculate_batch', {
+    'budget': 87.4, 'target_year': 2050, 'r35': list(range(1000)), 'r40': 70, 'r45': 85
+}))
+benchmark('route[POST /solve]')(_route('post', '/solve', {
+    'budget': 87.4, 'target_year': 2050, 'r40': 70, 'r45': 85, 'solve_for': 'r35'
+}))
+benchmark('route[POST /sensitivity n=1000]')(_route('post', '/sensitivity', {
+    'budget': 87.4, 'target_year': 2050, 'r35': list(range(1000)), 'r40': 70, 'r45': 85
+}))
+benchmark('route[POST /pareto step=5]')(_route('post', '/pareto', {'budget': 87.4}))
+benchmark('route[POST /compare]')(_route('post', '/compare', _compare_payload))
+benchmark('route[POST /monte_carlo n=10000]')(_route('post', '/monte_carlo', {
+    'samples': 10_000, 'seed': 0, 'r35': {'type': 'normal', 'mean': 50, 'std': 5}
+}))
+benchmark('route[GET /load_scenarios]')(_route('get', '/load_scenarios'))
+benchmark('route[GET /get_next_scenario_name]')(_route('get', '/get_next_scenario_name'))
+
+
+# --- 시나리오 색인 ---
+
+def _make_scenarios(directory, count):
+    os.makedirs(directory, exist_ok=True)
+    for i in range(count):
+        data = {'name': f'시나리오 {i + 1}', 'created_at': f'2025-01-01T00:00:{i:08d}', 'settings': _params(i)}
+        with open(os.path.join(directory, f'bench_{i:06d}.json'), 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+
+def _store(count, operation):
+    def setup():
+        directory = os.path.join(_tempdir('netzero-bench-store-'), 'saved_scenarios')
+        _make_scenarios(directory, count)
+        store = scenario_store.ScenarioStore(directory)
+        if operation == 'rebuild':
+            return store.rebuild
+        store.sync()
+        if operation == 'list':
+            return lambda: store.list_scenarios(limit=20)
+        return store.next_name_number
+    return setup
+
+
+for _count in (10, 1_000, 10_000):
+    benchmark(f'store[rebuild n={_count}]')(_store(_count, 'rebuild'))
+    benchmark(f'store[list page n={_count}]')(_store(_count, 'list'))
+    benchmark(f'store[next name n={_count}]')(_store(_count, 'next'))
+
+
+@benchmark('store[save 8 threads x 50]')
+def _store_save():
+    store = scenario_store.ScenarioStore(os.path.join(_tempdir('netzero-bench-save-'), 'saved_scenarios'))
+    store.sync()
+    rounds = [0]
+
+    def saves(thread):
+        for i in range(50):
+            # 이름은 매번 새로, 설정은 일부만 겹치도록 (설정 파일 재사용 포함)
+            store.save(f'동시 저장 {rounds[0]}-{thread}-{i}', _params(i))
+
+    def run():
+        rounds[0] += 1
+        threads = [threading.Thread(target=saves, args=(t,)) for t in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return run
+
+
+# --- 이용 통계 이벤트 로그 ---
+
+def _combo(i):
+    return json.dumps(_params(i), separators=(',', ':'))
+
+
+@benchmark('events[8 threads x 1000 records + flush]')
+def _events_record():
+    log = event_log.EventLog(_tempdir('netzero-bench-events-'), flush_interval=3600, compact_interval=3600)
+
+    def records(thread):
+        for i in range(1000):
+            log.record('calculate', _combo(thread + i))
+
+    def run():
+        threads = [threading.Thread(target=records, args=(t,)) for t in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        log.flush()
+    return run
+
+
+@benchmark('events[compact 10000 new lines]')
+def _events_compact():
+    log = event_log.EventLog(_tempdir('netzero-bench-events-'), flush_interval=3600, compact_interval=3600)
+    now = time.time()
+    lines = ''.join(json.dumps({'t': now, 'k': 'calculate', 'p': _combo(i)}, separators=(',', ':')) + '\n'
+                    for i in range(10_000))
+    path = os.path.join(log.directory, date.today().isoformat() + event_log.LOG_SUFFIX)
+    log.compact()
+
+    def run():
+        # 다른 워커가 덧붙인 줄을 압축 (이전에 반영한 위치 이후만 읽음)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+        log.compact()
+    return run
+
+
+@benchmark('events[admin query 1 year]')
+def _events_query():
+    log = event_log.EventLog(_tempdir('netzero-bench-events-'), flush_interval=3600, compact_interval=3600)
+    today = date.today()
+    for day in range(365):
+        when = time.mktime((today - timedelta(days=day)).timetuple()) + 3600
+        for i in range(20):
+            log.record('visit' if i % 2 else 'calculate', None if i % 2 else _combo(day + i), when)
+    log.compact()
+    start = today - timedelta(days=364)
+
+    def run():
+        log.totals(start, today)
+        log.series('day', today - timedelta(days=89), today)
+        log.top_combos(start, today)
+    return run
+
+
+# --- 실행 및 보고 ---
+
+def run_benchmarks(pattern=None):
+    results = {}
+    for name, setup in BENCHMARKS:
+        if pattern and pattern not in name:
+            continue
+        results[name] = measure(setup())
+        print(f"  {name:<45} {results[name]['median'] * 1000:10.3f} ms", flush=True)
+    return results
+
+
+def report(results, baseline, threshold):
+    """기준값과 비교한 보고서 출력, 느려진 항목 목록 반환"""
+    regressions = []
+    print()
+    print(f"{'benchmark':<45} {'median(ms)':>12} {'baseline(ms)':>13} {'change':>9}")
+    print('-' * 82)
+    for name, result in results.items():
+        current = result['median'] * 1000
+        if name not in baseline:
+            print(f'{name:<45} {current:12.3f} {"-":>13} {"new":>9}')
+            continue
+        previous = baseline[name]['median'] * 1000
+        change = (current - previous) / previous if previous else 0.0
+        flag = ''
+        if change > threshold:
+            flag = '  << REGRESSION'
+            regressions.append(name)
+        print(f'{name:<45} {current:12.3f} {previous:13.3f} {change:+8.1%}{flag}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='한국 탄소중립 경로 시뮬레이터 벤치마크')
+    parser.add_argument('--save', action='store_true', help='결과를 기준값으로 저장')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='기준값 파일 경로')
+    parser.add_argument('--threshold', type=float, default=0.25, help='회귀로 판단할 속도 저하 비율 (기본 0.25)')
+    parser.add_argument('-k', dest='pattern', help='이름에 이 문자열이 포함된 항목만 실행')
+    args = parser.parse_args()
+
+    print('벤치마크 실행 중...')
+    try:
+        results = run_benchmarks(args.pattern)
+    finally:
+        if 'module' in _app_state:
+            _app_state['module'].usage_log.flush()
+        os.chdir(ROOT)
+        for path in _tempdirs:
+            shutil.rmtree(path, ignore_errors=True)
+
+    if args.save:
+        baseline = {}
+        if args.pattern and os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f'기준값 저장: {args.baseline}')
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    else:
+        print(f'기준값 파일이 없습니다: {args.baseline} (--save로 이 컴퓨터의 기준값을 먼저 저장하세요)')
+    regressions = report(results, baseline, args.threshold)
+    if regressions:
+        print(f'\n{len(regressions)}개 항목이 기준값보다 {args.threshold:.0%} 이상 느려졌습니다.')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,171 @@
+# /calculate 결과 캐시 (직렬화된 응답 본문을 LRU로 보관)
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+KEY_DIGITS = 6  # 캐시 키 양자화 자릿수 (부동소수점 오차로 인한 키 분산 방지)
+DISK_PRUNE_INTERVAL = 64  # 디스크 캐시 정리 주기 (저장 횟수 기준)
+
+
+def make_key(budget, target_year, r35, r40, r45, milestones=None, shapes=None, inventory=None):
+    """계산 파라미터를 정규화한 캐시 키 (milestones/shapes/inventory는 지정한 경우에만 포함)"""
+    key = (
+        round(float(budget), KEY_DIGITS),
+        int(target_year),
+        *(None if r is None else round(float(r), KEY_DIGITS) for r in (r35, r40, r45))
+    )
+    if inventory is not None:
+        # 인벤토리 파일이 바뀌면 버전이 달라져 이전 결과를 쓰지 않음
+        key += (inventory.key,)
+    if milestones is None and shapes is None:
+        return key
+    if milestones is not None:
+        milestones = tuple(sorted((int(year), round(float(rate), KEY_DIGITS)) for year, rate in milestones.items()))
+    if shapes is not None and not isinstance(shapes, str):
+        shapes = tuple(shapes)
+    return key + (milestones, shapes)
+
+
+class ResultCache:
+    """크기가 제한된 LRU 캐시
+
+    directory를 지정하면 메모리 캐시에 없는 항목을 디스크(예: /dev/shm)에서 찾아
+    여러 gunicorn 워커가 계산 결과를 공유한다. 통계는 프로세스별로 집계된다.
+    """
+
+    def __init__(self, maxsize=1024, directory=None):
+        self.maxsize = maxsize
+        self.directory = directory
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key):
+        """캐시된 응답 본문 반환 (없으면 None)"""
+        with self._lock:
+            body = self._items.get(key)
+            if body is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return body
+
+        body = self._read_disk(key)
+        with self._lock:
+            if body is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._store(key, body)
+        return body
+
+    def set(self, key, body):
+        """응답 본문 저장"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._store(key, body)
+        self._write_disk(key, body)
+
+    def clear(self):
+        """캐시 비우기 (디스크 캐시 포함)"""
+        with self._lock:
+            self._items.clear()
+        if self.directory:
+            for filename in os.listdir(self.directory):
+                if filename.endswith('.json'):
+                    try:
+                        os.remove(os.path.join(self.directory, filename))
+                    except OSError:
+                        pass
+
+    def stats(self):
+        """캐시 적중/실패/제거 통계"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._items),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'shared': bool(self.directory)
+            }
+
+    def _store(self, key, body):
+        """메모리 캐시에 저장하고 크기를 넘으면 가장 오래된 항목 제거 (잠금 상태에서 호출)"""
+        if self.maxsize <= 0:
+            return
+        self._items[key] = body
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def _path(self, key):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f'{digest}.json')
+
+    def _read_disk(self, key):
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                body = f.read()
+            os.utime(path)  # 디스크 정리 시 최근 사용 항목이 남도록 갱신
+        except OSError:
+            return None
+        return body
+
+    def _write_disk(self, key, body):
+        """임시 파일에 쓴 뒤 rename하여 다른 워커가 불완전한 파일을 읽지 않도록 함"""
+        if not self.directory:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            # 디스크가 가득 찬 경우 등: 임시 파일이 남지 않도록 삭제
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+
+        self._writes += 1
+        if self._writes % DISK_PRUNE_INTERVAL == 0:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        """디스크 캐시가 최대 크기를 넘으면 오래된 파일부터 삭제"""
+        entries = []
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.json'):
+                    entries.append((entry.stat().st_mtime, entry.path))
+        except OSError:
+            return
+        excess = len(entries) - self.maxsize
+        if excess <= 0:
+            return
+        entries.sort()
+        for _, path in entries[:excess]:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            with self._lock:
+                self.evictions += 1
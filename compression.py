@@ -0,0 +1,168 @@
+# 응답 압축과 정적 파일 캐싱
+#
+# - 정적 파일: 시작 시 내용 해시와 (텍스트 형식만) gzip/brotli 압축본을 만들어 두고, url_for('static', ...)에
+#   ?v=<해시>를 붙여 1년 캐시(immutable)로 내보낸다. 파일이 바뀌면 해시가 바뀌어 새로 받는다.
+#   PNG/JPEG/woff2/.gz처럼 이미 압축된 형식은 압축을 시도하지 않는다.
+# - HTML/JSON/텍스트 응답: MIN_SIZE 이상이면 Accept-Encoding에 맞춰 그 자리에서 압축한다.
+#   같은 본문(메인 페이지, 캐시된 계산 결과 등)은 압축 결과를 재사용한다.
+# brotli 패키지가 설치되어 있으면 br을 우선 사용하고, 없으면 gzip만 사용한다.
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MIN_SIZE = 1024                # 바이트, 이보다 작은 응답은 압축하지 않음
+STATIC_MAX_AGE = 365 * 86400   # 초, 해시가 붙은 정적 파일 캐시 기간
+BODY_CACHE_SIZE = 256          # 압축 결과를 재사용할 본문 수
+MIN_RATIO = 0.9                # 압축본이 원본의 90% 이상이면 압축본을 버림
+COMPRESSIBLE = {
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript',
+    'application/javascript', 'application/json', 'application/x-ndjson',
+    'application/vnd.netzero.compact+json', 'image/svg+xml',
+}
+
+
+def compress(data, encoding, static=False):
+    """bytes 압축 (정적 파일은 시작 시 한 번만 하므로 최고 압축률 사용)"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if static else 5)
+    return gzip.compress(data, compresslevel=9 if static else 6, mtime=0)
+
+
+def compressible(mimetype):
+    """압축할 형식 여부 (텍스트 형식만, 이미 압축된 이미지/폰트/보관 파일 제외)"""
+    return mimetype in COMPRESSIBLE
+
+
+def accepted_encoding(encodings):
+    """Accept-Encoding 중 사용할 인코딩 (br 우선, 없으면 None)"""
+    for encoding in encodings:
+        if request.accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+class Compression:
+    """정적 파일 압축본/해시 URL과 동적 응답 압축"""
+
+    def __init__(self, min_size=MIN_SIZE):
+        self.min_size = min_size
+        self.encodings = ('br', 'gzip') if brotli else ('gzip',)
+        self.static_files = {}  # 정적 파일 상대 경로 → {'hash', 'mimetype', 인코딩: 압축본}
+        self._bodies = OrderedDict()
+        self._lock = threading.Lock()
+        self._static_view = None
+
+    def init_app(self, app):
+        """정적 파일 압축본 생성 및 url_for/정적 파일 라우트/응답 훅 등록"""
+        self.build_static(app.static_folder)
+        app.url_defaults(self._static_url_defaults)
+        self._static_view = app.view_functions['static']
+        app.view_functions['static'] = self._serve_static
+        app.after_request(self._after_request)
+
+    def build_static(self, folder):
+        """정적 파일마다 내용 해시와 (압축 가능한 형식이고 효과가 있으면) 압축본 생성"""
+        self.static_files = {}
+        if not folder or not os.path.isdir(folder):
+            return
+        for root, _, files in os.walk(folder):
+            for name in files:
+                path = os.path.join(root, name)
+                with open(path, 'rb') as f:
+                    data = f.read()
+                mimetype, file_encoding = mimetypes.guess_type(name)
+                entry = {
+                    'hash': hashlib.sha256(data).hexdigest()[:12],
+                    'mimetype': mimetype or 'application/octet-stream',
+                }
+                relative = os.path.relpath(path, folder).replace(os.sep, '/')
+                self.static_files[relative] = entry
+                if file_encoding or not compressible(entry['mimetype']):
+                    continue  # 이미 압축된 형식 (PNG, JPEG, woff2, .gz 등)
+                for encoding in self.encodings:
+                    compressed = compress(data, encoding, static=True)
+                    if len(compressed) < len(data) * MIN_RATIO:
+                        entry[encoding] = compressed
+
+    # --- 정적 파일 ---
+
+    def _static_url_defaults(self, endpoint, values):
+        """url_for('static', filename=...)에 내용 해시 추가"""
+        if endpoint == 'static' and 'v' not in values:
+            entry = self.static_files.get(values.get('filename'))
+            if entry:
+                values['v'] = entry['hash']
+
+    def _serve_static(self, filename):
+        """정적 파일 응답 (압축본이 있으면 압축본, 해시가 맞으면 장기 캐시)"""
+        entry = self.static_files.get(filename)
+        if entry is None:
+            return self._static_view(filename=filename)
+
+        encoding = accepted_encoding([e for e in self.encodings if e in entry])
+        if encoding:
+            response = current_app.response_class(entry[encoding], mimetype=entry['mimetype'])
+            response.headers['Content-Encoding'] = encoding
+            response.set_etag(f"{entry['hash']}-{encoding}")
+        else:
+            response = self._static_view(filename=filename)
+            response.set_etag(entry['hash'])
+        response.vary.add('Accept-Encoding')
+
+        if request.args.get('v') == entry['hash']:
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = STATIC_MAX_AGE
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+        return response.make_conditional(request)
+
+    # --- 동적 응답 ---
+
+    def _compressed_body(self, body, encoding):
+        """본문 압축 (최근에 압축한 같은 본문이면 재사용)"""
+        key = (hashlib.sha1(body).digest(), encoding)
+        with self._lock:
+            cached = self._bodies.get(key)
+            if cached is not None:
+                self._bodies.move_to_end(key)
+                return cached
+        compressed = compress(body, encoding)
+        with self._lock:
+            self._bodies[key] = compressed
+            while len(self._bodies) > BODY_CACHE_SIZE:
+                self._bodies.popitem(last=False)
+        return compressed
+
+    def _after_request(self, response):
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers
+                or not compressible(response.mimetype)):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = accepted_encoding(self.encodings)
+        if encoding is None:
+            return response
+        body = response.get_data()
+        if len(body) < self.min_size:
+            return response
+
+        response.set_data(self._compressed_body(body, encoding))
+        response.headers['Content-Encoding'] = encoding
+        # 같은 ETag를 압축 여부와 관계없이 쓰도록 약한 ETag로 변경
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
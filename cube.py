@@ -0,0 +1,117 @@
+# 사전 계산 결과 큐브: 슬라이더 격자 전체의 누적 배출량을 .npy로 저장하고 np.memmap으로 조회
+#
+# 격자: 목표연도 2040-2050 × r35/r40/r45 0-100 (정수 %) = 11 × 101 × 101 × 101 (약 91MB, float64)
+# 파일을 메모리 매핑하므로 여러 gunicorn 워커가 같은 페이지 캐시를 복사 없이 공유한다.
+# 탄소예산은 초과량 계산(max(0, 누적 - 예산))에만 쓰이므로 큐브 축에 포함하지 않는다.
+#
+# 사용법:
+#   python cube.py              # data/emission_cube.npy 생성
+#   python cube.py -o PATH      # 다른 경로에 생성
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+import engine
+
+CUBE_FILE = os.path.join('data', 'emission_cube.npy')
+TARGET_YEARS = np.arange(2040, 2051)
+RATES = np.arange(0, 101)
+SHAPE = (len(TARGET_YEARS), len(RATES), len(RATES), len(RATES))
+
+
+def build(path=CUBE_FILE):
+    """큐브 생성 (임시 파일에 쓴 뒤 교체하므로 실행 중인 서버는 이전 파일을 계속 사용)"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        cube = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float64, shape=SHAPE)
+        r40, r45 = np.meshgrid(RATES, RATES, indexing='ij')
+        for i, target_year in enumerate(TARGET_YEARS):
+            for r35 in RATES:
+                # 실시간 계산과 같은 값이 되도록 calculate_batch로 계산 (r40 × r45 평면 단위)
+                result = engine.calculate_batch(0.0, target_year, r35, r40.ravel(), r45.ravel())
+                cube[i, r35] = result['total_emission'].reshape(len(RATES), len(RATES))
+        cube.flush()
+        del cube
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class ResultCube:
+    """누적 배출량 큐브 조회 (격자 밖의 값은 실시간 계산)"""
+
+    def __init__(self, path=CUBE_FILE):
+        self.path = path
+        self.cube = None
+        try:
+            cube = np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            return
+        if cube.shape != SHAPE or not self._matches_engine(cube):
+            print(f"결과 큐브가 현재 계산 엔진과 맞지 않아 사용하지 않습니다: {path} (python cube.py로 다시 생성)")
+            return
+        self.cube = cube
+
+    @property
+    def loaded(self):
+        return self.cube is not None
+
+    @staticmethod
+    def _matches_engine(cube):
+        """표본 몇 개를 실시간 계산과 비교 (엔진이 바뀐 뒤 만든 적 없는 큐브를 걸러냄)"""
+        samples = np.array([[0, 0, 0, 0], [10, 100, 100, 100], [5, 50, 70, 85], [3, 17, 64, 99]])
+        live = engine.calculate_batch(0.0, TARGET_YEARS[samples[:, 0]], *samples[:, 1:].T)['total_emission']
+        return np.array_equal(cube[tuple(samples.T)], live)
+
+    def grid_index(self, target_year, r35, r40, r45):
+        """격자 위에 있는 시나리오의 마스크와 큐브 인덱스"""
+        rates = [np.asarray(r, dtype=float) for r in (r35, r40, r45)]
+        target_year = np.asarray(target_year, dtype=np.int64)
+        mask = (target_year >= TARGET_YEARS[0]) & (target_year <= TARGET_YEARS[-1])
+        for r in rates:
+            mask &= (r == np.round(r)) & (r >= RATES[0]) & (r <= RATES[-1])
+        index = (np.where(mask, target_year - TARGET_YEARS[0], 0),
+                 *(np.where(mask, r, 0).astype(np.int64) for r in rates))
+        return mask, index
+
+    def total_emission(self, budget, target_year, r35, r40, r45):
+        """누적 배출량과 탄소예산 초과량 (engine.calculate_batch와 같은 값)"""
+        budget, target_year, r35, r40, r45 = engine.as_batch(budget, target_year, r35, r40, r45)
+        if self.cube is None:
+            total = engine.calculate_batch(budget, target_year, r35, r40, r45)['total_emission']
+        else:
+            mask, index = self.grid_index(target_year, r35, r40, r45)
+            total = np.empty(len(budget))
+            total[mask] = self.cube[tuple(i[mask] for i in index)]
+            if not mask.all():
+                off = ~mask
+                total[off] = engine.calculate_batch(
+                    budget[off], target_year[off], r35[off], r40[off], r45[off]
+                )['total_emission']
+        return {
+            'target_year': target_year,
+            'total_emission': total,
+            'over_emission': np.maximum(0, total - budget)
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='누적 배출량 결과 큐브 생성')
+    default = os.path.join(os.path.dirname(os.path.abspath(__file__)), CUBE_FILE)
+    parser.add_argument('-o', '--output', default=default, help=f'저장 경로 (기본 {CUBE_FILE})')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    build(args.output)
+    size = os.path.getsize(args.output) / 1e6
+    print(f'결과 큐브 생성: {args.output} ({size:.1f}MB, {time.perf_counter() - started:.1f}초)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,358 @@
+# 탄소중립 경로 계산 엔진 (NumPy 벡터화)
+import numpy as np
+
+# 고정 데이터 (2018-2030)
+FIXED_DATA = {
+    2018: 6.591, 2019: 6.361, 2020: 5.874, 2021: 6.131,
+    2022: 5.974, 2023: 5.995, 2024: 5.912, 2025: 5.841,
+    2026: 5.702, 2027: 5.533, 2028: 5.302, 2029: 5.008, 2030: 4.129
+}
+
+BASE_EMISSION = 6.591  # 2018년 기준 배출량
+
+START_YEAR = 2018        # 데이터 시작 연도
+SCENARIO_START_YEAR = 2030  # 시나리오(보간) 시작 연도
+CUMULATIVE_START_YEAR = 2020  # 누적 배출량 집계 시작 연도
+MILESTONE_YEARS = (2035, 2040, 2045)
+PARAM_KEYS = ('budget', 'target_year', 'r35', 'r40', 'r45')  # 시나리오 설정 항목
+
+MAX_BATCH_SIZE = 1_000_000  # 한 번에 계산할 수 있는 최대 시나리오 수
+
+# 기준점 사이 구간의 형태
+# linear: 직선, exponential: 일정 비율 감소 (끝값이 0이면 직선), logistic: S자 곡선, spline: 단조 3차 스플라인
+SHAPES = ('linear', 'exponential', 'logistic', 'spline')
+LOGISTIC_STEEPNESS = 10.0  # S자 곡선의 기울기 (클수록 구간 중앙에서 급격히 변화)
+
+# 2018-2029 고정 배출량 배열 및 2020-2029 누적값 (한 번만 계산)
+FIXED_YEARS = np.arange(START_YEAR, SCENARIO_START_YEAR)
+FIXED_VALUES = np.array([FIXED_DATA[year] for year in FIXED_YEARS])
+FIXED_CUMULATIVE = float(FIXED_VALUES[FIXED_YEARS >= CUMULATIVE_START_YEAR].sum())
+
+
+def broadcast(*params):
+    """파라미터를 같은 길이의 1차원 float 배열로 변환 (스칼라는 브로드캐스트)"""
+    arrays = [np.atleast_1d(np.asarray(x, dtype=float)) for x in params]
+    if any(a.ndim != 1 for a in arrays):
+        raise ValueError('파라미터는 스칼라 또는 1차원 배열이어야 합니다.')
+    arrays = np.broadcast_arrays(*arrays)
+    if arrays[0].size > MAX_BATCH_SIZE:
+        raise ValueError(f'한 번에 최대 {MAX_BATCH_SIZE}개의 시나리오만 계산할 수 있습니다.')
+    if not all(np.isfinite(a).all() for a in arrays):
+        raise ValueError('파라미터에 유효하지 않은 값(NaN/Inf)이 있습니다.')
+    return arrays
+
+
+def as_batch(budget, target_year, r35, r40, r45):
+    """입력 파라미터를 같은 길이의 1차원 배열로 변환 (스칼라는 브로드캐스트)"""
+    budget, target_year, r35, r40, r45 = broadcast(budget, target_year, r35, r40, r45)
+    return budget, target_year.astype(np.int64), r35, r40, r45
+
+
+def as_milestones(milestones, shapes=None):
+    """기준연도 설정 검증 및 정규화
+
+    milestones는 {연도: 2018년 대비 감축률(%)}, shapes는 구간 형태 하나 또는
+    구간별 목록 (2030→첫 기준연도, ..., 마지막 기준연도→목표연도 순, 기준연도 수 + 1개).
+    정렬된 기준연도, 감축률 목록, 구간 형태 코드 배열을 반환한다.
+    """
+    years = sorted(int(year) for year in milestones)
+    if len(set(years)) != len(years):
+        raise ValueError('기준연도가 중복되었습니다.')
+    if years and years[0] <= SCENARIO_START_YEAR:
+        raise ValueError(f'기준연도는 {SCENARIO_START_YEAR}년 이후여야 합니다.')
+    rates = [milestones[year] if year in milestones else milestones[str(year)] for year in years]
+
+    shapes = 'linear' if shapes is None else shapes
+    if isinstance(shapes, str):
+        shapes = [shapes] * (len(years) + 1)
+    if len(shapes) != len(years) + 1:
+        raise ValueError(f'구간 형태는 {len(years) + 1}개(기준연도 수 + 1)여야 합니다.')
+    unknown = [shape for shape in shapes if shape not in SHAPES]
+    if unknown:
+        raise ValueError(f'지원하지 않는 구간 형태입니다: {unknown[0]} ({", ".join(SHAPES)} 중 선택)')
+    return years, rates, np.array([SHAPES.index(shape) for shape in shapes])
+
+
+def default_milestones(r35, r40, r45):
+    """기본 기준연도 설정 (2035/2040/2045년 감축률)"""
+    return dict(zip(MILESTONE_YEARS, (r35, r40, r45)))
+
+
+def is_default_pathway(milestones, shapes):
+    """기본 경로(2035/2040/2045년 기준, 직선 구간)인지 (기존 선형 커널과 누적 가중치 사용 가능)"""
+    if milestones is not None and sorted(int(year) for year in milestones) != list(MILESTONE_YEARS):
+        return False
+    if shapes is None:
+        return True
+    return all(shape == 'linear' for shape in ([shapes] if isinstance(shapes, str) else shapes))
+
+
+def milestone_values(target_year, r35, r40, r45, ndc_2030=None, base=None):
+    """기준연도(2030/2035/2040/2045) 배출량 목표값 (시나리오 × 1)
+
+    목표연도와 겹치는 기준연도는 0으로 설정한다. ndc_2030을 지정하면
+    고정 데이터 대신 시나리오별 2030년 배출량을 사용한다. base는 감축률의 기준 배출량.
+    """
+    target_year = np.asarray(target_year)[:, None]
+    ndc_2030 = FIXED_DATA[2030] if ndc_2030 is None else np.asarray(ndc_2030)[:, None]
+    base = BASE_EMISSION if base is None else np.asarray(base)[:, None]
+    t30 = np.where(target_year == 2030, 0.0, ndc_2030)
+    t35 = np.where(target_year == 2035, 0.0, base * (1 - np.asarray(r35)[:, None] / 100))
+    t40 = np.where(target_year == 2040, 0.0, base * (1 - np.asarray(r40)[:, None] / 100))
+    t45 = np.where(target_year == 2045, 0.0, base * (1 - np.asarray(r45)[:, None] / 100))
+    return t30, t35, t40, t45
+
+
+def interpolate_pathways(target_year, t30, t35, t40, t45, years):
+    """기준연도 목표값을 선형 보간하여 연도별 배출량 행렬 계산 (시나리오 × 연도)
+
+    목표연도 이후의 값은 0으로 채운다.
+    """
+    target_year = np.asarray(target_year)[:, None]
+    years = np.asarray(years)[None, :]
+
+    # 2045-목표연도 구간의 분모 (해당 구간이 없으면 1로 대체)
+    tail_span = np.where(target_year > 2045, target_year - 2045, 1)
+
+    values = np.select(
+        [years <= 2035, years <= 2040, years <= 2045],
+        [
+            t30 + (t35 - t30) * ((years - 2030) / 5),
+            t35 + (t40 - t35) * ((years - 2035) / 5),
+            t40 + (t45 - t40) * ((years - 2040) / 5),
+        ],
+        default=t45 * (1 - ((years - 2045) / tail_span))
+    )
+    return np.where(years <= target_year, values, 0.0)
+
+
+def pathway_knots(target_year, milestone_years, rates, ndc_2030=None, base=None):
+    """경로의 기준점 (연도, 배출량) 행렬 (시나리오 × (기준연도 수 + 2))
+
+    2030년 배출량에서 시작하여 각 기준연도를 지나고, 목표연도가 마지막 기준연도보다 늦으면
+    목표연도에 0이 된다 (기존 선형 경로와 같은 규칙, 목표연도와 겹치는 기준점은 0).
+    마지막 기준점이 필요 없으면 마지막 기준연도를 한 번 더 넣어 길이가 0인 구간으로 둔다.
+    감축률의 기준 배출량은 base (기본: 2018년 국가 배출량, 시나리오별 배열 가능).
+    """
+    target_year = np.asarray(target_year)[:, None]
+    n = len(target_year)
+    ndc_2030 = FIXED_DATA[2030] if ndc_2030 is None else np.asarray(ndc_2030)[:, None]
+    base = BASE_EMISSION if base is None else np.asarray(base)[:, None]
+
+    milestone_years = np.asarray(milestone_years, dtype=np.int64).reshape(1, -1)
+    values = np.where(milestone_years == target_year, 0.0, base * (1 - np.asarray(rates).reshape(n, -1) / 100))
+    first_value = np.broadcast_to(np.where(target_year == SCENARIO_START_YEAR, 0.0, ndc_2030), (n, 1))
+
+    last_year = milestone_years[:, -1:] if milestone_years.size else np.full((1, 1), SCENARIO_START_YEAR)
+    last_value = values[:, -1:] if milestone_years.size else first_value
+    has_tail = target_year > last_year
+
+    knot_years = np.hstack([
+        np.full((n, 1), SCENARIO_START_YEAR),
+        np.broadcast_to(milestone_years, (n, milestone_years.shape[1])),
+        np.where(has_tail, target_year, last_year)
+    ])
+    knot_values = np.hstack([first_value, values, np.where(has_tail, 0.0, last_value)])
+    return knot_years, knot_values
+
+
+def _spline_slopes(knot_years, knot_values):
+    """단조 3차 에르미트 스플라인(PCHIP)의 기준점별 기울기 (시나리오 × 기준점)"""
+    h = np.diff(knot_years, axis=1).astype(float)
+    delta = np.divide(np.diff(knot_values, axis=1), h, out=np.zeros_like(h), where=h > 0)
+
+    slopes = np.empty(knot_values.shape)
+    slopes[:, 0] = delta[:, 0]
+    slopes[:, -1] = delta[:, -1]
+
+    # 내부 기준점: 양쪽 기울기의 가중 조화평균 (부호가 다르거나 0이면 0으로 두어 단조성 유지)
+    h0, h1, d0, d1 = h[:, :-1], h[:, 1:], delta[:, :-1], delta[:, 1:]
+    w0, w1 = 2 * h1 + h0, h1 + 2 * h0
+    same_sign = d0 * d1 > 0
+    denominator = np.where(same_sign, w0 / np.where(same_sign, d0, 1) + w1 / np.where(same_sign, d1, 1), 1)
+    slopes[:, 1:-1] = np.where(same_sign, (w0 + w1) / denominator, 0.0)
+    return slopes
+
+
+def interpolate_knots(target_year, knot_years, knot_values, shape_codes, years):
+    """기준점 사이를 구간별 형태로 보간하여 연도별 배출량 행렬 계산 (시나리오 × 연도)
+
+    shape_codes는 구간별 SHAPES 인덱스 (기준점 수 - 1개). target_year 이후의 값은 0으로 채운다.
+    """
+    years = np.asarray(years)
+
+    # 연도가 속한 구간 s (x[s] < 연도 <= x[s+1], 첫 연도는 0번 구간)
+    # 마지막 기준점(목표연도)을 제외한 기준연도는 모든 시나리오가 같으므로 1차원으로 한 번만 찾는다
+    segment = np.searchsorted(knot_years[0, 1:-1], years, side='left')
+
+    def at(array, offset=0):
+        return array[:, segment + offset]
+
+    x0 = knot_years[0, segment]
+    x1, y0, y1 = at(knot_years, 1), at(knot_values), at(knot_values, 1)
+    span = x1 - x0
+    fraction = np.divide(years - x0, span, out=np.ones(span.shape), where=span > 0)
+
+    # 구간 형태는 연도(열)별로 정해지므로 형태마다 해당 열만 계산
+    column_shapes = np.asarray(shape_codes)[segment]
+    used = np.unique(column_shapes)
+    if len(used) == 1:
+        return _shaped(used[0], target_year, years, knot_years, knot_values, segment, span, fraction, y0, y1)
+
+    values = np.empty(span.shape)
+    for code in used:
+        columns = column_shapes == code
+        values[:, columns] = _shaped(code, target_year, years[columns], knot_years, knot_values,
+                                     segment[columns], span[:, columns], fraction[:, columns],
+                                     y0[:, columns], y1[:, columns])
+    return values
+
+
+def _shaped(code, target_year, years, knot_years, knot_values, segment, span, fraction, y0, y1):
+    """구간 형태 하나로 보간한 배출량 (목표연도 이후는 0)"""
+    if code == 1:
+        # 일정 비율 감소: y0 * (y1 / y0) ** t (양 끝값이 양수일 때만, 아니면 직선)
+        positive = (y0 > 0) & (y1 > 0)
+        ratio = np.divide(y1, y0, out=np.ones(span.shape), where=positive)
+        values = np.where(positive, y0 * ratio ** fraction, y0 + (y1 - y0) * fraction)
+    elif code == 2:
+        # 로지스틱 곡선을 구간 양 끝이 0과 1이 되도록 정규화
+        low, high = (1 / (1 + np.exp(LOGISTIC_STEEPNESS * sign / 2)) for sign in (1, -1))
+        curve = (1 / (1 + np.exp(-LOGISTIC_STEEPNESS * (fraction - 0.5))) - low) / (high - low)
+        values = y0 + (y1 - y0) * curve
+    elif code == 3:
+        # 3차 에르미트 다항식 계수를 구간 단위(시나리오 × 구간)로 계산한 뒤 연도별로 모아 호너 방식으로 평가
+        slopes = _spline_slopes(knot_years, knot_values)
+        h = np.diff(knot_years, axis=1)
+        m0, m1 = slopes[:, :-1] * h, slopes[:, 1:] * h
+        dy = np.diff(knot_values, axis=1)
+        c2 = (3 * dy - 2 * m0 - m1)[:, segment]
+        c3 = (m0 + m1 - 2 * dy)[:, segment]
+        values = y0 + fraction * (m0[:, segment] + fraction * (c2 + fraction * c3))
+    else:
+        values = y0 + (y1 - y0) * fraction
+    return np.where(years[None, :] <= np.asarray(target_year)[:, None], values, 0.0)
+
+
+def custom_pathways(target_year, milestone_years, rates, shape_codes, years, ndc_2030=None, base=None):
+    """임의의 기준연도와 구간 형태로 2030년 이후 연도별 배출량 행렬 계산 (시나리오 × 연도)"""
+    knot_years, knot_values = pathway_knots(target_year, milestone_years, rates, ndc_2030, base)
+    return interpolate_knots(target_year, knot_years, knot_values, shape_codes, years)
+
+
+def scenario_pathways(target_year, r35, r40, r45, years, ndc_2030=None, base=None):
+    """2030년 이후 연도별 배출량 행렬 계산 (시나리오 × 연도)"""
+    return interpolate_pathways(target_year, *milestone_values(target_year, r35, r40, r45, ndc_2030, base), years)
+
+
+def pathway_length(target_year):
+    """2018년부터 목표연도까지의 연도 수 (목표연도가 2030년 이전이면 2029년까지)"""
+    return max(int(target_year), SCENARIO_START_YEAR - 1) - START_YEAR + 1
+
+
+def cumulative_weights(target_year):
+    """누적 배출량에 대한 기준연도 목표값의 가중치 (시나리오 × 4)
+
+    경로가 기준연도 목표값 (t30, t35, t40, t45)에 대해 선형이므로
+    누적 배출량 = FIXED_CUMULATIVE + weights @ (t30, t35, t40, t45) 로 계산할 수 있다.
+    """
+    target_year = np.atleast_1d(np.asarray(target_year, dtype=np.int64))
+    last_year = max(int(target_year.max(initial=SCENARIO_START_YEAR)), SCENARIO_START_YEAR)
+    years = np.arange(SCENARIO_START_YEAR, last_year + 1)
+
+    unit = np.eye(4)
+    weights = [
+        interpolate_pathways(target_year, *unit[k][:, None, None], years).sum(axis=1)
+        for k in range(4)
+    ]
+    return np.stack(weights, axis=1)
+
+
+def milestone_pathways(target_year, milestone_years, rates, shape_codes, years, ndc_2030=None, base=None):
+    """기준연도 설정에 따른 2030년 이후 연도별 배출량 행렬 (시나리오 × 연도)
+
+    rates는 기준연도별 감축률 배열 목록. 기본 경로(2035/2040/2045년, 직선 구간)는
+    기존 선형 커널로 계산하여 결과가 누적 가중치(cumulative_weights)와 일치하도록 한다.
+    """
+    if tuple(milestone_years) == MILESTONE_YEARS and not np.any(shape_codes):
+        return scenario_pathways(target_year, *rates, years, ndc_2030, base)
+    rates = np.stack(rates, axis=1) if len(rates) else np.zeros((len(target_year), 0))
+    return custom_pathways(target_year, milestone_years, rates, shape_codes, years, ndc_2030, base)
+
+
+def inventory_anchors(inventory, n):
+    """인벤토리의 2018-2029년 배출량, 시나리오별 2030년 배출량과 기준 배출량 (inventory가 None이면 국가 고정 데이터)
+
+    inventory는 fixed_values/ndc_2030/base_emission 속성을 가진 객체 (inventory.Inventory).
+    """
+    if inventory is None:
+        return FIXED_VALUES, None, None
+    return (np.asarray(inventory.fixed_values, dtype=float),
+            np.full(n, inventory.ndc_2030), np.full(n, inventory.base_emission))
+
+
+def inventory_constants(inventory):
+    """인벤토리의 2020-2029년 누적 배출량, 2030년 배출량, 기준 배출량 (inventory가 None이면 국가 고정 데이터)
+
+    누적 배출량이 기준연도 목표값에 대해 선형임을 이용하는 분석(역산, 민감도, 파레토, 몬테카를로)에서 사용한다.
+    """
+    if inventory is None:
+        return FIXED_CUMULATIVE, FIXED_DATA[SCENARIO_START_YEAR], BASE_EMISSION
+    fixed_values = np.asarray(inventory.fixed_values, dtype=float)
+    return (float(fixed_values[FIXED_YEARS >= CUMULATIVE_START_YEAR].sum()),
+            inventory.ndc_2030, inventory.base_emission)
+
+
+def calculate_scenario(budget, target_year, r35=None, r40=None, r45=None, milestones=None, shapes=None,
+                       inventory=None):
+    """단일 시나리오 계산 (2030년-목표연도의 [{'year', 'value'}] 목록)
+
+    milestones({연도: 감축률})를 지정하면 r35/r40/r45 대신 사용한다. shapes는 구간 형태.
+    inventory를 지정하면 국가 고정 데이터 대신 그 지역/가스의 2030년 배출량과 기준 배출량을 사용한다.
+    """
+    if milestones is None:
+        milestones = default_milestones(r35, r40, r45)
+    milestone_years, rates, shape_codes = as_milestones(milestones, shapes)
+
+    target_year = int(target_year)
+    years = np.arange(SCENARIO_START_YEAR, target_year + 1)
+    rates = [np.array([float(rate)]) for rate in rates]
+    _, ndc_2030, base = inventory_anchors(inventory, 1)
+    values = milestone_pathways([target_year], milestone_years, rates, shape_codes, years, ndc_2030, base)[0]
+    return [{'year': year, 'value': value} for year, value in zip(years.tolist(), values.tolist())]
+
+
+def calculate_batch(budget, target_year, r35=None, r40=None, r45=None, milestones=None, shapes=None,
+                    inventory=None):
+    """여러 시나리오를 한 번에 계산
+
+    각 파라미터는 스칼라 또는 같은 길이의 배열. 연도별 경로(2018-최대 목표연도),
+    2020년 이후 누적 배출량과 탄소예산 초과량을 배열로 반환한다.
+    milestones({연도: 감축률 스칼라 또는 배열})를 지정하면 r35/r40/r45 대신 사용한다.
+    inventory를 지정하면 국가 고정 데이터 대신 그 지역/가스의 과거 배출량을 사용한다.
+    """
+    if milestones is None:
+        milestones = default_milestones(r35, r40, r45)
+    milestone_years, rates, shape_codes = as_milestones(milestones, shapes)
+    budget, target_year, *rates = broadcast(budget, target_year, *rates)
+    target_year = target_year.astype(np.int64)
+
+    last_year = max(int(target_year.max(initial=SCENARIO_START_YEAR)), SCENARIO_START_YEAR)
+    scenario_years = np.arange(SCENARIO_START_YEAR, last_year + 1)
+    fixed_values, ndc_2030, base = inventory_anchors(inventory, len(budget))
+    scenario = milestone_pathways(target_year, milestone_years, rates, shape_codes, scenario_years, ndc_2030, base)
+
+    pathways = np.concatenate([np.broadcast_to(fixed_values, (len(budget), len(fixed_values))), scenario], axis=1)
+
+    # 누적 배출량 계산 (2020-목표연도)
+    # 단건 계산(sum)과 같은 결과가 나오도록 연도 순서대로 누적
+    total_emission = np.cumsum(pathways[:, CUMULATIVE_START_YEAR - START_YEAR:], axis=1)[:, -1]
+    over_emission = np.maximum(0, total_emission - budget)
+
+    return {
+        'years': np.arange(START_YEAR, last_year + 1),
+        'target_year': target_year,
+        'pathways': pathways,
+        'total_emission': total_emission,
+        'over_emission': over_emission
+    }
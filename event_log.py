@@ -0,0 +1,318 @@
+# 이용 통계 이벤트 로그: 방문/계산을 날짜별 추가 전용 로그에 기록하고 일/주/월 집계로 압축
+#
+# events/
+#   2025-06-30.ndjson     # 그날의 이벤트 (한 줄에 하나, 추가만 함)
+#   .rollups.sqlite3      # 일/주/월 집계, 파라미터 조합별 집계, 로그 파일별 압축 위치
+#
+# 기록은 메모리에 모았다가 주기적으로 로그 파일 끝에 덧붙이고, 압축은 각 파일에서
+# 마지막으로 읽은 위치 이후의 줄만 읽어 집계에 더한다. 관리자 통계는 조회 구간을
+# 월/주/일 집계 몇 개로 나누어 읽으므로 기록이 쌓여도 조회 비용이 늘지 않는다.
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from fileutil import file_lock, read_json
+
+FLUSH_INTERVAL = 5.0     # 초, 메모리의 이벤트를 로그 파일에 덧붙이는 주기
+COMPACT_INTERVAL = 60.0  # 초, 로그를 집계에 반영하는 주기
+KINDS = ('visit', 'calculate')
+PERIODS = ('day', 'week', 'month')
+LOG_SUFFIX = '.ndjson'
+INDEX_FILE = '.rollups.sqlite3'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS counts (
+    period TEXT NOT NULL,
+    start TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (period, start, kind)
+);
+CREATE TABLE IF NOT EXISTS combos (
+    period TEXT NOT NULL,
+    start TEXT NOT NULL,
+    combo TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (period, start, combo)
+);
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,
+    offset INTEGER NOT NULL,
+    closed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+UPSERT_COUNT = """
+INSERT INTO counts (period, start, kind, count) VALUES (?, ?, ?, ?)
+ON CONFLICT (period, start, kind) DO UPDATE SET count = count + excluded.count
+"""
+UPSERT_COMBO = """
+INSERT INTO combos (period, start, combo, count) VALUES (?, ?, ?, ?)
+ON CONFLICT (period, start, combo) DO UPDATE SET count = count + excluded.count
+"""
+
+
+def period_starts(day):
+    """날짜가 속한 일/주(월요일 시작)/월 집계의 시작일"""
+    return {
+        'day': day.isoformat(),
+        'week': (day - timedelta(days=day.weekday())).isoformat(),
+        'month': day.replace(day=1).isoformat(),
+    }
+
+
+def _next_month(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def cover(start, end):
+    """[start, end] 구간을 가장 적은 수의 월/주/일 집계로 나눔 (집계별 시작일 목록)
+
+    달 전체가 들어가면 월 집계, 같은 달 안의 온전한 주는 주 집계, 나머지는 일 집계를 쓴다.
+    """
+    keys = {period: [] for period in PERIODS}
+    day = start
+    while day <= end:
+        month_end = _next_month(day) - timedelta(days=1)
+        if day.day == 1 and month_end <= end:
+            keys['month'].append(day.isoformat())
+            day = month_end + timedelta(days=1)
+        elif day.weekday() == 0 and day + timedelta(days=6) <= min(end, month_end):
+            keys['week'].append(day.isoformat())
+            day += timedelta(days=7)
+        else:
+            keys['day'].append(day.isoformat())
+            day += timedelta(days=1)
+    return keys
+
+
+class EventLog:
+    """방문/계산 이벤트 기록과 집계 조회
+
+    record()는 메모리에만 쌓고, 백그라운드 스레드가 flush_interval마다 로그 파일에 덧붙이며
+    compact_interval마다 집계에 반영한다. 여러 gunicorn 워커가 같은 디렉토리를 쓰도록
+    파일 추가와 압축은 파일 잠금 아래에서 수행한다.
+    """
+
+    def __init__(self, directory='events', flush_interval=FLUSH_INTERVAL,
+                 compact_interval=COMPACT_INTERVAL, legacy_stats=None):
+        self.directory = directory
+        self.db_path = os.path.join(directory, INDEX_FILE)
+        self.lock_file = os.path.join(directory, '.lock')
+        self.flush_interval = flush_interval
+        self.compact_interval = compact_interval
+        self.legacy_stats = legacy_stats
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._schema_ready = False
+        self._thread = None
+        self._stop = threading.Event()
+
+    # --- 기록 ---
+
+    def record(self, kind, combo=None, when=None):
+        """이벤트 1건 기록 (디스크 I/O 없음). combo는 계산 파라미터 조합 문자열"""
+        if kind not in KINDS:
+            raise ValueError(f'알 수 없는 이벤트: {kind}')
+        when = time.time() if when is None else when
+        event = {'t': round(when, 3), 'k': kind}
+        if combo is not None:
+            event['p'] = combo
+        with self._lock:
+            self._pending.append(event)
+            if self._thread is None:
+                self._start()
+
+    def flush(self):
+        """메모리의 이벤트를 날짜별 로그 파일에 덧붙임"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return
+            lines = {}
+            for event in pending:
+                name = date.fromtimestamp(event['t']).isoformat() + LOG_SUFFIX
+                lines.setdefault(name, []).append(json.dumps(event, ensure_ascii=False, separators=(',', ':')))
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with file_lock(self.lock_file):
+                    for name, day_lines in lines.items():
+                        with open(os.path.join(self.directory, name), 'a', encoding='utf-8') as f:
+                            f.write('\n'.join(day_lines) + '\n')
+            except Exception as e:
+                # 저장 실패 시 다음 주기에 다시 시도
+                with self._lock:
+                    self._pending[:0] = pending
+                print(f"이벤트 로그 저장 오류: {e}")
+
+    # --- 압축 ---
+
+    def _connect(self):
+        os.makedirs(self.directory, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        if not self._schema_ready:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+            with conn:
+                self._import_legacy(conn)
+            self._schema_ready = True
+        return conn
+
+    def _import_legacy(self, conn):
+        """기존 stats.json의 일별 방문자 수를 집계에 한 번만 옮김"""
+        if not self.legacy_stats:
+            return
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_imported'").fetchone():
+            return
+        for day, data in read_json(self.legacy_stats).items():
+            try:
+                starts = period_starts(date.fromisoformat(day))
+                visits = int(data.get('visits', 0))
+            except (ValueError, TypeError, AttributeError):
+                continue
+            for period in PERIODS:
+                conn.execute(UPSERT_COUNT, (period, starts[period], 'visit', visits))
+        conn.execute("INSERT INTO meta VALUES ('legacy_imported', ?)", (datetime.now().isoformat(),))
+
+    def compact(self):
+        """로그 파일에서 아직 반영하지 않은 줄을 일/주/월 집계에 더함"""
+        self.flush()
+        if not os.path.isdir(self.directory):
+            return
+        # 이틀 이상 지난 파일은 다 읽은 뒤 닫음 (자정 직후 늦게 도착한 이벤트까지 반영)
+        close_before = (date.today() - timedelta(days=1)).isoformat()
+        with file_lock(self.lock_file):
+            conn = self._connect()
+            try:
+                with conn:
+                    done = {row['name']: (row['offset'], row['closed']) for row in conn.execute('SELECT * FROM files')}
+                    for name in sorted(os.listdir(self.directory)):
+                        if not name.endswith(LOG_SUFFIX) or done.get(name, (0, 0))[1]:
+                            continue
+                        offset = done.get(name, (0, 0))[0]
+                        offset = self._compact_file(conn, name, offset)
+                        closed = int(name[:-len(LOG_SUFFIX)] < close_before)
+                        conn.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?)', (name, offset, closed))
+            finally:
+                conn.close()
+
+    def _compact_file(self, conn, name, offset):
+        """파일 하나의 offset 이후 완성된 줄을 집계하고 새 offset 반환"""
+        path = os.path.join(self.directory, name)
+        if os.path.getsize(path) <= offset:
+            return offset
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b'\n') + 1  # 쓰는 중인 마지막 줄은 다음 압축에서 읽음
+        counts, combos = {}, {}
+        for line in data[:end].splitlines():
+            try:
+                event = json.loads(line)
+                starts = period_starts(date.fromtimestamp(event['t']))
+                kind = event['k']
+            except (ValueError, KeyError, TypeError):
+                continue
+            for period in PERIODS:
+                key = (period, starts[period], kind)
+                counts[key] = counts.get(key, 0) + 1
+                if event.get('p') is not None:
+                    key = (period, starts[period], event['p'])
+                    combos[key] = combos.get(key, 0) + 1
+        conn.executemany(UPSERT_COUNT, [(*key, count) for key, count in counts.items()])
+        conn.executemany(UPSERT_COMBO, [(*key, count) for key, count in combos.items()])
+        return offset + end
+
+    # --- 조회 ---
+
+    def _query(self, sql, params=()):
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _cover_condition(start, end):
+        """구간을 덮는 집계를 고르는 WHERE 조건"""
+        conditions, params = [], []
+        for period, starts in cover(start, end).items():
+            if starts:
+                conditions.append(f"(period = ? AND start IN ({', '.join('?' * len(starts))}))")
+                params += [period, *starts]
+        return ' OR '.join(conditions) or '0', params
+
+    def first_day(self):
+        """기록이 있는 첫 날 (없으면 None)"""
+        row = self._query("SELECT MIN(start) FROM counts WHERE period = 'day'")[0]
+        return date.fromisoformat(row[0]) if row[0] else None
+
+    def totals(self, start, end):
+        """구간 [start, end]의 이벤트 종류별 합계"""
+        where, params = self._cover_condition(start, end)
+        rows = self._query(f'SELECT kind, SUM(count) FROM counts WHERE {where} GROUP BY kind', params)
+        return {**{kind: 0 for kind in KINDS}, **{row[0]: row[1] for row in rows}}
+
+    def top_combos(self, start, end, limit=10):
+        """구간 [start, end]에서 가장 많이 계산한 파라미터 조합"""
+        where, params = self._cover_condition(start, end)
+        rows = self._query(
+            f'SELECT combo, SUM(count) AS total FROM combos WHERE {where} '
+            f'GROUP BY combo ORDER BY total DESC, combo LIMIT ?', [*params, limit]
+        )
+        return [{'combo': row[0], 'count': row[1]} for row in rows]
+
+    def series(self, period, start, end):
+        """구간 [start, end]의 일/주/월별 이벤트 수 (기록이 없는 기간은 0)"""
+        if period not in PERIODS:
+            raise ValueError(f'지원하지 않는 집계 단위입니다: {period} ({", ".join(PERIODS)} 중 선택)')
+        first, last = period_starts(start)[period], period_starts(end)[period]
+        rows = self._query('SELECT start, kind, count FROM counts WHERE period = ? AND start BETWEEN ? AND ?',
+                           (period, first, last))
+        values = {}
+        for row in rows:
+            values.setdefault(row['start'], {})[row['kind']] = row['count']
+
+        result = []
+        day = date.fromisoformat(first)
+        while day.isoformat() <= last:
+            key = day.isoformat()
+            result.append({'start': key, **{kind: values.get(key, {}).get(kind, 0) for kind in KINDS}})
+            day = {'day': day + timedelta(days=1), 'week': day + timedelta(days=7), 'month': _next_month(day)}[period]
+        return result
+
+    # --- 백그라운드 ---
+
+    def close(self):
+        """백그라운드 저장 중지 및 남은 이벤트 저장"""
+        self._stop.set()
+        self.flush()
+
+    def _start(self):
+        """첫 기록 시 백그라운드 스레드 시작 (gunicorn fork 이후 워커마다 시작됨)"""
+        self._thread = threading.Thread(target=self._run, name='event-log-flush', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        last_compact = time.monotonic()
+        while not self._stop.wait(self.flush_interval):
+            if time.monotonic() - last_compact >= self.compact_interval:
+                last_compact = time.monotonic()
+                try:
+                    self.compact()
+                except Exception as e:
+                    print(f"이벤트 로그 압축 오류: {e}")
+            else:
+                self.flush()
@@ -0,0 +1,255 @@
+# 지역/가스별 배출량 인벤토리: CSV/JSON 파일을 한 번만 읽어 .npy 캐시로 저장하고 np.memmap으로 조회
+#
+# inventories/ 폴더의 파일 형식 (배출량 단위는 engine과 같은 억tCO₂eq):
+#   CSV  - region,gas,year,value 열 (한 행에 연도 하나)
+#   JSON - {"region", "gas", "series": {연도: 값}, "base_emission"(선택), "ndc_2030"(선택)} 또는 그 목록
+# 지역/가스마다 2018-2030년 값이 모두 있어야 한다. 2030년 값이 NDC 목표(시나리오 시작점)이고,
+# 감축률의 기준 배출량(base_emission)은 지정하지 않으면 2018년 값이다.
+# 기본 인벤토리(국가 전체 온실가스, KR/GHG)는 파일에 KR/GHG 항목이 있으면 그 값을 쓰고,
+# 없으면 engine.py의 고정 데이터를 사용한다 (새 인벤토리가 나와도 코드를 고치지 않도록).
+#
+# 원본 파일 이름/크기/수정 시각으로 만든 버전이 캐시 파일 이름에 들어가므로, 파일이 바뀌면
+# 다음 조회 때 새 캐시를 만들고 이전 캐시는 지운다. 캐시는 메모리 매핑하므로 여러 gunicorn
+# 워커가 같은 페이지 캐시를 복사 없이 공유하고, 요청마다 파일을 다시 읽지 않는다.
+import csv
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+import engine
+
+INVENTORY_DIR = 'inventories'
+CACHE_DIR = 'data'
+CACHE_PREFIX = 'inventory-'
+CHECK_INTERVAL = 1.0  # 초, 원본 파일 변경 여부를 확인하는 최소 간격
+DEFAULT_REGION = 'KR'
+DEFAULT_GAS = 'GHG'
+YEARS = np.arange(engine.START_YEAR, engine.SCENARIO_START_YEAR + 1)  # 2018-2030
+
+
+class Inventory:
+    """지역/가스 하나의 과거 배출량과 2030 NDC (engine.calculate_batch의 inventory 인자)"""
+
+    def __init__(self, region, gas, base_emission, values, source=None, version=None):
+        self.region = region
+        self.gas = gas
+        self.base_emission = float(base_emission)
+        self.values = values  # 2018-2030년 배출량
+        self.fixed_values = values[:-1]  # 2018-2029년 (engine.FIXED_VALUES와 같은 구간)
+        self.ndc_2030 = float(values[-1])
+        self.source = source
+        self.version = version
+
+    @property
+    def key(self):
+        """계산 결과 캐시 키에 붙일 값 (인벤토리 파일이 바뀌면 달라짐)"""
+        return (self.region, self.gas, self.version)
+
+    @property
+    def fixed_data(self):
+        """{연도: 배출량} (engine.FIXED_DATA와 같은 형식)"""
+        return dict(zip(YEARS.tolist(), np.asarray(self.values).tolist()))
+
+    def describe(self):
+        return {
+            'region': self.region,
+            'gas': self.gas,
+            'base_emission': self.base_emission,
+            'ndc_2030': self.ndc_2030,
+            'source': self.source,
+        }
+
+
+DEFAULT = Inventory(DEFAULT_REGION, DEFAULT_GAS, engine.BASE_EMISSION,
+                    np.array([engine.FIXED_DATA[year] for year in YEARS.tolist()]), source='engine.py')
+
+
+def _entry(region, gas, series, base_emission=None, ndc_2030=None):
+    """검증한 (지역, 가스, [기준 배출량, 2018-2030년 배출량])"""
+    region, gas = str(region or '').strip(), str(gas or '').strip()
+    if not region or not gas:
+        raise ValueError('region과 gas가 필요합니다.')
+    series = {int(year): float(value) for year, value in series.items()}
+    if ndc_2030 is not None:
+        series[engine.SCENARIO_START_YEAR] = float(ndc_2030)
+    missing = [year for year in YEARS.tolist() if year not in series]
+    if missing:
+        raise ValueError(f'{region}/{gas}: {missing[0]}년 배출량이 없습니다 '
+                         f'({YEARS[0]}-{YEARS[-1]}년이 모두 필요합니다).')
+    row = [series[engine.START_YEAR] if base_emission is None else float(base_emission)]
+    row += [series[year] for year in YEARS.tolist()]
+    if not all(math.isfinite(value) and value >= 0 for value in row):
+        raise ValueError(f'{region}/{gas}: 배출량은 0 이상의 유한한 값이어야 합니다.')
+    if row[0] <= 0:
+        raise ValueError(f'{region}/{gas}: 기준 배출량은 0보다 커야 합니다.')
+    return region, gas, row
+
+
+def parse_csv(path):
+    """region,gas,year,value 형식 CSV의 항목 목록"""
+    series = {}
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        missing = {'region', 'gas', 'year', 'value'} - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f'CSV 열이 없습니다: {", ".join(sorted(missing))}')
+        for row in reader:
+            key = (row['region'].strip(), row['gas'].strip())
+            years = series.setdefault(key, {})
+            year = int(row['year'])
+            if year in years:
+                raise ValueError(f'{key[0]}/{key[1]}: {year}년 값이 중복되었습니다.')
+            years[year] = row['value']
+    return [_entry(region, gas, years) for (region, gas), years in series.items()]
+
+
+def parse_json(path):
+    """JSON 인벤토리(객체 하나 또는 목록)의 항목 목록"""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    items = data if isinstance(data, list) else [data]
+    return [_entry(item.get('region'), item.get('gas'), item.get('series') or {},
+                   item.get('base_emission'), item.get('ndc_2030')) for item in items]
+
+
+PARSERS = {'.csv': parse_csv, '.json': parse_json}
+
+
+def _write_atomic(path, write):
+    """임시 파일에 쓴 뒤 교체 (다른 워커가 쓰다 만 파일을 읽지 않도록)"""
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class Inventories:
+    """인벤토리 폴더의 지역/가스별 배출량 조회 (원본이 바뀌면 캐시를 다시 만듦)"""
+
+    def __init__(self, directory=INVENTORY_DIR, cache_dir=CACHE_DIR, check_interval=CHECK_INTERVAL):
+        self.directory = directory
+        self.cache_dir = cache_dir
+        self.check_interval = check_interval
+        self.version = None
+        self.errors = []
+        # (메모리 매핑한 (항목 × [기준 배출량, 2018-2030년]) 배열, (지역, 가스) → (행, 원본 파일 이름), 버전)
+        # 조회 중에 교체되어도 서로 맞는 값을 쓰도록 한 번에 교체
+        self._state = (None, {}, None)
+        self._checked = None
+        self._lock = threading.Lock()
+
+    def sources(self):
+        """원본 파일 [(이름, 크기, 수정 시각)] (이름순)"""
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return []
+        sources = []
+        for entry in entries:
+            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in PARSERS:
+                stat = entry.stat()
+                sources.append((entry.name, stat.st_size, stat.st_mtime_ns))
+        return sorted(sources)
+
+    def refresh(self, force=False):
+        """원본 파일이 바뀌었으면 캐시를 다시 만들거나 (다른 워커가 만든) 새 캐시를 불러옴"""
+        now = time.monotonic()
+        if not force and self._checked is not None and now - self._checked < self.check_interval:
+            return
+        with self._lock:
+            if not force and self._checked is not None and now - self._checked < self.check_interval:
+                return
+            sources = self.sources()
+            version = hashlib.sha1(repr(sources).encode('utf-8')).hexdigest()[:12]
+            if version != self.version:
+                self._load(version, sources)
+            self._checked = time.monotonic()
+
+    def _cache_path(self, version, extension):
+        return os.path.join(self.cache_dir, f'{CACHE_PREFIX}{version}{extension}')
+
+    def _load(self, version, sources):
+        if not sources:
+            values, meta = None, {'keys': [], 'errors': []}
+        else:
+            npy_path, meta_path = self._cache_path(version, '.npy'), self._cache_path(version, '.json')
+            if not os.path.exists(npy_path):
+                self._build(version, sources)
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            values = np.load(npy_path, mmap_mode='r') if meta['keys'] else None
+        index = {(region, gas): (row, source) for row, (region, gas, source) in enumerate(meta['keys'])}
+        self._state = (values, index, version)
+        self.errors = meta['errors']
+        self.version = version
+
+    def _build(self, version, sources):
+        """원본 파일을 모두 읽어 캐시 생성 (오류가 있는 파일은 건너뛰고 errors에 기록)"""
+        keys, rows, errors = [], [], []
+        seen = {}
+        for name, _, _ in sources:
+            path = os.path.join(self.directory, name)
+            try:
+                entries = PARSERS[os.path.splitext(name)[1].lower()](path)
+                for region, gas, _ in entries:
+                    if (region, gas) in seen:
+                        raise ValueError(f'{region}/{gas}: {seen[(region, gas)]}에 이미 있는 인벤토리입니다.')
+            except (OSError, ValueError, TypeError, AttributeError, KeyError) as e:
+                errors.append(f'{name}: {e}')
+                continue
+            for region, gas, row in entries:
+                seen[(region, gas)] = name
+                keys.append([region, gas, name])
+                rows.append(row)
+
+        # 메타데이터를 먼저 쓰고 배열을 마지막에 교체하므로, 배열이 있으면 캐시가 완성된 것
+        os.makedirs(self.cache_dir, exist_ok=True)
+        meta = json.dumps({'keys': keys, 'errors': errors}, ensure_ascii=False).encode('utf-8')
+        _write_atomic(self._cache_path(version, '.json'), lambda f: f.write(meta))
+        values = np.array(rows, dtype=np.float64).reshape(-1, len(YEARS) + 1)
+        _write_atomic(self._cache_path(version, '.npy'), lambda f: np.save(f, values))
+        self._prune(version)
+
+    def _prune(self, version):
+        """이전 버전의 캐시 파일 삭제 (다른 워커가 매핑 중이어도 파일 내용은 유지됨)"""
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(CACHE_PREFIX) and not name.startswith(f'{CACHE_PREFIX}{version}.'):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+    def get(self, region=None, gas=None):
+        """지역/가스의 인벤토리 (지정하지 않은 값은 기본값, 없으면 ValueError)
+
+        파일에 기본 지역/가스(KR/GHG) 항목이 없으면 engine.py의 고정 데이터(DEFAULT)를 반환한다.
+        """
+        region = DEFAULT_REGION if region is None else str(region).strip()
+        gas = DEFAULT_GAS if gas is None else str(gas).strip()
+        self.refresh()
+        values, index, version = self._state
+        if (region, gas) not in index:
+            if (region, gas) == (DEFAULT_REGION, DEFAULT_GAS):
+                return DEFAULT
+            raise ValueError(f'인벤토리가 없습니다: {region}/{gas}')
+        row, source = index[(region, gas)]
+        return Inventory(region, gas, values[row, 0], values[row, 1:], source, version)
+
+    def list(self):
+        """사용 가능한 인벤토리 목록 (파일에 없으면 engine.py의 기본 인벤토리 포함)"""
+        self.refresh()
+        values, index, version = self._state
+        loaded = [Inventory(region, gas, values[row, 0], values[row, 1:], source, version)
+                  for (region, gas), (row, source) in sorted(index.items())]
+        if (DEFAULT_REGION, DEFAULT_GAS) in index:
+            return loaded
+        return [DEFAULT] + loaded
@@ -0,0 +1,264 @@
+# 백그라운드 작업 큐: 오래 걸리는 계산(몬테카를로, 격자 스윕)을 요청 스레드 밖의 프로세스 풀에서 실행
+#
+# 작업 ID는 (종류, 파라미터)의 해시이므로 같은 작업을 다시 제출하면 기존 작업/결과를 그대로 사용한다.
+# 상태와 결과는 directory에 파일로 저장하므로 여러 gunicorn 워커와 서버 재시작 후에도 조회할 수 있다.
+#   {id}.json          상태 (status, progress, 시각, 오류)
+#   {id}.result.json   몬테카를로 결과
+#   {id}.result.{csv|ndjson}[.gz]  스윕 결과
+#   {id}.cancel        취소 요청 표시
+# 끝난 작업의 파일은 ttl초 뒤 새 작업을 제출할 때 삭제한다 (prune).
+#
+# 프로세스 풀은 gunicorn 스레드 워커 안에서 만들어지므로 fork 대신 montecarlo.START_METHOD
+# (forkserver, Windows는 spawn)로 작업 프로세스를 시작한다. 요청 스레드가 잡고 있던 잠금이
+# 작업 프로세스에 잠긴 채로 복사되지 않도록 하기 위함이다.
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import montecarlo
+import sweep
+from fileutil import read_json, write_json_atomic
+
+KINDS = ('monte_carlo', 'export_sweep')
+ACTIVE = ('queued', 'running')
+WORKERS = 2
+STALE_AFTER = 600          # 다른 프로세스의 미완료 작업을 중단된 것으로 보는 시간 (초, 진행률 갱신 기준)
+PROGRESS_INTERVAL = 0.5    # 진행률 저장 최소 간격 (초)
+TTL = 24 * 3600            # 끝난 작업의 상태/결과 파일 보관 시간 (초, 마지막 갱신 기준)
+PRUNE_INTERVAL = 600       # 오래된 작업 정리 최소 간격 (초)
+
+if montecarlo.START_METHOD == 'forkserver':
+    # 작업 프로세스가 _run_job을 찾을 때 이 모듈(montecarlo, sweep 포함)을 다시 import하지 않도록
+    multiprocessing.get_context('forkserver').set_forkserver_preload(['jobs'])
+
+
+class JobCancelled(Exception):
+    """취소 요청으로 중단된 작업"""
+
+
+def job_id(kind, params, inventory=None):
+    """작업 종류와 파라미터로 만든 작업 ID (같은 입력이면 같은 ID, 인벤토리 파일이 바뀌면 다른 ID)"""
+    key = None if inventory is None else list(inventory.key)
+    payload = json.dumps({'kind': kind, 'params': params, 'inventory': key}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+def validate(kind, params, inventory=None):
+    """제출 전 입력 검증 (잘못된 작업이 큐에 들어가지 않도록)"""
+    if kind == 'monte_carlo':
+        specs = {key: params[key] for key in montecarlo.PARAMS if key in params}
+        montecarlo.validate(specs, params.get('samples', 100_000),
+                            params.get('percentiles', montecarlo.DEFAULT_PERCENTILES), inventory)
+    elif kind == 'export_sweep':
+        sweep.stream(sweep.Grid(params, inventory), params.get('format', 'csv'), params.get('precision', 3))
+    else:
+        raise ValueError(f'지원하지 않는 작업입니다: {kind} ({", ".join(KINDS)} 중 선택)')
+
+
+def result_filename(job_id, kind, params):
+    """결과 파일 이름"""
+    if kind == 'monte_carlo':
+        return f'{job_id}.result.json'
+    filename = f"{job_id}.result.{params.get('format', 'csv')}"
+    return filename + '.gz' if params.get('gzip') else filename
+
+
+class _Reporter:
+    """작업 프로세스에서 진행률 저장과 취소 확인"""
+
+    def __init__(self, directory, job_id):
+        self.status_path = os.path.join(directory, f'{job_id}.json')
+        self.cancel_path = os.path.join(directory, f'{job_id}.cancel')
+        self.status = read_json(self.status_path)
+        self._saved = 0.0
+
+    def update(self, **fields):
+        self.status.update(fields, updated_at=time.time())
+        write_json_atomic(self.status_path, self.status)
+        self._saved = time.monotonic()
+
+    def progress(self, done, total):
+        if os.path.exists(self.cancel_path):
+            raise JobCancelled()
+        if done >= total or time.monotonic() - self._saved >= PROGRESS_INTERVAL:
+            self.update(progress=round(done / total, 4))
+
+
+def _run_job(directory, job_id, kind, params, inventory=None):
+    """작업 실행 (프로세스 풀에서 호출, 결과는 파일로 저장)"""
+    reporter = _Reporter(directory, job_id)
+    result_path = os.path.join(directory, result_filename(job_id, kind, params))
+    tmp_path = result_path + f'.{os.getpid()}.tmp'
+    try:
+        if os.path.exists(reporter.cancel_path):
+            raise JobCancelled()
+        reporter.update(status='running', started_at=datetime.now().isoformat())
+
+        if kind == 'monte_carlo':
+            specs = {key: params[key] for key in montecarlo.PARAMS if key in params}
+            result = montecarlo.run(
+                specs,
+                samples=params.get('samples', 100_000),
+                seed=params.get('seed'),
+                percentiles=params.get('percentiles', montecarlo.DEFAULT_PERCENTILES),
+                progress=reporter.progress,
+                inventory=inventory
+            )
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(montecarlo.summarize(result), f, ensure_ascii=False)
+        else:
+            grid = sweep.Grid(params, inventory)
+            chunks = sweep.stream(grid, params.get('format', 'csv'), params.get('precision', 3),
+                                  progress=reporter.progress)
+            if params.get('gzip'):
+                chunks = sweep.gzip_stream(chunks)
+            with open(tmp_path, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk if isinstance(chunk, bytes) else chunk.encode('utf-8'))
+
+        os.replace(tmp_path, result_path)
+        reporter.update(status='done', progress=1.0, finished_at=datetime.now().isoformat())
+    except JobCancelled:
+        reporter.update(status='cancelled', finished_at=datetime.now().isoformat())
+    except Exception as e:
+        reporter.update(status='failed', error=str(e), finished_at=datetime.now().isoformat())
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class JobQueue:
+    """프로세스 풀 기반 작업 큐 (제출/상태/결과/취소)"""
+
+    def __init__(self, directory='jobs', workers=WORKERS, ttl=TTL):
+        self.directory = directory
+        self.workers = workers
+        self.ttl = ttl
+        self._pruned = None
+        self._pool = None
+        self._pid = None
+        self._futures = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _executor(self):
+        """프로세스 풀 (처음 제출할 때 생성, gunicorn fork 이후 워커마다 새로 생성)"""
+        if self._pid != os.getpid():
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context(montecarlo.START_METHOD))
+            self._pid = os.getpid()
+            self._futures = {}
+        return self._pool
+
+    def submit(self, kind, params, inventory=None):
+        """작업 제출 (같은 작업이 진행 중이거나 완료되었으면 기존 상태 반환)
+
+        inventory를 지정하면 국가 고정 데이터 대신 그 인벤토리로 계산한다.
+        """
+        validate(kind, params, inventory)
+        if kind == 'monte_carlo':
+            params = {**params, 'workers': 1}  # 작업 프로세스 안에서 다시 풀을 만들지 않음
+        new_id = job_id(kind, params, inventory)
+
+        with self._lock:
+            pool = self._executor()
+            if self._pruned is None or time.monotonic() - self._pruned >= PRUNE_INTERVAL:
+                self._pruned = time.monotonic()
+                self.prune()
+            status = self.status(new_id)
+            if status and self._is_live(new_id, status):
+                return status
+
+            for name in (f'{new_id}.cancel', result_filename(new_id, kind, params)):
+                if os.path.exists(self._path(name)):
+                    os.remove(self._path(name))
+            status = {
+                'id': new_id,
+                'kind': kind,
+                'params': params,
+                'status': 'queued',
+                'progress': 0.0,
+                'submitted_at': datetime.now().isoformat(),
+                'updated_at': time.time()
+            }
+            write_json_atomic(self._path(f'{new_id}.json'), status)
+            self._futures[new_id] = pool.submit(_run_job, self.directory, new_id, kind, params, inventory)
+            self._futures[new_id].add_done_callback(lambda _, job=new_id: self._futures.pop(job, None))
+            return status
+
+    def _is_live(self, job_id, status):
+        """완료되었거나 아직 실행 중인 작업인지 (다시 제출할 필요가 없는지)"""
+        if status['status'] == 'done':
+            return os.path.exists(self._path(result_filename(job_id, status['kind'], status['params'])))
+        if status['status'] not in ACTIVE:
+            return False
+        if job_id in self._futures:
+            return True
+        # 다른 워커 프로세스의 작업: 최근에 갱신되었으면 진행 중으로 간주
+        return time.time() - status.get('updated_at', 0) < STALE_AFTER
+
+    def prune(self, ttl=None):
+        """ttl초 동안 갱신되지 않은 작업의 상태/결과 파일 삭제 (삭제한 작업 수)
+
+        이 프로세스에서 실행 중인 작업은 건드리지 않는다. 다른 워커의 미완료 작업도 ttl이
+        STALE_AFTER보다 길면 이미 중단된 것으로 보는 작업이다. 상태 파일이 없는 결과/임시 파일은
+        수정 시각으로 판단한다.
+        """
+        cutoff = time.time() - (self.ttl if ttl is None else ttl)
+        entries = [entry for entry in os.scandir(self.directory) if _valid_id(entry.name.split('.', 1)[0])]
+        statuses = {entry.name[:-len('.json')]: read_json(entry.path)
+                    for entry in entries if len(entry.name) == 32 + len('.json') and entry.name.endswith('.json')}
+        expired = {job for job, status in statuses.items()
+                   if job not in self._futures and status.get('updated_at', 0) < cutoff}
+        for entry in entries:
+            job = entry.name.split('.', 1)[0]
+            try:
+                if job in expired or (job not in statuses and entry.stat().st_mtime < cutoff):
+                    os.remove(entry.path)
+            except OSError:
+                pass
+        return len(expired)
+
+    def status(self, job_id):
+        """작업 상태 (없으면 None)"""
+        if not _valid_id(job_id):
+            return None
+        status = read_json(self._path(f'{job_id}.json'))
+        return status or None
+
+    def result_path(self, job_id):
+        """완료된 작업의 결과 파일 경로 (완료되지 않았으면 None)"""
+        status = self.status(job_id)
+        if not status or status['status'] != 'done':
+            return None
+        path = self._path(result_filename(job_id, status['kind'], status['params']))
+        return path if os.path.exists(path) else None
+
+    def cancel(self, job_id):
+        """작업 취소 (대기 중이면 즉시, 실행 중이면 다음 진행률 확인 시점에 중단)"""
+        with self._lock:
+            status = self.status(job_id)
+            if not status or status['status'] not in ACTIVE:
+                return status
+            future = self._futures.get(job_id)
+            if future is not None and future.cancel():
+                status.update(status='cancelled', finished_at=datetime.now().isoformat(), updated_at=time.time())
+                write_json_atomic(self._path(f'{job_id}.json'), status)
+                return status
+            # 실행 중이거나 다른 워커 프로세스의 작업: 표시 파일로 취소 요청
+            with open(self._path(f'{job_id}.cancel'), 'w', encoding='utf-8'):
+                pass
+            return {**status, 'cancel_requested': True}
+
+
+def _valid_id(job_id):
+    """작업 ID 형식 확인 (경로 조작 방지)"""
+    return len(job_id) == 32 and all(c in '0123456789abcdef' for c in job_id)
@@ -0,0 +1,244 @@
+# 슬라이더 실시간 계산 채널 (Server-Sent Events)
+#
+# 브라우저는 슬라이더를 움직이기 시작할 때 GET /live/stream으로 채널을 열고, 움직일 때마다
+# POST /live/<채널>로 파라미터만 보내며, 잠시 조작이 없으면 DELETE /live/<채널>로 닫는다. 서버는 채널마다 가장 최근 파라미터 하나만 보관하므로 빠르게 도착한 값은
+# 하나로 합쳐지고, 계산하는 동안 새 값이 도착하면 그 결과는 보내지 않고 최신 값을 다시 계산한다.
+# 결과는 이전에 보낸 경로와 달라진 연도만(diff) 또는 전체 경로(values)로 보낸다.
+#
+# 채널(스트림)은 연 워커 프로세스 메모리에 있다. 디렉토리(LIVE_DIR, 예: /dev/shm/netzero-live)를
+# 지정하면 채널마다 최신 파라미터 파일을 두어, 다른 gunicorn 워커로 간 업데이트도 파일에 쓰고
+# 채널을 연 워커가 이를 주기적으로 확인하여 계산한다. 지정하지 않은 다중 워커 환경에서는 다른 워커로 간
+# 업데이트가 404가 되어 브라우저가 채널을 닫고 일반 /calculate 요청으로 대신 계산한다.
+import json
+import os
+import re
+import threading
+import time
+import uuid
+
+from fileutil import read_json, write_json_atomic
+
+KEEPALIVE = 15.0       # 초, 업데이트가 없을 때 연결 유지용 주석을 보내는 간격
+IDLE_TIMEOUT = 120.0   # 초, 이 시간 동안 업데이트가 없으면 채널을 닫음 (페이지는 20초 뒤 스스로 닫음)
+MAX_CHANNELS = 16      # 동시에 열 수 있는 채널 수 (채널마다 스레드 하나를 점유하므로 워커 스레드 32개의 절반)
+POLL_INTERVAL = 0.02   # 초, 디렉토리를 지정했을 때 다른 워커가 쓴 파라미터 파일을 확인하는 간격
+CHANNEL_ID = re.compile(r'[0-9a-f]{32}')
+
+
+def sse(event, data, event_id=None):
+    """SSE 메시지 한 개"""
+    lines = [f'event: {event}']
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append('data: ' + json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+    return '\n'.join(lines) + '\n\n'
+
+
+def series_diff(previous, values):
+    """이전 경로 대비 바뀐 값의 [인덱스, 값] 목록 (길이가 다르거나 절반 이상 바뀌면 None)"""
+    if previous is None or len(previous) != len(values):
+        return None
+    changes = [[i, value] for i, (old, value) in enumerate(zip(previous, values)) if old != value]
+    if len(changes) * 2 >= len(values):
+        return None
+    return changes
+
+
+class LiveChannel:
+    """채널 하나의 최신 파라미터 (새 값이 오면 이전 값을 덮어씀)"""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.seq = 0
+        self.params = None
+        self.closed = False
+        self.last_update = time.monotonic()
+        self.shared_version = None  # 마지막으로 읽은 공유 파라미터 파일 (inode, mtime)
+        self.shared_touched = time.monotonic()
+        self._condition = threading.Condition()
+
+    def update(self, params):
+        """새 파라미터 저장 후 순번 반환"""
+        with self._condition:
+            self.seq += 1
+            self.params = params
+            self.last_update = time.monotonic()
+            self._condition.notify_all()
+            return self.seq
+
+    def wait(self, after_seq, timeout):
+        """after_seq 이후의 최신 (순번, 파라미터) (timeout 동안 없으면 None)"""
+        with self._condition:
+            self._condition.wait_for(lambda: self.seq > after_seq or self.closed, timeout)
+            if self.closed or self.seq <= after_seq:
+                return None
+            return self.seq, self.params
+
+    def close(self):
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+
+class LiveChannels:
+    """실시간 계산 채널 목록과 SSE 스트림
+
+    directory를 지정하면 채널마다 최신 파라미터 파일(<채널>.json)을 두어 여러 gunicorn 워커가
+    채널을 공유한다. 동시 채널 수는 워커별로 제한된다.
+    """
+
+    def __init__(self, max_channels=MAX_CHANNELS, keepalive=KEEPALIVE, idle_timeout=IDLE_TIMEOUT,
+                 directory=None, poll_interval=POLL_INTERVAL):
+        self.max_channels = max_channels
+        self.keepalive = keepalive
+        self.idle_timeout = idle_timeout
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self.dropped = 0  # 계산 중 새 값이 도착하여 버린 결과 수
+        self._channels = {}
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def open(self):
+        """새 채널 (동시 채널 수를 넘으면 RuntimeError)"""
+        with self._lock:
+            if len(self._channels) >= self.max_channels:
+                raise RuntimeError('실시간 계산 채널이 모두 사용 중입니다.')
+            channel = LiveChannel()
+            self._channels[channel.id] = channel
+        if self.directory:
+            self._prune_files()
+            write_json_atomic(self._path(channel.id), {})
+            channel.shared_version = self._file_version(channel.id)
+        return channel
+
+    def get(self, channel_id):
+        with self._lock:
+            return self._channels.get(channel_id)
+
+    def update(self, channel_id, params):
+        """채널에 새 파라미터 전달 후 순번 반환 (다른 워커의 채널이면 파일에 쓰고 None, 없으면 KeyError)"""
+        channel = self.get(channel_id)
+        if channel is not None:
+            return channel.update(params)
+        if self.directory and CHANNEL_ID.fullmatch(channel_id) and os.path.exists(self._path(channel_id)):
+            write_json_atomic(self._path(channel_id), {'params': params})
+            return None
+        raise KeyError(channel_id)
+
+    def close(self, channel_id):
+        with self._lock:
+            channel = self._channels.pop(channel_id, None)
+        if channel:
+            channel.close()
+        if self.directory and CHANNEL_ID.fullmatch(channel_id):
+            # 다른 워커의 채널이면 파일이 없어진 것을 보고 그 워커가 스트림을 닫음
+            try:
+                os.remove(self._path(channel_id))
+            except OSError:
+                pass
+
+    def __len__(self):
+        return len(self._channels)
+
+    def stream(self, channel, compute):
+        """채널의 SSE 스트림 (compute(params)는 'values' 경로를 포함한 결과 dict 반환)
+
+        업데이트를 기다렸다가 가장 최근 파라미터만 계산하고, 계산하는 동안 더 새로운 값이
+        도착했으면 결과를 버린다. 연결이 끊기거나 오래 쓰이지 않으면 채널을 닫는다.
+        """
+        try:
+            yield sse('ready', {'channel': channel.id})
+            previous, sent_seq = None, 0
+            while not channel.closed:
+                update = self._wait(channel, sent_seq)
+                if update is None:
+                    if time.monotonic() - channel.last_update > self.idle_timeout:
+                        break
+                    yield ': keepalive\n\n'
+                    continue
+
+                seq, params = update
+                try:
+                    result = compute(params)
+                except Exception as e:
+                    if channel.seq == seq:
+                        sent_seq = seq
+                        yield sse('failed', {'seq': seq, 'error': str(e)}, seq)
+                    continue
+                self._pull(channel)
+                if channel.seq != seq:
+                    with self._lock:
+                        self.dropped += 1
+                    continue
+
+                values = result.pop('values')
+                diff = series_diff(previous, values)
+                if diff is None:
+                    result['values'] = values
+                else:
+                    result['diff'] = diff
+                result['seq'] = seq
+                previous, sent_seq = values, seq
+                yield sse('result', result, seq)
+        finally:
+            self.close(channel.id)
+
+    def _wait(self, channel, after_seq):
+        """channel.wait()와 같되, 디렉토리를 지정했으면 기다리는 동안 다른 워커가 쓴 파라미터도 확인"""
+        if not self.directory:
+            return channel.wait(after_seq, self.keepalive)
+        deadline = time.monotonic() + self.keepalive
+        while True:
+            self._pull(channel)
+            remaining = deadline - time.monotonic()
+            update = channel.wait(after_seq, min(self.poll_interval, max(remaining, 0)))
+            if update is not None or channel.closed or remaining <= self.poll_interval:
+                return update
+
+    def _pull(self, channel):
+        """다른 워커가 파라미터 파일을 바꿨으면 채널에 반영 (파일이 지워졌으면 채널을 닫음)"""
+        if not self.directory:
+            return
+        version = self._file_version(channel.id)
+        if version is not None and time.monotonic() - channel.shared_touched > self.keepalive:
+            # 다른 워커가 종료된 워커의 파일로 보고 지우지 않도록 사용 중인 채널 파일의 시각 갱신
+            channel.shared_touched = time.monotonic()
+            try:
+                os.utime(self._path(channel.id))
+            except OSError:
+                pass
+            if version == channel.shared_version:
+                version = channel.shared_version = self._file_version(channel.id)
+        if version is None:
+            channel.close()
+        elif version != channel.shared_version:
+            channel.shared_version = version
+            data = read_json(self._path(channel.id))
+            if 'params' in data:
+                channel.update(data['params'])
+
+    def _path(self, channel_id):
+        return os.path.join(self.directory, f'{channel_id}.json')
+
+    def _file_version(self, channel_id):
+        try:
+            stat = os.stat(self._path(channel_id))
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _prune_files(self):
+        """종료된 워커가 남긴 채널 파일 삭제 (유휴 시간보다 오래 바뀌지 않은 파일)"""
+        cutoff = time.time() - self.idle_timeout - self.keepalive
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.name.endswith('.json') and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                continue
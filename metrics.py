@@ -0,0 +1,285 @@
+# 요청 지연시간/페이로드 크기 계측 및 Prometheus 텍스트 형식 출력
+import json
+import os
+import tempfile
+import threading
+import time
+
+from flask import g, request
+
+from fileutil import file_lock, read_json, write_json_atomic
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+FLUSH_INTERVAL = 5.0  # 워커별 스냅샷 저장 주기 (초)
+STALE_FLUSHES = 3     # 이 횟수만큼의 저장 주기 동안 갱신되지 않은 스냅샷은 종료된 워커의 것으로 봄
+ACCUMULATED = 'accumulated.json'  # 종료된 워커들의 누적값을 합산해 두는 파일
+
+PREFIX = 'netzero'
+
+# 히스토그램 이름 → (설명, 구간, 레이블 이름)
+HISTOGRAMS = {
+    'request_duration_seconds': ('요청 처리 시간', LATENCY_BUCKETS, ('endpoint', 'method')),
+    'request_size_bytes': ('요청 본문 크기', SIZE_BUCKETS, ('endpoint', 'method')),
+    'response_size_bytes': ('응답 본문 크기', SIZE_BUCKETS, ('endpoint', 'method')),
+    'stage_duration_seconds': ('요청 내부 단계별 처리 시간', LATENCY_BUCKETS, ('endpoint', 'stage')),
+}
+COUNTERS = {
+    'requests_total': ('처리한 요청 수', ('endpoint', 'method', 'status')),
+}
+
+
+class Metrics:
+    """요청 계측 및 Prometheus 형식 출력
+
+    directory를 지정하면 각 워커가 주기적으로 스냅샷을 {pid}.json으로 저장하고,
+    /metrics는 모든 워커의 스냅샷을 합산하여 출력한다. 종료되었거나 재시작 전 워커의
+    스냅샷은 accumulated.json에 더한 뒤 삭제하므로 워커가 바뀌어도 카운터가 줄지 않는다
+    (prometheus_client의 multiprocess 모드처럼 마지막 저장 이후의 값만 빠진다).
+    """
+
+    def __init__(self, directory=None, flush_interval=FLUSH_INTERVAL):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._histograms = {name: {} for name in HISTOGRAMS}
+        self._counters = {name: {} for name in COUNTERS}
+        self._collectors = []
+        self._thread = None
+        self._pid = None
+        self._flushed_pid = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def init_app(self, app):
+        """Flask 앱에 요청 계측 훅과 /metrics 라우트 등록"""
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule('/metrics', 'metrics', self._metrics_view)
+
+    def add_collector(self, name, help_text, func):
+        """스냅샷 시 값을 읽어 올 카운터 추가 (func는 현재 누적값 반환)"""
+        self._collectors.append((name, help_text, func))
+
+    def mark(self, stage):
+        """직전 mark(또는 요청 시작) 이후 경과 시간을 단계 stage의 처리 시간으로 기록
+
+        기록한 단계는 Server-Timing 헤더와 단계별 히스토그램에 반영된다.
+        """
+        now = time.perf_counter()
+        started = g.get('metrics_last_mark', g.get('metrics_started', now))
+        g.setdefault('metrics_stages', []).append((stage, now - started))
+        g.metrics_last_mark = now
+
+    def observe(self, name, labels, value):
+        """히스토그램에 값 기록"""
+        buckets = HISTOGRAMS[name][1]
+        with self._lock:
+            series = self._histograms[name].setdefault(labels, [[0] * (len(buckets) + 1), 0.0])
+            counts = series[0]
+            for i, upper in enumerate(buckets):
+                if value <= upper:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            series[1] += value
+
+    def increment(self, name, labels, amount=1):
+        """카운터 증가"""
+        with self._lock:
+            series = self._counters[name]
+            series[labels] = series.get(labels, 0) + amount
+
+    # --- Flask 훅 ---
+
+    def _before_request(self):
+        g.metrics_started = time.perf_counter()
+        if self.directory:
+            self._ensure_flusher()
+
+    def _after_request(self, response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        duration = time.perf_counter() - started
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        method = request.method
+
+        self.increment('requests_total', (endpoint, method, str(response.status_code)))
+        self.observe('request_duration_seconds', (endpoint, method), duration)
+        self.observe('request_size_bytes', (endpoint, method), request.content_length or 0)
+        # 스트리밍 응답은 길이를 구하면 본문을 모두 읽어 버리므로 제외
+        if not response.direct_passthrough and not response.is_streamed:
+            self.observe('response_size_bytes', (endpoint, method), response.calculate_content_length() or 0)
+
+        g.pop('metrics_last_mark', None)
+        stages = g.pop('metrics_stages', [])
+        for stage, stage_duration in stages:
+            self.observe('stage_duration_seconds', (endpoint, stage), stage_duration)
+        if stages:
+            timings = [f'{stage};dur={stage_duration * 1000:.3f}' for stage, stage_duration in stages]
+            timings.append(f'total;dur={duration * 1000:.3f}')
+            response.headers['Server-Timing'] = ', '.join(timings)
+        return response
+
+    def _metrics_view(self):
+        return self.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+    # --- 스냅샷 및 워커 간 합산 ---
+
+    def snapshot(self):
+        """현재 프로세스의 누적값 (JSON 직렬화 가능)"""
+        with self._lock:
+            data = {
+                'histograms': {name: [[list(labels), counts[:], total] for labels, (counts, total) in series.items()]
+                               for name, series in self._histograms.items()},
+                'counters': {name: [[list(labels), value] for labels, value in series.items()]
+                             for name, series in self._counters.items()},
+            }
+        data['collected'] = {name: func() for name, _, func in self._collectors}
+        return data
+
+    def flush(self):
+        """스냅샷을 공유 디렉토리에 원자적으로 저장"""
+        if not self.directory:
+            return
+        path = os.path.join(self.directory, f'{os.getpid()}.json')
+        if self._flushed_pid != os.getpid():
+            # 같은 PID를 쓰던 이전 워커의 스냅샷이 남아 있으면 덮어쓰기 전에 누적 파일에 더함
+            self._flushed_pid = os.getpid()
+            self._accumulate(path)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def _ensure_flusher(self):
+        """워커 프로세스마다 스냅샷 저장 스레드 시작 (fork 이후 pid가 바뀌면 다시 시작)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='metrics-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"메트릭 저장 오류: {e}")
+
+    def _snapshots(self):
+        """살아 있는 모든 워커의 스냅샷과 종료된 워커들의 누적값 (현재 프로세스는 최신값 사용)"""
+        if not self.directory:
+            return [self.snapshot()]
+        self.flush()
+        snapshots = []
+        for filename in os.listdir(self.directory):
+            if not filename.endswith('.json') or filename == ACCUMULATED:
+                continue
+            path = os.path.join(self.directory, filename)
+            try:
+                if self._is_stale(path, filename[:-len('.json')]):
+                    self._accumulate(path)
+                    continue
+                with open(path, 'r', encoding='utf-8') as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        snapshots.append(read_json(os.path.join(self.directory, ACCUMULATED)))
+        return snapshots
+
+    def _accumulate(self, path):
+        """종료된 워커의 스냅샷을 누적 파일에 더하고 삭제 (여러 워커가 동시에 더하지 않도록 잠금)"""
+        accumulated_path = os.path.join(self.directory, ACCUMULATED)
+        with file_lock(os.path.join(self.directory, '.accumulated.lock')):
+            if not os.path.exists(path):
+                return  # 다른 워커가 이미 더함
+            snapshot = read_json(path)
+            if snapshot:
+                write_json_atomic(accumulated_path, merge_snapshots([read_json(accumulated_path), snapshot]))
+            os.remove(path)
+
+    def _is_stale(self, path, pid):
+        """종료된 워커의 스냅샷 여부 (프로세스가 없거나, 저장 주기 여러 번 동안 갱신되지 않음)
+
+        살아 있는 워커는 요청이 없어도 flush_interval마다 스냅샷을 다시 쓰므로, 오래된 파일은
+        재시작 전 워커(PID가 재사용되었더라도)의 것이다.
+        """
+        if time.time() - os.path.getmtime(path) > self.flush_interval * STALE_FLUSHES:
+            return True
+        if os.name != 'posix' or not pid.isdigit():
+            return False
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:  # 다른 사용자의 프로세스 (살아 있음)
+            return False
+        return False
+
+    def render(self):
+        """Prometheus 텍스트 형식 출력 (모든 워커 합산)"""
+        histograms, counters, collected = _merge(self._snapshots())
+        lines = []
+        for name, (help_text, label_names) in COUNTERS.items():
+            lines += [f'# HELP {PREFIX}_{name} {help_text}', f'# TYPE {PREFIX}_{name} counter']
+            for labels, value in sorted(counters[name].items()):
+                lines.append(f'{PREFIX}_{name}{_labels(label_names, labels)} {value}')
+        for name, help_text, _ in self._collectors:
+            lines += [f'# HELP {PREFIX}_{name} {help_text}', f'# TYPE {PREFIX}_{name} counter',
+                      f'{PREFIX}_{name} {collected.get(name, 0)}']
+        for name, (help_text, buckets, label_names) in HISTOGRAMS.items():
+            lines += [f'# HELP {PREFIX}_{name} {help_text}', f'# TYPE {PREFIX}_{name} histogram']
+            for labels, (counts, total) in sorted(histograms[name].items()):
+                cumulative = 0
+                for upper, count in zip(list(buckets) + ['+Inf'], counts):
+                    cumulative += count
+                    le = upper if upper == '+Inf' else f'{upper:g}'
+                    lines.append(f'{PREFIX}_{name}_bucket{_labels(label_names + ("le",), labels + (le,))} {cumulative}')
+                lines.append(f'{PREFIX}_{name}_sum{_labels(label_names, labels)} {total}')
+                lines.append(f'{PREFIX}_{name}_count{_labels(label_names, labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+def _merge(snapshots):
+    """스냅샷들의 합 → (히스토그램, 카운터, 수집값) (레이블은 tuple)"""
+    histograms = {name: {} for name in HISTOGRAMS}
+    counters = {name: {} for name in COUNTERS}
+    collected = {}
+    for snap in snapshots:
+        for name, series in snap.get('histograms', {}).items():
+            for labels, counts, total in series:
+                merged = histograms.setdefault(name, {}).setdefault(tuple(labels), [[0] * len(counts), 0.0])
+                merged[0] = [a + b for a, b in zip(merged[0], counts)]
+                merged[1] += total
+        for name, series in snap.get('counters', {}).items():
+            for labels, value in series:
+                merged = counters.setdefault(name, {})
+                merged[tuple(labels)] = merged.get(tuple(labels), 0) + value
+        for name, value in snap.get('collected', {}).items():
+            collected[name] = collected.get(name, 0) + value
+    return histograms, counters, collected
+
+
+def merge_snapshots(snapshots):
+    """스냅샷들을 합산한 스냅샷 (snapshot()과 같은 형식)"""
+    histograms, counters, collected = _merge(snapshots)
+    return {
+        'histograms': {name: [[list(labels), counts, total] for labels, (counts, total) in series.items()]
+                       for name, series in histograms.items()},
+        'counters': {name: [[list(labels), value] for labels, value in series.items()]
+                     for name, series in counters.items()},
+        'collected': collected,
+    }
+
+
+def _labels(names, values):
+    """Prometheus 레이블 문자열"""
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for v in values)
+    return '{' + ','.join(f'{n}="{v}"' for n, v in zip(names, escaped)) + '}'
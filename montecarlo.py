@@ -0,0 +1,277 @@
+# 몬테카를로 불확실성 분석: 감축률·2030 NDC·탄소예산 분포에서 경로를 표본 추출하여 분위수 밴드 계산
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import engine
+
+PARAMS = ('budget', 'target_year', 'r35', 'r40', 'r45', 'ndc_2030')
+DEFAULTS = {
+    'budget': 87.4,
+    'target_year': 2050,
+    'r35': 50,
+    'r40': 70,
+    'r45': 85,
+    'ndc_2030': engine.FIXED_DATA[2030]
+}
+DISTRIBUTIONS = ('fixed', 'normal', 'uniform', 'triangular', 'choice')
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+CHUNK_SIZE = 50_000        # 청크당 표본 수 (메모리 사용량 제한)
+MAX_SAMPLES = 1_000_000
+WORKERS = 2                # 서버 프로세스마다 공유하는 시뮬레이션 프로세스 수 기본값
+
+# 작업 프로세스 시작 방식. gunicorn 스레드 워커에서 fork하면 다른 요청 스레드가 잡고 있던 잠금이
+# 잠긴 채로 자식에 복사될 수 있으므로, 단일 스레드인 forkserver에서 fork한다 (없으면 spawn, 예: Windows).
+# forkserver는 이 모듈(numpy, engine 포함)을 미리 읽어 두므로 작업 프로세스마다 다시 import하지 않는다.
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+if START_METHOD == 'forkserver':
+    multiprocessing.get_context(START_METHOD).set_forkserver_preload(['montecarlo'])
+
+# 분위수 계산용 히스토그램 (청크 결과를 합산할 수 있도록 구간을 고정, 인벤토리는 기준 배출량 비율로 조정)
+VALUE_BINS, VALUE_MAX = 4096, 2 * engine.BASE_EMISSION  # 연도별 배출량
+TOTAL_BINS, TOTAL_MAX = 8192, 400.0                      # 누적 배출량
+
+
+class SimulationPool:
+    """청크 병렬 계산용 프로세스 풀 (처음 사용할 때 생성, gunicorn fork 이후 워커마다 새로 생성)
+
+    요청마다 풀을 만들지 않도록 서버 프로세스 하나에 하나만 두고 모든 요청이 같이 쓴다.
+    workers가 1 이하이면 풀 없이 요청 스레드에서 계산한다.
+    """
+
+    def __init__(self, workers=WORKERS):
+        self.workers = max(1, int(workers))
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def executor(self):
+        """프로세스 풀 (workers가 1 이하이면 None)"""
+        if self.workers <= 1:
+            return None
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context(START_METHOD))
+                self._pid = os.getpid()
+            return self._pool
+
+
+def sample(spec, size, rng):
+    """분포 설정에 따라 표본 추출
+
+    spec은 숫자(고정값) 또는 {'type': 'normal', 'mean': .., 'std': ..},
+    {'type': 'uniform', 'low': .., 'high': ..}, {'type': 'triangular', 'low': .., 'mode': .., 'high': ..},
+    {'type': 'choice', 'values': [..], 'p': [..]} 형식.
+    """
+    if not isinstance(spec, dict):
+        return np.full(size, float(spec))
+
+    kind = spec.get('type', 'fixed')
+    if kind == 'fixed':
+        return np.full(size, float(spec['value']))
+    if kind == 'normal':
+        return rng.normal(float(spec['mean']), float(spec['std']), size)
+    if kind == 'uniform':
+        return rng.uniform(float(spec['low']), float(spec['high']), size)
+    if kind == 'triangular':
+        return rng.triangular(float(spec['low']), float(spec['mode']), float(spec['high']), size)
+    if kind == 'choice':
+        return rng.choice(np.asarray(spec['values'], dtype=float), size, p=spec.get('p'))
+    raise ValueError(f'지원하지 않는 분포입니다: {kind} ({", ".join(DISTRIBUTIONS)} 중 선택)')
+
+
+def max_target_year(spec):
+    """목표연도 분포의 최댓값 (연도 축 길이 결정용)"""
+    if not isinstance(spec, dict):
+        return int(round(float(spec)))
+    kind = spec.get('type', 'fixed')
+    if kind == 'fixed':
+        return int(round(float(spec['value'])))
+    if kind in ('uniform', 'triangular'):
+        return int(round(float(spec['high'])))
+    if kind == 'choice':
+        return int(round(max(float(v) for v in spec['values'])))
+    raise ValueError('목표연도는 fixed, uniform, triangular, choice 분포만 사용할 수 있습니다.')
+
+
+def _draw(specs, size, rng):
+    """모든 파라미터 표본 추출 (감축률은 0-100%, 배출량은 0 이상으로 제한)"""
+    draws = {key: sample(specs[key], size, rng) for key in PARAMS}
+    for key in ('r35', 'r40', 'r45'):
+        draws[key] = np.clip(draws[key], 0, 100)
+    draws['ndc_2030'] = np.maximum(draws['ndc_2030'], 0)
+    draws['target_year'] = np.rint(draws['target_year']).astype(np.int64)
+    return draws
+
+
+def _simulate_chunk(specs, size, seed, last_year, fixed_cumulative=engine.FIXED_CUMULATIVE,
+                    base=engine.BASE_EMISSION):
+    """청크 하나를 계산하여 합산 가능한 히스토그램과 집계값 반환"""
+    rng = np.random.default_rng(seed)
+    draws = _draw(specs, size, rng)
+
+    years = np.arange(engine.SCENARIO_START_YEAR, last_year + 1)
+    scenario = engine.scenario_pathways(
+        draws['target_year'], draws['r35'], draws['r40'], draws['r45'], years,
+        ndc_2030=draws['ndc_2030'], base=np.full(size, base)
+    )
+    total = fixed_cumulative + scenario.sum(axis=1)
+    value_max, total_max = _hist_range(base)
+
+    # 연도별 히스토그램을 한 번의 bincount로 계산 (연도 × 구간)
+    bins = np.minimum((scenario / value_max * VALUE_BINS).astype(np.int64), VALUE_BINS - 1)
+    flat = (bins + np.arange(len(years)) * VALUE_BINS).ravel()
+    value_hist = np.bincount(flat, minlength=len(years) * VALUE_BINS).reshape(len(years), VALUE_BINS)
+
+    total_bins = np.clip((total / total_max * TOTAL_BINS).astype(np.int64), 0, TOTAL_BINS - 1)
+    total_hist = np.bincount(total_bins, minlength=TOTAL_BINS)
+
+    return {
+        'value_hist': value_hist,
+        'value_min': scenario.min(axis=0),
+        'value_max': scenario.max(axis=0),
+        'total_hist': total_hist,
+        'total_min': float(total.min()),
+        'total_max': float(total.max()),
+        'total_sum': float(total.sum()),
+        'within': int((total <= draws['budget']).sum())
+    }
+
+
+def _hist_range(base):
+    """기준 배출량에 맞춘 연도별/누적 배출량 히스토그램 상한"""
+    scale = base / engine.BASE_EMISSION
+    return VALUE_MAX * scale, TOTAL_MAX * scale
+
+
+def _quantiles(hist, upper, percentiles):
+    """히스토그램(행 단위)에서 구간 내 선형 보간으로 분위수 계산 (행 × 분위수)"""
+    hist = np.atleast_2d(hist)
+    width = upper / hist.shape[1]
+    cdf = np.cumsum(hist, axis=1)
+    count = cdf[:, -1:]
+    result = np.empty((hist.shape[0], len(percentiles)))
+    for j, q in enumerate(percentiles):
+        rank = count[:, 0] * q / 100
+        idx = np.minimum((cdf < rank[:, None]).sum(axis=1), hist.shape[1] - 1)
+        below = np.where(idx > 0, cdf[np.arange(len(idx)), idx - 1], 0)
+        in_bin = hist[np.arange(len(idx)), idx]
+        fraction = np.where(in_bin > 0, (rank - below) / np.maximum(in_bin, 1), 0)
+        result[:, j] = (idx + fraction) * width
+    return result
+
+
+def validate(specs, samples, percentiles, inventory=None):
+    """입력 검증 및 정규화 (생략한 파라미터는 기본값으로 채운 specs, 표본 수, 분위수 반환)
+
+    inventory를 지정하면 ndc_2030 기본값은 그 인벤토리의 2030년 배출량이다.
+    """
+    unknown = set(specs) - set(PARAMS)
+    if unknown:
+        raise ValueError(f'알 수 없는 파라미터: {", ".join(sorted(unknown))}')
+    samples = int(samples)
+    if not 0 < samples <= MAX_SAMPLES:
+        raise ValueError(f'표본 수는 1 이상 {MAX_SAMPLES} 이하여야 합니다.')
+    percentiles = [float(q) for q in percentiles]
+    if any(not 0 <= q <= 100 for q in percentiles):
+        raise ValueError('분위수는 0-100 사이여야 합니다.')
+
+    defaults = DEFAULTS if inventory is None else {**DEFAULTS, 'ndc_2030': inventory.ndc_2030}
+    specs = {key: specs.get(key, defaults[key]) for key in PARAMS}
+    _draw(specs, 1, np.random.default_rng(0))  # 분포 설정 오류를 미리 확인
+    max_target_year(specs['target_year'])
+    return specs, samples, percentiles
+
+
+def run(specs, samples=100_000, seed=None, percentiles=DEFAULT_PERCENTILES, workers=1, progress=None,
+        inventory=None, pool=None):
+    """몬테카를로 시뮬레이션
+
+    specs는 파라미터별 분포 설정 (생략한 파라미터는 기본값으로 고정).
+    inventory를 지정하면 국가 고정 데이터 대신 그 인벤토리로 계산한다.
+    CHUNK_SIZE 단위로 나누어 계산하고, pool(SimulationPool)을 지정하면 그 프로세스 풀에서,
+    아니면 workers > 1일 때 이번 실행용 프로세스 풀을 만들어 병렬 실행한다.
+    progress를 지정하면 청크가 끝날 때마다 progress(완료 청크 수, 전체 청크 수)를 호출한다.
+    연도별 분위수 밴드, 누적 배출량 분위수, 탄소예산 이내 확률을 반환한다.
+    """
+    specs, samples, percentiles = validate(specs, samples, percentiles, inventory)
+    fixed_values, _, _ = engine.inventory_anchors(inventory, 0)
+    fixed_cumulative, _, base = engine.inventory_constants(inventory)
+    last_year = max(max_target_year(specs['target_year']), engine.SCENARIO_START_YEAR)
+
+    sizes = [CHUNK_SIZE] * (samples // CHUNK_SIZE)
+    if samples % CHUNK_SIZE:
+        sizes.append(samples % CHUNK_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(specs, size, chunk_seed, last_year, fixed_cumulative, base) for size, chunk_seed in zip(sizes, seeds)]
+
+    chunks = []
+    workers = max(1, min(int(workers), len(tasks), os.cpu_count() or 1))
+    executor = pool.executor() if pool is not None and len(tasks) > 1 else None
+    if executor is not None:
+        for chunk in executor.map(_simulate_chunk, *zip(*tasks)):
+            chunks.append(chunk)
+            if progress:
+                progress(len(chunks), len(tasks))
+    elif pool is None and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(START_METHOD)) as owned:
+            for chunk in owned.map(_simulate_chunk, *zip(*tasks)):
+                chunks.append(chunk)
+                if progress:
+                    progress(len(chunks), len(tasks))
+    else:
+        for task in tasks:
+            chunks.append(_simulate_chunk(*task))
+            if progress:
+                progress(len(chunks), len(tasks))
+
+    value_hist = sum(chunk['value_hist'] for chunk in chunks)
+    total_hist = sum(chunk['total_hist'] for chunk in chunks)
+
+    # 히스토그램 분위수를 실제 최솟값/최댓값 범위로 제한 (구간 폭만큼의 오차 보정)
+    value_min = np.min([chunk['value_min'] for chunk in chunks], axis=0)[:, None]
+    value_max = np.max([chunk['value_max'] for chunk in chunks], axis=0)[:, None]
+    hist_value_max, hist_total_max = _hist_range(base)
+    scenario_bands = np.clip(_quantiles(value_hist, hist_value_max, percentiles), value_min, value_max)
+    total_bands = np.clip(
+        _quantiles(total_hist, hist_total_max, percentiles)[0],
+        min(chunk['total_min'] for chunk in chunks),
+        max(chunk['total_max'] for chunk in chunks)
+    )
+
+    # 2030년 이전은 고정값이므로 모든 분위수가 같다
+    fixed_bands = np.repeat(fixed_values[:, None], len(percentiles), axis=1)
+    bands = np.vstack([fixed_bands, scenario_bands])
+
+    return {
+        'samples': samples,
+        'years': np.arange(engine.START_YEAR, last_year + 1),
+        'percentiles': percentiles,
+        'bands': bands,
+        'total_emission_mean': sum(chunk['total_sum'] for chunk in chunks) / samples,
+        'total_emission_percentiles': total_bands,
+        'probability_within_budget': sum(chunk['within'] for chunk in chunks) / samples
+    }
+
+
+def summarize(result):
+    """run() 결과를 JSON 응답 형식으로 변환 (값은 소수점 3자리, 확률은 4자리)"""
+    percentiles = result['percentiles']
+    return {
+        'samples': result['samples'],
+        'years': result['years'].tolist(),
+        'percentiles': percentiles,
+        'bands': {f'{q:g}': [round(v, 3) for v in result['bands'][:, j].tolist()]
+                  for j, q in enumerate(percentiles)},
+        'total_emission': {
+            'mean': round(result['total_emission_mean'], 3),
+            'percentiles': {f'{q:g}': round(float(v), 3)
+                            for q, v in zip(percentiles, result['total_emission_percentiles'])}
+        },
+        'probability_within_budget': round(result['probability_within_budget'], 4)
+    }
@@ -0,0 +1,134 @@
+# 다목적 경로 최적화: 탄소예산 초과량과 최대 연간 감축률(선택: 초기 감축 부담)의 파레토 최적 경로 탐색
+import numpy as np
+
+import engine
+import solver
+
+STEP = 5.0                     # 감축률 격자 간격 기본값 (%p)
+MAX_CANDIDATES = 2_000_000     # 한 번에 평가할 수 있는 최대 후보 수
+PRECISION = 9                  # 목적값 비교 시 반올림 자릿수 (부동소수점 오차로 인한 가짜 우열 방지)
+OBJECTIVES = ('over_emission', 'max_reduction', 'early_effort')
+
+
+def pareto_mask(first, second, levels=None):
+    """비지배 해 마스크 (모든 목적은 최소화, 값이 완전히 같은 해는 하나만 남김)
+
+    levels를 지정하면 세 번째 목적으로 사용한다. 세 번째 목적은 격자 값처럼 종류가 적다고 보고
+    낮은 단계부터 처리하며, 이전 단계의 비지배 해로 만든 계단(first 오름차순의 second 누적 최소)으로
+    지배 여부를 한 번에 판정한다.
+    """
+    first = np.round(np.asarray(first, dtype=float), PRECISION)
+    second = np.round(np.asarray(second, dtype=float), PRECISION)
+    if levels is None:
+        return _front_2d(first, second)
+
+    levels = np.round(np.asarray(levels, dtype=float), PRECISION)
+    mask = np.zeros(len(first), dtype=bool)
+    stair_first, stair_second = np.empty(0), np.empty(0)
+    for level in np.unique(levels):
+        index = np.flatnonzero(levels == level)
+        if len(stair_first):
+            # 더 낮은 단계에 두 목적 모두 같거나 작은 해가 있으면 지배됨
+            position = np.searchsorted(stair_first, first[index], side='right') - 1
+            best = np.where(position >= 0, stair_second[np.maximum(position, 0)], np.inf)
+            index = index[best > second[index]]
+        index = index[_front_2d(first[index], second[index])]
+        mask[index] = True
+
+        stair_first = np.concatenate([stair_first, first[index]])
+        stair_second = np.concatenate([stair_second, second[index]])
+        order = np.argsort(stair_first, kind='stable')
+        stair_first, stair_second = stair_first[order], np.minimum.accumulate(stair_second[order])
+    return mask
+
+
+def _front_2d(first, second):
+    """두 목적의 비지배 해 마스크 (first, second 순으로 정렬한 뒤 second의 누적 최소보다 작은 해)"""
+    order = np.lexsort((second, first))
+    ordered = second[order]
+    previous_min = np.concatenate([[np.inf], np.minimum.accumulate(ordered)[:-1]])
+    mask = np.zeros(len(first), dtype=bool)
+    mask[order[ordered < previous_min]] = True
+    return mask
+
+
+def rate_grid(step=STEP):
+    """r35/r40/r45 격자 (후보 × 3)"""
+    step = float(step)
+    if not 0 < step <= solver.RATE_MAX:
+        raise ValueError(f'step은 0보다 크고 {solver.RATE_MAX:g} 이하여야 합니다.')
+    rates = np.arange(solver.RATE_MIN, solver.RATE_MAX + step / 2, step)
+    rates = np.unique(np.clip(rates, solver.RATE_MIN, solver.RATE_MAX))
+    return np.stack(np.meshgrid(rates, rates, rates, indexing='ij'), axis=-1).reshape(-1, 3)
+
+
+def evaluate(budget, target_year, rates, inventory=None):
+    """목표연도 하나에 대한 후보 감축률들의 목적값
+
+    max_reduction은 2030년 이후 (목표연도 다음 해의 0까지) 한 해에 가장 많이 줄어드는 양
+    (2018년 배출량 대비 %p/년), early_effort는 2035년 감축률(r35).
+    """
+    n = len(rates)
+    target = np.full(n, target_year)
+    years = np.arange(engine.SCENARIO_START_YEAR, max(target_year, engine.SCENARIO_START_YEAR) + 1)
+    fixed_cumulative, _, base = engine.inventory_constants(inventory)
+    targets = engine.milestone_values(target, rates[:, 0], rates[:, 1], rates[:, 2],
+                                      *engine.inventory_anchors(inventory, n)[1:])
+    pathways = engine.interpolate_pathways(target, *targets, years)
+
+    total = fixed_cumulative + pathways.sum(axis=1)
+    # 목표연도 다음 해에 배출량 0이 되는 감축까지 포함 (목표연도가 기준연도 사이면 목표연도 값이 0이 아님)
+    drops = -np.diff(pathways, axis=1, append=0.0)
+    max_drop = drops.max(axis=1, initial=0.0) + 0.0  # -0.0 제거
+    return {
+        'over_emission': np.maximum(0, total - budget),
+        'max_reduction': max_drop / base * 100,
+        'early_effort': rates[:, 0],
+    }
+
+
+def pareto_front(budget, step=STEP, year_min=solver.TARGET_YEAR_MIN, year_max=solver.TARGET_YEAR_MAX,
+                 early_effort=False, inventory=None):
+    """탄소예산 초과량 vs 최대 연간 감축률 (early_effort=True면 2035년 감축률까지) 파레토 최적 경로
+
+    (r35, r40, r45) 격자와 목표연도의 모든 조합을 목표연도별로 한 번에 평가하고, 목표연도마다
+    비지배 해만 남긴 뒤 전체에서 다시 비지배 해를 고른다. 결과는 엔진으로 다시 계산한 값이다.
+    inventory를 지정하면 국가 고정 데이터 대신 그 인벤토리로 계산한다.
+    """
+    budget = float(budget)
+    year_min, year_max = int(year_min), int(year_max)
+    if year_min > year_max:
+        raise ValueError('목표연도 탐색 범위가 비어 있습니다.')
+    grid = rate_grid(step)
+    candidates = len(grid) * (year_max - year_min + 1)
+    if candidates > MAX_CANDIDATES:
+        raise ValueError(f'후보가 너무 많습니다: {candidates} (최대 {MAX_CANDIDATES}, step을 늘려 주세요)')
+
+    survivors = []
+    for target_year in range(year_min, year_max + 1):
+        objectives = evaluate(budget, target_year, grid, inventory)
+        mask = pareto_mask(objectives['over_emission'], objectives['max_reduction'],
+                           objectives['early_effort'] if early_effort else None)
+        survivors.append((np.full(mask.sum(), target_year), grid[mask],
+                          {key: values[mask] for key, values in objectives.items()}))
+
+    target_year = np.concatenate([s[0] for s in survivors])
+    rates = np.concatenate([s[1] for s in survivors])
+    objectives = {key: np.concatenate([s[2][key] for s in survivors]) for key in OBJECTIVES}
+    mask = pareto_mask(objectives['over_emission'], objectives['max_reduction'],
+                       objectives['early_effort'] if early_effort else None)
+
+    order = np.lexsort((objectives['max_reduction'][mask], objectives['over_emission'][mask]))
+    target_year, rates = target_year[mask][order], rates[mask][order]
+    result = engine.calculate_batch(budget, target_year, rates[:, 0], rates[:, 1], rates[:, 2], inventory=inventory)
+    return {
+        'candidates': candidates,
+        'target_year': target_year,
+        'r35': rates[:, 0],
+        'r40': rates[:, 1],
+        'r45': rates[:, 2],
+        'total_emission': result['total_emission'],
+        'over_emission': result['over_emission'],
+        'max_reduction': objectives['max_reduction'][mask][order],
+        'early_effort': objectives['early_effort'][mask][order],
+    }
@@ -0,0 +1,193 @@
+# 시나리오 일괄 내보내기/가져오기 (zip, tar.gz, NDJSON 스트리밍)
+import io
+import json
+import os
+import tarfile
+import tempfile
+import time
+import zipfile
+from datetime import datetime
+
+import engine
+from scenario_store import content_hash
+
+FORMATS = {
+    'zip': ('application/zip', 'zip'),
+    'tar': ('application/gzip', 'tar.gz'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+MAX_ENTRY_SIZE = 1_000_000  # 시나리오 파일 하나의 최대 크기 (바이트)
+MAX_ERRORS = 100            # 응답에 포함할 최대 오류 수
+STORED_KEYS = ('name', 'created_at', 'settings', 'settings_hash')  # store.write()가 따로 저장하는 항목
+
+
+def validate(data):
+    """가져온 시나리오 검증 (저장 형식: name, created_at, settings)"""
+    if not isinstance(data, dict):
+        raise ValueError('시나리오는 JSON 객체여야 합니다.')
+    name = data.get('name')
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError('name이 없습니다.')
+    settings = data.get('settings')
+    if not isinstance(settings, dict):
+        raise ValueError('settings가 없습니다.')
+    for key in engine.PARAM_KEYS:
+        if not isinstance(settings.get(key), (int, float)) or isinstance(settings.get(key), bool):
+            raise ValueError(f'settings.{key}가 숫자가 아닙니다.')
+    created_at = data.get('created_at', datetime.now().isoformat())
+    if not isinstance(created_at, str):
+        raise ValueError('created_at이 문자열이 아닙니다.')
+    return {**data, 'name': name.strip(), 'created_at': created_at}
+
+
+# --- 내보내기 ---
+
+class _StreamBuffer(io.RawIOBase):
+    """압축 라이브러리가 쓴 바이트를 모아 두었다가 청크로 내보내는 버퍼"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data, self._chunks = b''.join(self._chunks), []
+        return data
+
+
+def _read_entries(store, query):
+    """색인 순서(생성일 오름차순)대로 (파일명, 설정을 채운 시나리오 JSON 바이트) 생성"""
+    for row in store.list_scenarios(query=query, descending=False):
+        try:
+            data = store.load(row['filename'])
+        except OSError:
+            continue  # 목록 조회 후 삭제된 파일
+        yield row['filename'], json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def export_stream(store, fmt='zip', query=None):
+    """저장된 시나리오를 zip/tar.gz/NDJSON으로 스트리밍 (파일 하나씩 읽어 바로 전송)"""
+    if fmt not in FORMATS:
+        raise ValueError(f'지원하지 않는 형식입니다: {fmt} ({", ".join(FORMATS)} 중 선택)')
+    entries = _read_entries(store, query)
+
+    if fmt == 'ndjson':
+        for filename, raw in entries:
+            line = {'filename': filename, **json.loads(raw)}
+            yield (json.dumps(line, ensure_ascii=False) + '\n').encode('utf-8')
+        return
+
+    buffer = _StreamBuffer()
+    if fmt == 'zip':
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for filename, raw in entries:
+                archive.writestr(filename, raw)
+                yield buffer.drain()
+    else:
+        with tarfile.open(fileobj=buffer, mode='w|gz') as archive:
+            for filename, raw in entries:
+                info = tarfile.TarInfo(filename)
+                info.size = len(raw)
+                info.mtime = int(time.time())
+                archive.addfile(info, io.BytesIO(raw))
+                yield buffer.drain()
+    yield buffer.drain()
+
+
+# --- 가져오기 ---
+
+def _zip_entries(stream):
+    """zip은 목록이 파일 끝에 있으므로 임시 파일에 받은 뒤 항목을 하나씩 읽음"""
+    with tempfile.TemporaryFile() as spool:
+        while True:
+            chunk = stream.read(1 << 20)
+            if not chunk:
+                break
+            spool.write(chunk)
+        spool.seek(0)
+        with zipfile.ZipFile(spool) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                if info.file_size > MAX_ENTRY_SIZE:
+                    yield info.filename, ValueError('파일이 너무 큽니다.')
+                    continue
+                yield info.filename, archive.read(info)
+
+
+def _tar_entries(stream):
+    """tar(.gz)는 스트림 모드로 앞에서부터 순서대로 읽음"""
+    with tarfile.open(fileobj=stream, mode='r|*') as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            if member.size > MAX_ENTRY_SIZE:
+                yield member.name, ValueError('파일이 너무 큽니다.')
+                continue
+            yield member.name, archive.extractfile(member).read()
+
+
+def _ndjson_entries(stream):
+    """NDJSON은 한 줄씩 읽음 (filename 필드가 있으면 파일명으로 사용)"""
+    for number, line in enumerate(io.TextIOWrapper(stream, encoding='utf-8'), start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield f'line {number}', e
+            continue
+        filename = data.pop('filename', None) if isinstance(data, dict) else None
+        yield filename or f'line {number}', data
+
+
+def _entries(stream, fmt):
+    if fmt == 'zip':
+        return _zip_entries(stream)
+    if fmt == 'tar':
+        return _tar_entries(stream)
+    if fmt == 'ndjson':
+        return _ndjson_entries(stream)
+    raise ValueError(f'지원하지 않는 형식입니다: {fmt} ({", ".join(FORMATS)} 중 선택)')
+
+
+def import_stream(store, stream, fmt):
+    """업로드한 보관 파일의 시나리오를 검증하여 저장 (내용이 같은 시나리오는 건너뜀)
+
+    파일은 저장 화면과 같은 방식(설정 해시별 설정 파일 + 이름 파일)으로 항목마다 바로 저장하고,
+    색인은 마지막에 한 번의 트랜잭션으로 갱신한다.
+    """
+    os.makedirs(store.directory, exist_ok=True)
+    known = store.content_hashes()
+    imported, duplicates, failed, errors = [], 0, 0, []
+
+    for source, data in _entries(stream, fmt):
+        try:
+            if isinstance(data, Exception):
+                raise data
+            if isinstance(data, bytes):
+                data = json.loads(data.decode('utf-8'))
+            data = validate(data)
+            digest = content_hash(data)
+            if digest in known:
+                duplicates += 1
+                continue
+            extra = {key: value for key, value in data.items() if key not in STORED_KEYS}
+            filename, data, created = store.write(data['name'], data['settings'], data['created_at'], extra)
+            known.add(digest)
+            if not created:
+                duplicates += 1
+                continue
+            imported.append((filename, data))
+        except Exception as e:
+            failed += 1
+            if len(errors) < MAX_ERRORS:
+                errors.append({'entry': source, 'error': str(e)})
+
+    store.add_many(imported)
+    return {'imported': len(imported), 'duplicates': duplicates, 'failed': failed, 'errors': errors}
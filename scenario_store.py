@@ -0,0 +1,455 @@
+# 저장된 시나리오 저장소와 색인 (SQLite)
+#
+# 시나리오 설정은 정규화한 설정의 해시로 objects/<해시>.json에 한 번만 저장하고, 이름마다
+# 이름/생성 시각/설정 해시만 담은 작은 JSON 파일(<접두어><이름>_<내용 해시>.json)이 그 설정을 가리킨다.
+# 이전 형식(설정을 직접 담은 파일)도 그대로 읽는다. 파일은 임시 파일에 쓴 뒤 이름을 바꾸고,
+# 이름 파일은 하드 링크로 만들어 같은 파일명이 이미 있으면 덮어쓰지 않으므로 여러 워커가 동시에
+# 저장해도 불완전하거나 서로 덮어쓴 파일이 생기지 않는다. 목록/검색/다음 번호 조회는 색인으로 처리한다.
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from fileutil import write_json_atomic
+
+INDEX_FILENAME = '.index.sqlite3'
+INDEXED_PATTERN = '*.json'  # 색인 대상 파일 (pattern과 무관하게 전체 JSON 파일을 색인)
+NAME_PREFIX = '시나리오 '
+OBJECTS_DIR = 'objects'      # 설정 해시별 설정 파일 폴더
+OBJECT_CACHE_SIZE = 1024     # 메모리에 보관할 설정 파일 수 (내용이 바뀌지 않으므로 무효화 불필요)
+OBJECT_MIN_AGE = 3600        # 초, 이보다 오래된 설정 파일만 정리 (저장 중인 설정을 지우지 않도록)
+MAX_STEM_LENGTH = 40         # 파일명에 쓰는 이름의 최대 길이
+# 이름 파일 접두어 기본값. v2.0 앱은 'scenario_' 접두어와 pattern='scenario_*.json'으로 자기 파일만 조회하므로,
+# 이름이 'scenario'로 시작하는 시나리오도 그 패턴에 걸리지 않도록 다른 접두어를 쓴다.
+DEFAULT_PREFIX = 'saved_'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    filename TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    name_number INTEGER,
+    scenario_number INTEGER,
+    version TEXT,
+    content_hash TEXT,
+    settings_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_scenarios_created_at ON scenarios (created_at);
+CREATE INDEX IF NOT EXISTS idx_scenarios_name_number ON scenarios (name_number);
+CREATE INDEX IF NOT EXISTS idx_scenarios_scenario_number ON scenarios (scenario_number);
+"""
+CONTENT_HASH_INDEX = 'CREATE INDEX IF NOT EXISTS idx_scenarios_content_hash ON scenarios (content_hash)'
+INSERT_ROW = 'INSERT OR REPLACE INTO scenarios VALUES (?, ?, ?, ?, ?, ?, ?, ?)'
+
+LIST_COLUMNS = ('filename', 'name', 'created_at', 'scenario_number', 'version')
+
+
+def normalize_settings(value):
+    """해시 계산용 설정 정규화 (키는 문자열, 숫자는 float: 50과 50.0, {2035: 30}과 {"2035": 30}이 같음)"""
+    if isinstance(value, dict):
+        return {str(key): normalize_settings(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize_settings(item) for item in value]
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
+def _digest(value):
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def settings_hash(settings):
+    """정규화한 설정의 해시 (설정 파일 objects/<해시>.json의 이름)"""
+    return _digest(normalize_settings(settings))
+
+
+def content_hash(data, digest=None):
+    """시나리오 내용(이름, 정규화한 설정)의 해시 (생성 시각은 제외, 내용이 같은 시나리오 판별용)
+
+    digest는 이미 계산한 설정 해시 (생략하면 계산).
+    """
+    digest = settings_hash(data.get('settings')) if digest is None else digest
+    return _digest([data.get('name'), digest])
+
+
+def filename_stem(name):
+    """파일명에 쓸 수 있는 이름 (문자/숫자/-/_ 외에는 _로 바꾸고 길이 제한)"""
+    stem = re.sub(r'[^\w\-]+', '_', name).strip('_')[:MAX_STEM_LENGTH]
+    return stem or 'scenario'
+
+
+def _link_new(source, path):
+    """source를 path로 연결 (path가 이미 있으면 FileExistsError, 덮어쓰지 않음)"""
+    try:
+        os.link(source, path)
+    except FileExistsError:
+        raise
+    except OSError:
+        # 하드 링크를 지원하지 않는 파일 시스템: 없는지 확인한 뒤 교체
+        if os.path.exists(path):
+            raise FileExistsError(path)
+        os.replace(source, path)
+
+
+def _check_filename(filename):
+    """디렉토리 밖 경로나 JSON이 아닌 파일명 거부"""
+    if os.path.basename(filename) != filename or not fnmatch.fnmatch(filename, INDEXED_PATTERN):
+        raise ValueError(f'잘못된 시나리오 파일명입니다: {filename}')
+
+
+def name_number(name):
+    """'시나리오 N' 형식 이름의 번호 (형식이 다르면 None)"""
+    if not name.startswith(NAME_PREFIX):
+        return None
+    try:
+        return int(name.split(' ')[1])
+    except (IndexError, ValueError):
+        return None
+
+
+class ScenarioStore:
+    """saved_scenarios 디렉토리의 시나리오 색인
+
+    저장/삭제 시 색인을 갱신하고, 시작 시 sync()로 디렉토리와 색인을 맞춘다.
+    SQLite 파일 잠금으로 여러 gunicorn 워커가 같은 색인을 공유할 수 있다.
+    pattern은 조회 범위만 제한하므로 파일명 규칙이 다른 앱도 같은 색인을 쓸 수 있다.
+    """
+
+    def __init__(self, directory='saved_scenarios', pattern='*.json'):
+        self.directory = directory
+        self.pattern = pattern
+        self.index_path = os.path.join(directory, INDEX_FILENAME)
+        self.objects_dir = os.path.join(directory, OBJECTS_DIR)
+        self._schema_ready = False
+        self._objects = OrderedDict()  # 설정 해시 → 설정 (최근 읽은 것)
+        self._objects_lock = threading.Lock()
+
+    def _connect(self):
+        if not self._schema_ready:
+            os.makedirs(self.directory, exist_ok=True)
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        if not self._schema_ready:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+            # 이전 버전 색인에 content_hash/settings_hash 열 추가 (값은 content_hashes()에서 채움)
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(scenarios)')}
+            if 'content_hash' not in columns:
+                conn.execute('ALTER TABLE scenarios ADD COLUMN content_hash TEXT')
+            if 'settings_hash' not in columns:
+                conn.execute('ALTER TABLE scenarios ADD COLUMN settings_hash TEXT')
+                # 설정을 정규화하기 전에 계산한 내용 해시는 다시 계산
+                conn.execute('UPDATE scenarios SET content_hash = NULL')
+            conn.commit()
+            conn.execute(CONTENT_HASH_INDEX)
+            self._schema_ready = True
+        return conn
+
+    def _row(self, filename, data):
+        name = data.get('name', 'Unknown')
+        digest = settings_hash(data.get('settings'))
+        return (
+            filename,
+            name,
+            data.get('created_at', ''),
+            name_number(name),
+            data.get('scenario_number'),
+            data.get('version'),
+            content_hash(data, digest),
+            digest
+        )
+
+    def _read_file(self, filename):
+        """시나리오 파일 읽기 (설정 해시만 있는 파일은 설정 파일의 settings를 채움)"""
+        with open(os.path.join(self.directory, filename), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if 'settings' not in data and 'settings_hash' in data:
+            data['settings'] = self._read_object(data['settings_hash'])
+        return data
+
+    def _object_path(self, digest):
+        if not re.fullmatch(r'[0-9a-f]{64}', digest or ''):
+            raise ValueError(f'잘못된 설정 해시입니다: {digest}')
+        return os.path.join(self.objects_dir, f'{digest}.json')
+
+    def _read_object(self, digest):
+        """설정 해시의 설정 (내용이 바뀌지 않으므로 메모리에 보관)"""
+        with self._objects_lock:
+            settings = self._objects.get(digest)
+        if settings is None:
+            with open(self._object_path(digest), 'r', encoding='utf-8') as f:
+                settings = json.load(f)['settings']
+            with self._objects_lock:
+                self._objects[digest] = settings
+                while len(self._objects) > OBJECT_CACHE_SIZE:
+                    self._objects.popitem(last=False)
+        return settings
+
+    def write(self, name, settings, created_at=None, extra=None, prefix=DEFAULT_PREFIX):
+        """시나리오 파일 저장 (색인은 갱신하지 않음), (파일명, 내용, 새로 저장했는지) 반환
+
+        설정은 설정 해시별로 한 번만 저장한다. 이름 파일명은 이름과 내용 해시로 정해지므로
+        이름과 설정이 같은 시나리오는 다시 저장하지 않고 기존 파일을 반환한다.
+        extra는 이름 파일에 함께 저장할 항목 (예: scenario_number, version).
+        """
+        digest = settings_hash(settings)
+        object_path = self._object_path(digest)
+        try:
+            # 이미 있으면 수정 시각만 갱신하여 prune_objects()가 지우지 않도록 함
+            os.utime(object_path)
+        except FileNotFoundError:
+            os.makedirs(self.objects_dir, exist_ok=True)
+            # 같은 설정을 동시에 저장해도 내용이 같으므로 마지막 교체가 이겨도 됨
+            write_json_atomic(object_path, {'settings': settings})
+
+        data = {
+            'name': name,
+            'created_at': created_at or datetime.now().isoformat(),
+            **(extra or {}),
+            'settings_hash': digest,
+        }
+        filename = f'{prefix}{filename_stem(name)}_{content_hash({"name": name}, digest)[:16]}.json'
+        path = os.path.join(self.directory, filename)
+        if os.path.exists(path):
+            return filename, self._read_file(filename), False
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            _link_new(tmp_path, path)
+        except FileExistsError:
+            # 다른 워커가 같은 시나리오를 먼저 저장함
+            return filename, self._read_file(filename), False
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return filename, {**data, 'settings': settings}, True
+
+    def save(self, name, settings, created_at=None, extra=None, prefix=DEFAULT_PREFIX):
+        """시나리오 저장 및 색인 추가, (파일명, 내용, 새로 저장했는지) 반환"""
+        os.makedirs(self.directory, exist_ok=True)
+        filename, data, created = self.write(name, settings, created_at, extra, prefix)
+        if created:
+            self.add(filename, data)
+        return filename, data, created
+
+    def load(self, filename):
+        """시나리오 파일 내용 읽기 (디렉토리 밖 경로는 거부)"""
+        _check_filename(filename)
+        return self._read_file(filename)
+
+    def delete(self, filename):
+        """시나리오 삭제 (없으면 False)
+
+        이름 파일과 색인 항목을 지우고, 색인에서 다른 시나리오가 가리키지 않게 된 설정 파일도 지운다.
+        다른 워커가 같은 설정을 저장하는 중이면 아직 색인에 없을 수 있지만, 저장할 때 설정 파일의
+        수정 시각을 갱신하므로 min_age초 이내의 설정 파일을 남기는 것으로 충분하다 (prune_objects()와 같음).
+        """
+        _check_filename(filename)
+        path = os.path.join(self.directory, filename)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                digest = json.load(f).get('settings_hash')
+        except FileNotFoundError:
+            self.remove(filename)
+            return False
+        except ValueError:
+            digest = None  # 손상된 파일도 삭제
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        finally:
+            self.remove(filename)
+
+        if digest:
+            conn = self._connect()
+            try:
+                in_use = conn.execute('SELECT 1 FROM scenarios WHERE settings_hash = ? LIMIT 1', (digest,)).fetchone()
+            finally:
+                conn.close()
+            if not in_use:
+                self._remove_object(digest)
+        return True
+
+    def _scan(self):
+        """디렉토리의 시나리오 파일명 집합"""
+        if not os.path.exists(self.directory):
+            return set()
+        return {filename for filename in os.listdir(self.directory)
+                if fnmatch.fnmatch(filename, INDEXED_PATTERN)}
+
+    def sync(self):
+        """디렉토리와 색인 동기화 (새 파일만 읽고, 사라진 파일은 색인에서 삭제)"""
+        files = self._scan()
+        conn = self._connect()
+        try:
+            with conn:
+                indexed = {row['filename'] for row in conn.execute('SELECT filename FROM scenarios')}
+                stale = indexed - files
+                conn.executemany('DELETE FROM scenarios WHERE filename = ?', [(f,) for f in stale])
+
+                rows = []
+                for filename in files - indexed:
+                    try:
+                        rows.append(self._row(filename, self._read_file(filename)))
+                    except Exception as e:
+                        print(f"파일 읽기 오류: {filename} - {e}")
+                conn.executemany(INSERT_ROW, rows)
+        finally:
+            conn.close()
+
+    def rebuild(self):
+        """색인을 비우고 모든 JSON 파일에서 다시 생성"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('DELETE FROM scenarios')
+        finally:
+            conn.close()
+        self.sync()
+
+    def add(self, filename, data):
+        """저장된 시나리오를 색인에 추가"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(INSERT_ROW, self._row(filename, data))
+        finally:
+            conn.close()
+
+    def add_many(self, items):
+        """여러 시나리오를 한 번의 트랜잭션으로 색인에 추가 (items: (파일명, 내용) 목록)"""
+        if not items:
+            return
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(INSERT_ROW, [self._row(filename, data) for filename, data in items])
+        finally:
+            conn.close()
+
+    def content_hashes(self):
+        """색인된 모든 시나리오의 내용 해시 집합 (해시가 없는 이전 항목은 파일을 읽어 채움)"""
+        self.sync()
+        conn = self._connect()
+        try:
+            with conn:
+                missing = [row['filename'] for row in
+                           conn.execute('SELECT filename FROM scenarios WHERE content_hash IS NULL')]
+                updates = []
+                for filename in missing:
+                    try:
+                        data = self._read_file(filename)
+                        digest = settings_hash(data.get('settings'))
+                        updates.append((content_hash(data, digest), digest, filename))
+                    except Exception as e:
+                        print(f"파일 읽기 오류: {filename} - {e}")
+                conn.executemany('UPDATE scenarios SET content_hash = ?, settings_hash = ? WHERE filename = ?',
+                                 updates)
+            return {row[0] for row in conn.execute('SELECT content_hash FROM scenarios WHERE content_hash IS NOT NULL')}
+        finally:
+            conn.close()
+
+    def prune_objects(self, min_age=OBJECT_MIN_AGE):
+        """어떤 시나리오도 가리키지 않는 설정 파일 삭제 (min_age초 이내에 만든 파일은 저장 중일 수 있어 유지)"""
+        if not os.path.isdir(self.objects_dir):
+            return 0
+        self.sync()
+        conn = self._connect()
+        try:
+            used = {row[0] for row in conn.execute('SELECT DISTINCT settings_hash FROM scenarios')}
+        finally:
+            conn.close()
+        removed = 0
+        for entry in os.scandir(self.objects_dir):
+            digest = entry.name[:-len('.json')]
+            if entry.name.endswith('.json') and digest not in used and self._remove_object(digest, min_age):
+                removed += 1
+        return removed
+
+    def _remove_object(self, digest, min_age=OBJECT_MIN_AGE):
+        """설정 파일 삭제 (min_age초 이내에 만들거나 재사용한 파일은 유지), 삭제했는지 반환"""
+        try:
+            path = self._object_path(digest)
+            if os.path.getmtime(path) >= time.time() - min_age:
+                return False
+            os.remove(path)
+        except (OSError, ValueError):
+            return False
+        with self._objects_lock:
+            self._objects.pop(digest, None)
+        return True
+
+    def remove(self, filename):
+        """색인에서 시나리오 삭제"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('DELETE FROM scenarios WHERE filename = ?', (filename,))
+        finally:
+            conn.close()
+
+    def _where(self, query=None):
+        """조회 조건 (파일명 패턴, 이름 검색)"""
+        conditions, params = [], []
+        if self.pattern != INDEXED_PATTERN:
+            conditions.append('filename GLOB ?')
+            params.append(self.pattern)
+        if query:
+            escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            conditions.append("name LIKE ? ESCAPE '\\'")
+            params.append(f'%{escaped}%')
+        if not conditions:
+            return '', params
+        return ' WHERE ' + ' AND '.join(conditions), params
+
+    def list_scenarios(self, offset=0, limit=None, query=None, descending=True):
+        """시나리오 목록 (생성일 기준 정렬, 이름 검색, 페이지 단위 조회)"""
+        where, params = self._where(query)
+        order = 'DESC' if descending else 'ASC'
+        sql = f"SELECT {', '.join(LIST_COLUMNS)} FROM scenarios{where} ORDER BY created_at {order}"
+        sql += ' LIMIT ? OFFSET ?'
+        params += [-1 if limit is None else limit, offset]
+
+        conn = self._connect()
+        try:
+            return [dict(row) for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    def count(self, query=None):
+        """시나리오 수 (이름 검색 조건 적용)"""
+        where, params = self._where(query)
+        conn = self._connect()
+        try:
+            return conn.execute(f'SELECT COUNT(*) FROM scenarios{where}', params).fetchone()[0]
+        finally:
+            conn.close()
+
+    def next_name_number(self):
+        """다음 '시나리오 N' 번호"""
+        return self._next('name_number')
+
+    def next_scenario_number(self):
+        """다음 scenario_number 값"""
+        return self._next('scenario_number')
+
+    def _next(self, column):
+        where, params = self._where()
+        conn = self._connect()
+        try:
+            current = conn.execute(f'SELECT MAX({column}) FROM scenarios{where}', params).fetchone()[0]
+        finally:
+            conn.close()
+        return current + 1 if current is not None else 1
@@ -0,0 +1,149 @@
+# 부문별 배출 모델: 부문마다 기준연도·구간 형태·목표연도를 두고 (부문 × 시나리오 × 연도) 배열로 한 번에 계산
+import numpy as np
+
+import engine
+
+# 부문별 2018년 배출량과 2030 NDC 목표 (백만tCO₂eq, 2030 국가 온실가스 감축목표 부문별 배출량)
+# 흡수원·CCUS·국제감축은 제외하고, 국가 총량(engine.FIXED_DATA)을 이 비율로 나누어 사용한다.
+# milestones는 부문 2018년 배출량 대비 감축률(%)의 예시 기본값.
+SECTORS = {
+    'power': {'name': '전환', 'emission_2018': 269.6, 'ndc_2030': 145.9,
+              'milestones': {2035: 60, 2040: 80, 2045: 93}},
+    'industry': {'name': '산업', 'emission_2018': 260.5, 'ndc_2030': 230.7,
+                 'milestones': {2035: 30, 2040: 50, 2045: 75}},
+    'buildings': {'name': '건물', 'emission_2018': 52.1, 'ndc_2030': 35.0,
+                  'milestones': {2035: 50, 2040: 70, 2045: 85}},
+    'transport': {'name': '수송', 'emission_2018': 98.1, 'ndc_2030': 61.0,
+                  'milestones': {2035: 50, 2040: 70, 2045: 88}},
+    'agriculture': {'name': '농축수산', 'emission_2018': 24.7, 'ndc_2030': 18.0,
+                    'milestones': {2035: 35, 2040: 50, 2045: 65}},
+    'waste': {'name': '폐기물', 'emission_2018': 17.1, 'ndc_2030': 9.1,
+              'milestones': {2035: 60, 2040: 75, 2045: 85}},
+    'other': {'name': '수소·탈루 등', 'emission_2018': 5.6, 'ndc_2030': 12.3,
+              'milestones': {2035: 0, 2040: 40, 2045: 80}},
+}
+SECTOR_KEYS = tuple(SECTORS)
+SETTING_KEYS = ('milestones', 'shapes', 'target_year', 'budget')
+
+# 국가 총량을 부문 비율로 나눈 2018년/2030년 배출량 (부문 합계 = 국가 총량)
+SHARE_2018 = np.array([SECTORS[key]['emission_2018'] for key in SECTOR_KEYS])
+SHARE_2018 /= SHARE_2018.sum()
+SHARE_2030 = np.array([SECTORS[key]['ndc_2030'] for key in SECTOR_KEYS])
+SHARE_2030 /= SHARE_2030.sum()
+BASE_2018 = engine.BASE_EMISSION * SHARE_2018
+NDC_2030 = engine.FIXED_DATA[2030] * SHARE_2030
+
+# 2018-2029 부문별 배출량: 부문 비율을 2018년에서 2030년으로 선형 이동하여 국가 고정값을 나눔 (부문 × 연도)
+_shift = (engine.FIXED_YEARS - engine.START_YEAR) / (engine.SCENARIO_START_YEAR - engine.START_YEAR)
+FIXED_SECTOR_VALUES = (SHARE_2018[:, None] + (SHARE_2030 - SHARE_2018)[:, None] * _shift) * engine.FIXED_VALUES
+
+
+def sector_anchors(inventory=None):
+    """부문별 2018년 배출량, 2030년 배출량, 2018-2029년 배출량 (inventory가 None이면 국가 고정 데이터)
+
+    inventory를 지정하면 그 인벤토리의 국가 총량을 같은 부문 비율로 나눈다.
+    """
+    if inventory is None:
+        return BASE_2018, NDC_2030, FIXED_SECTOR_VALUES
+    fixed_values = np.asarray(inventory.fixed_values, dtype=float)
+    return (inventory.base_emission * SHARE_2018, inventory.ndc_2030 * SHARE_2030,
+            (SHARE_2018[:, None] + (SHARE_2030 - SHARE_2018)[:, None] * _shift) * fixed_values)
+
+
+def sector_settings(overrides, target_year, budget):
+    """부문별 설정 (기본값에 요청한 설정을 덮어씀)
+
+    target_year와 budget의 기본값은 국가 목표연도와 국가 탄소예산 × 2018년 부문 비율.
+    """
+    overrides = overrides or {}
+    unknown = set(overrides) - set(SECTORS)
+    if unknown:
+        raise ValueError(f'알 수 없는 부문: {", ".join(sorted(unknown))} ({", ".join(SECTOR_KEYS)} 중 선택)')
+
+    settings = []
+    for i, key in enumerate(SECTOR_KEYS):
+        override = overrides.get(key, {})
+        unknown = set(override) - set(SETTING_KEYS)
+        if unknown:
+            raise ValueError(f'알 수 없는 부문 설정: {", ".join(sorted(unknown))}')
+        milestones = override.get('milestones', SECTORS[key]['milestones'])
+        milestone_years, rates, shape_codes = engine.as_milestones(
+            {int(year): rate for year, rate in milestones.items()}, override.get('shapes')
+        )
+        settings.append({
+            'milestone_years': milestone_years,
+            'rates': rates,
+            'shape_codes': shape_codes,
+            'target_year': override.get('target_year', target_year),
+            'budget': override.get('budget', np.asarray(budget, dtype=float) * SHARE_2018[i]),
+        })
+    return settings
+
+
+def calculate(budget, target_year, overrides=None, inventory=None):
+    """부문별 배출 경로 계산
+
+    budget, target_year와 부문별 감축률/목표연도/예산은 스칼라 또는 시나리오별 배열.
+    inventory를 지정하면 국가 고정 데이터 대신 그 인벤토리의 국가 총량을 부문 비율로 나눈다.
+    기준연도와 구간 형태가 같은 부문은 하나로 묶어 일반 보간 커널을 한 번만 호출한다.
+    부문 × 시나리오 × 연도 경로, 부문별 누적 배출량/예산/초과량과 국가 합계를 반환한다.
+    """
+    settings = sector_settings(overrides, target_year, budget)
+    base_2018, ndc_2030, fixed_sector_values = sector_anchors(inventory)
+
+    # 국가/부문 파라미터를 모두 같은 시나리오 수로 브로드캐스트
+    flat = [budget, target_year]
+    for s in settings:
+        flat += [s['target_year'], s['budget'], *s['rates']]
+    arrays = iter(engine.broadcast(*flat))
+    budget = next(arrays)
+    next(arrays)  # 국가 목표연도는 부문 목표연도의 기본값으로만 사용
+    for s in settings:
+        s['target_year'] = next(arrays).astype(np.int64)
+        s['budget'] = next(arrays)
+        s['rates'] = [next(arrays) for _ in s['rates']]
+    n = len(budget)
+    sector_target = np.stack([s['target_year'] for s in settings])  # 부문 × 시나리오
+    sector_budget = np.stack([s['budget'] for s in settings])
+
+    last_year = max(int(sector_target.max(initial=engine.SCENARIO_START_YEAR)), engine.SCENARIO_START_YEAR)
+    scenario_years = np.arange(engine.SCENARIO_START_YEAR, last_year + 1)
+    scenario = np.empty((len(SECTOR_KEYS), n, len(scenario_years)))
+
+    groups = {}
+    for i, s in enumerate(settings):
+        groups.setdefault((tuple(s['milestone_years']), tuple(s['shape_codes'])), []).append(i)
+    for (milestone_years, shape_codes), members in groups.items():
+        rates = np.concatenate([
+            np.stack(settings[i]['rates'], axis=1) if milestone_years else np.zeros((n, 0)) for i in members
+        ])
+        values = engine.custom_pathways(
+            sector_target[members].ravel(), milestone_years, rates, np.array(shape_codes), scenario_years,
+            ndc_2030=np.repeat(ndc_2030[members], n), base=np.repeat(base_2018[members], n)
+        )
+        scenario[members] = values.reshape(len(members), n, len(scenario_years))
+
+    fixed = np.broadcast_to(fixed_sector_values[:, None, :], (len(SECTOR_KEYS), n, fixed_sector_values.shape[1]))
+    pathways = np.concatenate([fixed, scenario], axis=2)
+    national = pathways.sum(axis=0)
+
+    # 누적 배출량 (2020-목표연도, 목표연도 이후는 0)
+    start = engine.CUMULATIVE_START_YEAR - engine.START_YEAR
+    sector_total = pathways[:, :, start:].sum(axis=2)
+    national_total = national[:, start:].sum(axis=1)
+
+    return {
+        'years': np.arange(engine.START_YEAR, last_year + 1),
+        'sectors': SECTOR_KEYS,
+        'pathways': pathways,
+        'target_year': sector_target,
+        'total_emission': sector_total,
+        'budget': sector_budget,
+        'over_emission': np.maximum(0, sector_total - sector_budget),
+        'national': {
+            'pathway': national,
+            'target_year': sector_target.max(axis=0),
+            'total_emission': national_total,
+            'over_emission': np.maximum(0, national_total - budget)
+        }
+    }
@@ -0,0 +1,107 @@
+# 누적 배출량 민감도 분석 (토네이도 차트용): 감축률/목표연도별 편미분과 범위 변화량을 닫힌 형태로 계산
+import numpy as np
+
+import engine
+import solver
+
+PARAMETERS = solver.SOLVABLE  # r35, r40, r45, target_year
+RATE_DELTA = 10.0  # 감축률 변화 범위 기본값 (±%p)
+YEAR_DELTA = 2     # 목표연도 변화 범위 기본값 (±년)
+
+
+def cumulative_weights(target_year):
+    """engine.cumulative_weights와 같은 값 (서로 다른 목표연도마다 한 번만 계산)"""
+    years, inverse = np.unique(np.asarray(target_year, dtype=np.int64), return_inverse=True)
+    return engine.cumulative_weights(years)[inverse.ravel()]
+
+
+def total_emission(target_year, r35, r40, r45, weights=None, inventory=None):
+    """누적 배출량 (2020-2029년 누적값 + 누적 가중치 @ 기준연도 목표값)"""
+    weights = cumulative_weights(target_year) if weights is None else weights
+    anchors = engine.inventory_anchors(inventory, len(weights))[1:]
+    targets = np.hstack(engine.milestone_values(target_year, r35, r40, r45, *anchors))
+    return engine.inventory_constants(inventory)[0] + (weights * targets).sum(axis=1)
+
+
+def rate_slopes(target_year, weights=None, inventory=None):
+    """감축률 1%p당 누적 배출량 변화 (시나리오 × 3, 항상 0 이하)
+
+    목표값 t = 기준 배출량 × (1 - r/100)이고 누적 배출량이 t에 대해 선형이므로 정확한 편미분이다.
+    목표연도와 같은 기준연도는 목표값이 0으로 고정되어 미분도 0이다.
+    """
+    target_year = np.asarray(target_year)
+    weights = (cumulative_weights(target_year) if weights is None else weights)[:, 1:]
+    fixed = target_year[:, None] == np.array(engine.MILESTONE_YEARS)[None, :]
+    return np.where(fixed, 0.0, -weights * engine.inventory_constants(inventory)[2] / 100)
+
+
+def _swing(low, high, value_at, budget):
+    """범위 양 끝의 누적/초과 배출량"""
+    totals = [value_at(low), value_at(high)]
+    return {
+        'low': low,
+        'high': high,
+        'total_emission': {'low': totals[0], 'high': totals[1]},
+        'over_emission': {'low': np.maximum(0, totals[0] - budget), 'high': np.maximum(0, totals[1] - budget)},
+    }
+
+
+def sensitivity(budget, target_year, r35, r40, r45, rate_delta=RATE_DELTA, year_delta=YEAR_DELTA, inventory=None):
+    """여러 기준 시나리오의 파라미터별 민감도
+
+    - derivative: 감축률은 1%p당 정확한 편미분. 초과 배출량은 누적 배출량이 예산을 넘는 시나리오에서만
+      누적 배출량과 같이 변하고 아니면 0 (예산과 정확히 같으면 감축률을 높이는 방향 기준).
+      목표연도는 정수이므로 1년 늦출 때의 변화량.
+    - low/high: 감축률 ±rate_delta(0-100%), 목표연도 ±year_delta(2040-2050년) 범위 양 끝의 값.
+    - order: 시나리오별로 누적 배출량 변화 폭이 큰 파라미터 순서 (토네이도 차트의 막대 순서).
+    inventory를 지정하면 국가 고정 데이터 대신 그 인벤토리로 계산한다.
+    """
+    budget, target_year, r35, r40, r45 = engine.as_batch(budget, target_year, r35, r40, r45)
+    target_year = target_year.astype(np.int64)
+    rate_delta, year_delta = float(rate_delta), int(year_delta)
+    if rate_delta < 0 or year_delta < 0:
+        raise ValueError('변화 범위는 0 이상이어야 합니다.')
+
+    weights = cumulative_weights(target_year)
+    total = total_emission(target_year, r35, r40, r45, weights, inventory)
+    exceeded = total > budget
+    rates = {'r35': r35, 'r40': r40, 'r45': r45}
+    slopes = rate_slopes(target_year, weights, inventory)
+
+    parameters = {}
+    for k, key in enumerate(solver.RATE_KEYS):
+        slope = slopes[:, k]
+        low = np.clip(rates[key] - rate_delta, solver.RATE_MIN, solver.RATE_MAX)
+        high = np.clip(rates[key] + rate_delta, solver.RATE_MIN, solver.RATE_MAX)
+        parameters[key] = {
+            'derivative': {'total_emission': slope, 'over_emission': np.where(exceeded, slope, 0.0)},
+            # 누적 배출량이 감축률에 대해 선형이므로 범위 끝 값도 기울기로 바로 계산
+            **_swing(low, high, lambda r: total + slope * (r - rates[key]), budget),
+        }
+
+    def total_at_year(year):
+        return total_emission(year, r35, r40, r45, inventory=inventory)
+
+    next_total = total_at_year(target_year + 1)
+    over = np.maximum(0, total - budget)
+    low = np.maximum(target_year - year_delta, np.minimum(target_year, solver.TARGET_YEAR_MIN))
+    high = np.minimum(target_year + year_delta, np.maximum(target_year, solver.TARGET_YEAR_MAX))
+    parameters['target_year'] = {
+        'derivative': {'total_emission': next_total - total,
+                       'over_emission': np.maximum(0, next_total - budget) - over},
+        **_swing(low, high, total_at_year, budget),
+    }
+
+    # 변화 폭(|high - low|)이 큰 순서
+    spans = np.stack([
+        np.abs(parameters[key]['total_emission']['high'] - parameters[key]['total_emission']['low'])
+        for key in PARAMETERS
+    ], axis=1)
+    order = np.argsort(-spans, axis=1, kind='stable')
+
+    return {
+        'total_emission': total,
+        'over_emission': over,
+        'parameters': parameters,
+        'order': [[PARAMETERS[i] for i in row] for row in order.tolist()],
+    }
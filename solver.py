@@ -0,0 +1,90 @@
+# 탄소예산 역산 솔버: 예산을 맞추는 감축률 또는 목표연도 찾기
+import numpy as np
+
+import engine
+
+RATE_KEYS = ('r35', 'r40', 'r45')
+MILESTONE_YEAR = dict(zip(RATE_KEYS, engine.MILESTONE_YEARS))
+SOLVABLE = RATE_KEYS + ('target_year',)
+
+RATE_MIN, RATE_MAX = 0.0, 100.0
+TARGET_YEAR_MIN, TARGET_YEAR_MAX = 2040, 2050  # 화면 슬라이더 범위
+
+
+def solve_rate(budget, target_year, r35, r40, r45, solve_for='r35', inventory=None):
+    """나머지 파라미터를 고정하고 탄소예산을 정확히 맞추는 감축률 계산
+
+    누적 배출량은 각 감축률에 대해 선형이므로 해를 닫힌 형태로 구한다.
+    해가 0-100% 범위를 벗어나면 범위 안에서 초과 배출량이 최소인 값으로 자른다.
+    inventory를 지정하면 국가 고정 데이터 대신 그 인벤토리로 계산한다 (engine.calculate_batch와 같음).
+    """
+    budget, target_year, r35, r40, r45 = engine.as_batch(budget, target_year, r35, r40, r45)
+    k = RATE_KEYS.index(solve_for) + 1  # 가중치 열 (0번은 2030년)
+    fixed_cumulative, _, base = engine.inventory_constants(inventory)
+
+    weights = engine.cumulative_weights(target_year)
+    targets = np.hstack(engine.milestone_values(target_year, r35, r40, r45,
+                                                *engine.inventory_anchors(inventory, len(budget))[1:]))
+
+    # 감축률 0%일 때의 누적 배출량과 1%p당 감소량
+    # (목표연도가 해당 기준연도와 같으면 목표값이 0으로 고정되어 감소량도 0)
+    targets[:, k] = np.where(target_year == MILESTONE_YEAR[solve_for], 0.0, base)
+    total_at_zero = fixed_cumulative + (weights * targets).sum(axis=1)
+    slope = weights[:, k] * targets[:, k] / 100
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = np.where(slope > 0, (total_at_zero - budget) / slope, RATE_MIN)
+    rate = np.clip(rate, RATE_MIN, RATE_MAX)
+
+    rates = {'r35': r35, 'r40': r40, 'r45': r45, solve_for: rate}
+    return _solution(solve_for, rate, budget, target_year, rates['r35'], rates['r40'], rates['r45'], inventory)
+
+
+def solve_target_year(budget, r35, r40, r45, year_min=TARGET_YEAR_MIN, year_max=TARGET_YEAR_MAX, inventory=None):
+    """감축률을 고정하고 탄소예산을 지키는 가장 늦은 탄소중립 목표연도 계산
+
+    모든 후보 연도를 한 번에 평가하며, 예산을 지키는 연도가 없으면
+    누적 배출량이 가장 작은(초과 배출량 최소) 연도를 반환한다.
+    """
+    budget, _, r35, r40, r45 = engine.as_batch(budget, year_min, r35, r40, r45)
+    candidates = np.arange(year_min, year_max + 1)
+    if len(candidates) == 0:
+        raise ValueError('목표연도 탐색 범위가 비어 있습니다.')
+    fixed_cumulative = engine.inventory_constants(inventory)[0]
+    anchors = engine.inventory_anchors(inventory, len(budget))[1:]
+
+    # 후보 연도별 누적 배출량 (시나리오 × 후보 연도)
+    weights = engine.cumulative_weights(candidates)
+    totals = np.empty((len(budget), len(candidates)))
+    for j, year in enumerate(candidates):
+        year_column = np.full(len(budget), year)
+        targets = np.hstack(engine.milestone_values(year_column, r35, r40, r45, *anchors))
+        totals[:, j] = fixed_cumulative + targets @ weights[j]
+
+    within = totals <= budget[:, None]
+    latest_within = len(candidates) - 1 - np.argmax(within[:, ::-1], axis=1)
+    best = np.where(within.any(axis=1), latest_within, np.argmin(totals, axis=1))
+    target_year = candidates[best]
+
+    return _solution('target_year', target_year, budget, target_year, r35, r40, r45, inventory)
+
+
+def solve(budget, target_year, r35, r40, r45, solve_for='r35', inventory=None):
+    """solve_for에 지정한 파라미터를 역산"""
+    if solve_for not in SOLVABLE:
+        raise ValueError(f'solve_for는 {", ".join(SOLVABLE)} 중 하나여야 합니다.')
+    if solve_for == 'target_year':
+        return solve_target_year(budget, r35, r40, r45, inventory=inventory)
+    return solve_rate(budget, target_year, r35, r40, r45, solve_for, inventory)
+
+
+def _solution(solve_for, value, budget, target_year, r35, r40, r45, inventory=None):
+    """역산 결과를 엔진으로 다시 계산하여 누적/초과 배출량과 함께 반환"""
+    result = engine.calculate_batch(budget, target_year, r35, r40, r45, inventory=inventory)
+    return {
+        'solve_for': solve_for,
+        'value': value,
+        'feasible': result['over_emission'] <= 1e-9,
+        'total_emission': result['total_emission'],
+        'over_emission': result['over_emission']
+    }
@@ -0,0 +1,131 @@
+# 파라미터 격자 스윕: 격자를 청크 단위로 계산하여 CSV/NDJSON으로 스트리밍 (메모리 사용량 일정)
+import io
+import json
+import zlib
+
+import numpy as np
+
+import engine
+
+CHUNK_SIZE = 10_000       # 한 번에 계산할 시나리오 수
+MAX_ROWS = 50_000_000     # 격자 최대 크기
+FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+
+def grid_axis(key, spec):
+    """격자 축 값 배열
+
+    spec은 숫자, 숫자 목록, 또는 {'start': .., 'stop': .., 'step': ..} (stop 포함).
+    """
+    if isinstance(spec, dict):
+        start, stop, step = float(spec['start']), float(spec['stop']), float(spec.get('step', 1))
+        if step <= 0:
+            raise ValueError(f'{key}의 step은 0보다 커야 합니다.')
+        count = int(np.floor((stop - start) / step + 1e-9)) + 1
+        values = start + step * np.arange(max(count, 0))
+    else:
+        values = np.atleast_1d(np.asarray(spec, dtype=float))
+    if values.ndim != 1 or len(values) == 0:
+        raise ValueError(f'{key}의 격자 값이 비어 있습니다.')
+    if key == 'target_year':
+        values = values.astype(np.int64)
+    return values
+
+
+class Grid:
+    """파라미터 격자 (budget × target_year × r35 × r40 × r45 의 데카르트 곱)
+
+    inventory를 지정하면 국가 고정 데이터 대신 그 인벤토리로 계산한다.
+    """
+
+    def __init__(self, spec, inventory=None):
+        self.inventory = inventory
+        self.axes = {key: grid_axis(key, spec[key]) for key in engine.PARAM_KEYS}
+        self.shape = tuple(len(axis) for axis in self.axes.values())
+        self.size = int(np.prod(self.shape, dtype=np.int64))
+        if self.size > MAX_ROWS:
+            raise ValueError(f'격자가 너무 큽니다 ({self.size}개, 최대 {MAX_ROWS}개).')
+        self.last_year = max(int(self.axes['target_year'].max()), engine.SCENARIO_START_YEAR)
+        self.years = np.arange(engine.START_YEAR, self.last_year + 1)
+
+    def chunks(self, chunk_size=CHUNK_SIZE, progress=None):
+        """청크별 (파라미터 dict, 계산 결과) 생성 — 경로는 전체 연도 폭으로 맞춤
+
+        progress를 지정하면 청크마다 progress(완료 행 수, 전체 행 수)를 호출한다.
+        """
+        for start in range(0, self.size, chunk_size):
+            flat = np.arange(start, min(start + chunk_size, self.size))
+            indices = np.unravel_index(flat, self.shape)
+            params = {key: axis[index] for (key, axis), index in zip(self.axes.items(), indices)}
+            result = engine.calculate_batch(**params, inventory=self.inventory)
+
+            pathways = result['pathways']
+            if pathways.shape[1] < len(self.years):
+                padding = np.zeros((len(flat), len(self.years) - pathways.shape[1]))
+                pathways = np.hstack([pathways, padding])
+            result['pathways'] = pathways
+            yield params, result
+            if progress:
+                progress(start + len(flat), self.size)
+
+
+def format_param(value):
+    """CSV 파라미터 값 (정수는 소수점 없이, 그 외에는 원래 값으로 되돌릴 수 있는 최단 표현)"""
+    if isinstance(value, int) or value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def csv_stream(grid, precision=3, progress=None):
+    """CSV 스트림 (목표연도 이후 연도는 0)
+
+    파라미터 열은 입력 값 그대로(최단 표현), 결과 열은 precision 자리 소수로 쓴다.
+    """
+    header = list(engine.PARAM_KEYS) + ['total_emission', 'over_emission'] + [str(y) for y in grid.years]
+    yield ','.join(header) + '\n'
+
+    value_format = f'%.{precision}f'
+    labels = {key: {value: format_param(value) for value in axis.tolist()} for key, axis in grid.axes.items()}
+    for params, result in grid.chunks(progress=progress):
+        keys = zip(*([labels[key][value] for value in params[key].tolist()] for key in engine.PARAM_KEYS))
+        table = np.column_stack([result['total_emission'], result['over_emission'], result['pathways']])
+        buffer = io.StringIO()
+        np.savetxt(buffer, table, fmt=value_format, delimiter=',')
+        values = buffer.getvalue().splitlines()
+        yield ''.join(','.join(key) + ',' + row + '\n' for key, row in zip(keys, values))
+
+
+def ndjson_stream(grid, precision=3, progress=None):
+    """NDJSON 스트림 (한 줄에 시나리오 하나, values는 2018년부터 목표연도까지)"""
+    for params, result in grid.chunks(progress=progress):
+        columns = {key: params[key].tolist() for key in engine.PARAM_KEYS}
+        totals = result['total_emission'].tolist()
+        overs = result['over_emission'].tolist()
+        pathways = result['pathways']
+        lines = []
+        for i, target_year in enumerate(columns['target_year']):
+            row = {key: columns[key][i] for key in engine.PARAM_KEYS}
+            row['total_emission'] = round(totals[i], 3)
+            row['over_emission'] = round(overs[i], 3)
+            row['values'] = [round(v, precision) for v in pathways[i, :engine.pathway_length(target_year)].tolist()]
+            lines.append(json.dumps(row))
+        yield '\n'.join(lines) + '\n'
+
+
+def stream(grid, fmt='csv', precision=3, progress=None):
+    """지정한 형식의 텍스트 스트림"""
+    if fmt not in FORMATS:
+        raise ValueError(f'지원하지 않는 형식입니다: {fmt} ({", ".join(FORMATS)} 중 선택)')
+    precision = min(max(int(precision), 0), 10)
+    writer = csv_stream if fmt == 'csv' else ndjson_stream
+    return writer(grid, precision, progress)
+
+
+def gzip_stream(chunks):
+    """텍스트 청크 스트림을 gzip으로 압축하며 전달"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip 헤더
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
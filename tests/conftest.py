@@ -0,0 +1,46 @@
+# 테스트 공용 fixture
+import numpy as np
+import pytest
+
+import cache
+import event_log
+import inventory
+import jobs
+import live
+import montecarlo
+import scenario_store
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    """임시 작업 디렉토리에서 동작하는 app 모듈 (저장소 파일을 건드리지 않음)
+
+    app은 import 시 저장소 폴더로 이동하므로, 파일을 쓰는 전역 객체를 모두 임시 디렉토리의 것으로 바꾼다.
+    """
+    import app
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(app, 'scenario_index', scenario_store.ScenarioStore(
+        str(tmp_path / 'saved_scenarios')
+    ))
+    monkeypatch.setattr(app, 'usage_log', event_log.EventLog(
+        str(tmp_path / 'events'), flush_interval=3600, compact_interval=3600
+    ))
+    monkeypatch.setattr(app, 'result_cache', cache.ResultCache(maxsize=0))  # 매번 계산하도록 캐시 비활성화
+    monkeypatch.setattr(app, 'inventories', inventory.Inventories(
+        str(tmp_path / 'inventories'), str(tmp_path / 'data'), check_interval=0
+    ))
+    monkeypatch.setattr(app, 'job_queue', jobs.JobQueue(str(tmp_path / 'jobs'), workers=1))
+    monkeypatch.setattr(app, 'live_channels', live.LiveChannels())
+    monkeypatch.setattr(app, 'simulation_pool', montecarlo.SimulationPool(1))
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(20240601)
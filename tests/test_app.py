@@ -0,0 +1,96 @@
+import engine
+
+SETTINGS = {'budget': 87.4, 'target_year': 2050, 'r35': 50, 'r40': 70, 'r45': 85}
+
+
+def random_requests(rng, n):
+    return [{'budget': round(float(rng.uniform(0, 200)), 2), 'target_year': int(rng.integers(2040, 2051)),
+             'r35': round(float(rng.uniform(0, 100)), 1), 'r40': round(float(rng.uniform(0, 100)), 1),
+             'r45': round(float(rng.uniform(0, 100)), 1)} for _ in range(n)]
+
+
+def test_batch_matches_calculate(client, rng):
+    requests = random_requests(rng, 30)
+    batch = client.post('/calculate_batch', json={
+        key: [params[key] for params in requests] for key in engine.PARAM_KEYS
+    }).get_json()
+    assert batch['count'] == 30
+    for i, params in enumerate(requests):
+        full = client.post('/calculate', json=params).get_json()
+        assert batch['total_emission'][i] == full['total_emission']
+        assert batch['over_emission'][i] == full['over_emission']
+
+
+def test_bad_input_rejected(client):
+    assert client.post('/calculate', json={'budget': 87.4}).status_code == 400
+    assert client.post('/calculate_batch', json={**SETTINGS, 'r35': [50, 60, 70], 'r40': [70, 80]}).status_code == 400
+
+
+def test_compact_matches_full_response(client, rng):
+    for params in random_requests(rng, 50):
+        full = client.post('/calculate', json=params).get_json()
+        compact = client.post('/calculate?format=compact', json=params).get_json()
+
+        assert compact['total_emission'] == full['total_emission']
+        assert compact['over_emission'] == full['over_emission']
+        assert compact['scenario'] == full['scenario']
+        values = [round(item['value'], 3) for item in full['all_data']]
+        assert compact['values'] == values
+        assert compact['start_year'] + compact['length'] - 1 == full['all_data'][-1]['year']
+
+
+def test_compact_etag_revalidates(client):
+    headers = {'Accept': 'application/vnd.netzero.compact+json'}
+    first = client.post('/calculate', json=SETTINGS, headers=headers)
+    assert first.status_code == 200
+    second = client.post('/calculate', json=SETTINGS, headers={**headers, 'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 304
+    other = client.post('/calculate', json={**SETTINGS, 'r35': 51},
+                        headers={**headers, 'If-None-Match': first.headers['ETag']})
+    assert other.status_code == 200
+
+
+def test_compact_etag_follows_body(client, monkeypatch):
+    headers = {'Accept': 'application/vnd.netzero.compact+json'}
+    first = client.post('/calculate', json=SETTINGS, headers=headers)
+    # 엔진(데이터)이 바뀌면 같은 파라미터라도 ETag가 달라져 새 결과를 받음
+    monkeypatch.setitem(engine.FIXED_DATA, 2030, engine.FIXED_DATA[2030] + 1)
+    changed = client.post('/calculate', json=SETTINGS, headers={**headers, 'If-None-Match': first.headers['ETag']})
+    assert changed.status_code == 200 and changed.headers['ETag'] != first.headers['ETag']
+
+
+def test_compare_saved_and_inline_scenarios(client):
+    saved = client.post('/save_scenario', json={'scenario': SETTINGS, 'name': '기준'}).get_json()
+    compared = client.post('/compare', json={
+        'filenames': [saved['filename']], 'scenarios': [{**SETTINGS, 'target_year': 2045, 'name': '앞당김'}]
+    }).get_json()
+    assert compared['success']
+    assert [s['name'] for s in compared['scenarios']] == ['기준', '앞당김']
+
+    expected = engine.calculate_batch(87.4, [2050, 2045], 50, 70, 85)
+    totals = [round(float(v), 3) for v in expected['total_emission']]
+    assert [s['total_emission'] for s in compared['scenarios']] == totals
+    assert compared['scenarios'][1]['delta_total_emission'] == round(
+        float(expected['total_emission'][1] - expected['total_emission'][0]), 3
+    )
+    assert compared['scenarios'][1]['values'][-1] == 0.0
+
+
+def test_compare_uses_milestones_and_shapes(client):
+    custom = {'budget': 87.4, 'target_year': 2048, 'milestones': {'2033': 30, '2042': 75}, 'shapes': 'spline'}
+    compared = client.post('/compare', json={'scenarios': [SETTINGS, custom, {**custom, 'shapes': 'linear'}]}).get_json()
+    assert compared['success']
+
+    for scenario, settings in zip(compared['scenarios'], [SETTINGS, custom, {**custom, 'shapes': 'linear'}]):
+        full = client.post('/calculate', json=settings).get_json()
+        assert scenario['total_emission'] == full['total_emission']
+        assert scenario['values'] == [round(item['value'], 3) for item in full['all_data']]
+        compact = client.post('/calculate?format=compact', json=settings).get_json()
+        assert scenario['key_years'] == compact['key_years']
+    assert compared['scenarios'][1]['settings']['milestones'] == custom['milestones']
+    assert compared['scenarios'][1]['values'] != compared['scenarios'][2]['values']
+
+
+def test_compare_rejects_paths_and_empty_requests(client):
+    assert client.post('/compare', json={'filenames': ['../app.py']}).status_code == 400
+    assert client.post('/compare', json={}).status_code == 400
@@ -0,0 +1,56 @@
+import os
+
+import cache
+import inventory
+
+SETTINGS = {'budget': 87.4, 'target_year': 2050, 'r35': 50, 'r40': 70, 'r45': 85}
+
+
+def test_make_key():
+    key = cache.make_key(87.4, 2050, 50, 70, 85)
+    assert key == cache.make_key('87.4', 2050.0, 50.0000000001, 70, 85)
+    assert key != cache.make_key(87.4, 2050, 50.001, 70, 85)
+    assert key != cache.make_key(87.4, 2050, 50, 70, 85, inventory=inventory.DEFAULT)
+    assert cache.make_key(*key, {2035: 50}) == cache.make_key(*key, {'2035': 50.0})
+    assert cache.make_key(*key, {2035: 50}) != cache.make_key(*key, {2035: 50}, 'spline')
+
+
+def test_lru_eviction():
+    result_cache = cache.ResultCache(maxsize=2)
+    result_cache.set('a', b'1')
+    result_cache.set('b', b'2')
+    assert result_cache.get('a') == b'1'
+    result_cache.set('c', b'3')  # 가장 오래 쓰지 않은 b 제거
+    assert result_cache.get('b') is None
+    assert result_cache.stats() == {'size': 2, 'maxsize': 2, 'hits': 1, 'misses': 1, 'evictions': 1,
+                                    'hit_rate': 0.5, 'shared': False}
+
+
+def test_disk_tier_shared_between_instances(tmp_path):
+    first = cache.ResultCache(maxsize=4, directory=str(tmp_path))
+    second = cache.ResultCache(maxsize=4, directory=str(tmp_path))
+    first.set(('key',), b'body')
+    assert second.get(('key',)) == b'body'
+    assert [name for name in os.listdir(tmp_path) if not name.endswith('.json')] == []
+
+    first.clear()
+    assert os.listdir(tmp_path) == [] and first.get(('key',)) is None
+
+
+def test_failed_disk_write_leaves_no_tmp_file(tmp_path, monkeypatch):
+    result_cache = cache.ResultCache(maxsize=4, directory=str(tmp_path))
+
+    def replace_fails(src, dst):
+        raise OSError('디스크 가득 참')
+
+    monkeypatch.setattr(cache.os, 'replace', replace_fails)
+    result_cache.set(('key',), b'body')
+    assert os.listdir(tmp_path) == []
+    assert result_cache.get(('key',)) == b'body'  # 메모리 계층은 그대로 사용
+
+
+def test_calculate_served_from_cache(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, 'result_cache', cache.ResultCache(maxsize=4))
+    first = client.post('/calculate', json=SETTINGS).get_data()
+    assert client.post('/calculate', json={**SETTINGS, 'r35': 50.0000001}).get_data() == first
+    assert client.get('/cache_stats').get_json()['hits'] == 1
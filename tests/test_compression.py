@@ -0,0 +1,41 @@
+import gzip
+
+import compression
+
+SETTINGS = {'budget': 87.4, 'target_year': 2050, 'r35': 50, 'r40': 70, 'r45': 85}
+
+
+def test_compressed_body_matches_plain(client):
+    plain = client.post('/calculate', json=SETTINGS)
+    compressed = client.post('/calculate', json=SETTINGS, headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in plain.headers
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.get_data()) == plain.get_data()
+
+
+def test_static_files_get_hashed_urls(app_module, client):
+    filename = 'images/Turntable_logo.png'
+    entry = app_module.response_compression.static_files[filename]
+    assert 'gzip' not in entry  # PNG는 이미 압축된 형식이라 압축본을 만들지 않음
+    response = client.get(f'/static/{filename}?v={entry["hash"]}', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200 and 'Content-Encoding' not in response.headers
+    assert 'immutable' in response.headers['Cache-Control']
+    assert 'immutable' not in client.get(f'/static/{filename}').headers['Cache-Control']
+    assert f'{filename}?v={entry["hash"]}' in client.get('/').get_data(as_text=True)
+
+
+def test_already_compressed_types_skipped(tmp_path, monkeypatch):
+    (tmp_path / 'style.css').write_text('body { margin: 0; }\n' * 200, encoding='utf-8')
+    (tmp_path / 'photo.jpg').write_bytes(b'\0' * 4000)  # 압축이 잘 되는 내용이어도 형식으로 판단
+    (tmp_path / 'data.json.gz').write_bytes(b'\0' * 4000)
+    compressed = []
+    monkeypatch.setattr(compression, 'compress',
+                        lambda data, encoding, static=False: compressed.append(len(data)) or gzip.compress(data))
+
+    response_compression = compression.Compression()
+    response_compression.build_static(str(tmp_path))
+    files = response_compression.static_files
+    assert sorted(files) == ['data.json.gz', 'photo.jpg', 'style.css']
+    assert 'gzip' in files['style.css']
+    assert 'gzip' not in files['photo.jpg'] and 'gzip' not in files['data.json.gz']
+    assert compressed == [len('body { margin: 0; }\n' * 200)] * len(response_compression.encodings)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+import cube
+import engine
+
+
+@pytest.fixture
+def cube_file(tmp_path):
+    """격자 전체 대신 조회할 점만 채운 큐브 파일 (나머지는 0인 희소 파일)"""
+    path = str(tmp_path / 'cube.npy')
+    values = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=cube.SHAPE)
+    index = np.array([[0, 0, 0, 0], [10, 100, 100, 100], [5, 50, 70, 85], [3, 17, 64, 99],
+                      [7, 30, 60, 90], [10, 0, 100, 0]])
+    result = engine.calculate_batch(0.0, cube.TARGET_YEARS[index[:, 0]], *index[:, 1:].T)
+    values[tuple(index.T)] = result['total_emission']
+    values.flush()
+    del values
+    return path
+
+
+def test_build_matches_engine(tmp_path, monkeypatch, rng):
+    monkeypatch.setattr(cube, 'TARGET_YEARS', np.array([2047]))
+    monkeypatch.setattr(cube, 'SHAPE', (1, len(cube.RATES), len(cube.RATES), len(cube.RATES)))
+    path = str(tmp_path / 'cube.npy')
+    cube.build(path)
+
+    values = np.load(path)
+    r35, r40, r45 = rng.integers(0, 101, (3, 500))
+    expected = engine.calculate_batch(0.0, 2047, r35, r40, r45)['total_emission']
+    assert np.array_equal(values[0, r35, r40, r45], expected)
+
+
+def test_lookup_matches_engine(cube_file):
+    result_cube = cube.ResultCube(cube_file)
+    assert result_cube.loaded
+
+    # 격자 위의 점(큐브 조회)과 격자 밖의 점(소수 감축률, 범위 밖 목표연도)을 섞어 조회
+    target_year = np.array([2047, 2050, 2045, 2045, 2039, 2047])
+    r35 = np.array([30, 0, 50, 50.5, 50, 30])
+    r40 = np.array([60, 100, 70, 70, 70, 60])
+    r45 = np.array([90, 0, 85, 85, 85, 90])
+    budget = np.array([80.0, 90.0, 87.4, 87.4, 87.4, 1000.0])
+    result = result_cube.total_emission(budget, target_year, r35, r40, r45)
+    expected = engine.calculate_batch(budget, target_year, r35, r40, r45)
+
+    assert np.array_equal(result['total_emission'], expected['total_emission'])
+    assert np.array_equal(result['over_emission'], expected['over_emission'])
+    mask, _ = result_cube.grid_index(target_year, r35, r40, r45)
+    assert mask.tolist() == [True, True, True, False, False, True]
+
+
+def test_outdated_cube_ignored(cube_file):
+    values = np.load(cube_file, mmap_mode='r+')
+    values[5, 50, 70, 85] += 1.0
+    values.flush()
+    del values
+    assert not cube.ResultCube(cube_file).loaded
+
+
+def test_missing_cube_falls_back_to_engine(tmp_path):
+    result_cube = cube.ResultCube(str(tmp_path / 'missing.npy'))
+    assert not result_cube.loaded
+    result = result_cube.total_emission(87.4, 2050, 50, 70, 85)
+    assert result['total_emission'][0] == engine.calculate_batch(87.4, 2050, 50, 70, 85)['total_emission'][0]
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+import engine
+
+
+def random_params(rng, n):
+    return (rng.uniform(0, 200, n), rng.integers(2031, 2051, n),
+            rng.uniform(0, 100, n), rng.uniform(0, 100, n), rng.uniform(0, 100, n))
+
+
+def scenario_total(budget, target_year, r35=None, r40=None, r45=None, **options):
+    """/calculate와 같은 방식(연도 순서대로 sum)의 누적 배출량"""
+    values = [engine.FIXED_DATA[year] for year in range(engine.CUMULATIVE_START_YEAR, engine.SCENARIO_START_YEAR)]
+    values += [item['value'] for item in engine.calculate_scenario(budget, target_year, r35, r40, r45, **options)]
+    return sum(values)
+
+
+def test_batch_matches_single_scenarios_exactly(rng):
+    params = random_params(rng, 200)
+    result = engine.calculate_batch(*params)
+
+    for i, row in enumerate(zip(*params)):
+        budget, target_year = float(row[0]), int(row[1])
+        scenario = engine.calculate_scenario(budget, target_year, *map(float, row[2:]))
+        length = engine.pathway_length(target_year)
+        assert result['pathways'][i, :length].tolist() == (
+            engine.FIXED_VALUES.tolist() + [item['value'] for item in scenario]
+        )
+        assert not result['pathways'][i, length:].any()
+        total = scenario_total(budget, target_year, *map(float, row[2:]))
+        assert result['total_emission'][i] == total
+        assert result['over_emission'][i] == max(0, total - budget)
+
+
+def test_pathway_reaches_zero_at_target_year():
+    scenario = engine.calculate_scenario(87.4, 2045, 50, 70, 85)
+    assert scenario[0] == {'year': 2030, 'value': engine.FIXED_DATA[2030]}
+    assert scenario[-1] == {'year': 2045, 'value': 0.0}
+
+
+@pytest.mark.parametrize('shapes', [*engine.SHAPES, ['spline', 'linear', 'logistic', 'exponential']])
+def test_custom_milestones_batch_matches_single(rng, shapes):
+    n = 50
+    milestones = {2033: rng.uniform(0, 100, n), 2038: rng.uniform(0, 100, n), 2044: rng.uniform(0, 100, n)}
+    budget, target_year = rng.uniform(0, 200, n), rng.integers(2045, 2051, n)
+    result = engine.calculate_batch(budget, target_year, milestones=milestones, shapes=shapes)
+
+    for i in range(n):
+        single = {year: float(rates[i]) for year, rates in milestones.items()}
+        total = scenario_total(budget[i], target_year[i], milestones=single, shapes=shapes)
+        assert result['total_emission'][i] == pytest.approx(total, rel=1e-12)
+
+
+def test_default_milestones_use_linear_kernel(rng):
+    budget, target_year, r35, r40, r45 = random_params(rng, 100)
+    default = engine.calculate_batch(budget, target_year, r35, r40, r45)
+    explicit = engine.calculate_batch(budget, target_year, milestones={2035: r35, 2040: r40, 2045: r45},
+                                      shapes='linear')
+    assert np.array_equal(default['pathways'], explicit['pathways'])
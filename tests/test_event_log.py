@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import event_log
+
+
+@pytest.fixture
+def log(tmp_path):
+    return event_log.EventLog(str(tmp_path / 'events'), flush_interval=3600, compact_interval=3600)
+
+
+def timestamp(day, hour=12):
+    return datetime(day.year, day.month, day.day, hour).timestamp()
+
+
+def test_concurrent_records_are_counted_once(tmp_path, log):
+    threads, per_thread = 8, 500
+    other = event_log.EventLog(log.directory, flush_interval=3600, compact_interval=3600)  # 다른 워커
+    done = threading.Event()
+
+    def records(i):
+        target = log if i % 2 else other
+        for j in range(per_thread):
+            target.record('calculate' if j % 5 else 'visit', f'combo-{j % 3}')
+
+    def compact():
+        while not done.is_set():
+            log.compact()
+            other.flush()
+
+    workers = [threading.Thread(target=records, args=(i,)) for i in range(threads)]
+    compactor = threading.Thread(target=compact)
+    compactor.start()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    done.set()
+    compactor.join()
+    other.compact()
+    log.compact()
+
+    today = date.today()
+    totals = log.totals(today, today)
+    assert totals == {'visit': threads * per_thread // 5, 'calculate': threads * per_thread * 4 // 5}
+    lines = sum(len(open(os.path.join(log.directory, name), encoding='utf-8').readlines())
+                for name in os.listdir(log.directory) if name.endswith(event_log.LOG_SUFFIX))
+    assert lines == threads * per_thread
+    combos = {item['combo']: item['count'] for item in log.top_combos(today, today)}
+    assert sum(combos.values()) == threads * per_thread
+
+    log.compact()
+    assert log.totals(today, today) == totals
+
+
+def test_incomplete_last_line_waits_for_next_compact(log):
+    log.record('visit')
+    log.compact()
+    path = os.path.join(log.directory, date.today().isoformat() + event_log.LOG_SUFFIX)
+    line = json.dumps({'t': time.time(), 'k': 'visit'}) + '\n'
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(line[:10])
+    log.compact()
+    assert log.totals(date.today(), date.today())['visit'] == 1
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(line[10:])
+    log.compact()
+    assert log.totals(date.today(), date.today())['visit'] == 2
+
+
+def test_range_queries_match_daily_counts(rng, log):
+    start = date(2023, 1, 1)
+    days = [start + timedelta(days=int(offset)) for offset in rng.integers(0, 420, 2000)]
+    for day in days:
+        log.record('visit', when=timestamp(day))
+    log.compact()
+
+    for _ in range(30):
+        first, last = sorted(start + timedelta(days=int(offset)) for offset in rng.integers(-10, 430, 2))
+        expected = sum(first <= day <= last for day in days)
+        assert log.totals(first, last)['visit'] == expected
+        daily = log.series('day', first, last)
+        assert sum(item['visit'] for item in daily) == expected
+        assert len(daily) == (last - first).days + 1
+
+
+def test_cover_splits_range_exactly(rng):
+    for _ in range(200):
+        first = date(2024, 1, 1) + timedelta(days=int(rng.integers(0, 400)))
+        last = first + timedelta(days=int(rng.integers(0, 200)))
+        covered = []
+        for period, starts in event_log.cover(first, last).items():
+            for key in starts:
+                day = date.fromisoformat(key)
+                end = {'day': day, 'week': day + timedelta(days=6),
+                       'month': event_log._next_month(day) - timedelta(days=1)}[period]
+                covered += [day + timedelta(days=i) for i in range((end - day).days + 1)]
+        assert sorted(covered) == [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+def test_legacy_stats_imported_once(tmp_path):
+    stats = tmp_path / 'stats.json'
+    stats.write_text(json.dumps({'2024-03-05': {'visits': 4}, 'bad': {}}), encoding='utf-8')
+    log = event_log.EventLog(str(tmp_path / 'events'), legacy_stats=str(stats))
+    assert log.totals(date(2024, 3, 1), date(2024, 3, 31))['visit'] == 4
+    again = event_log.EventLog(str(tmp_path / 'events'), legacy_stats=str(stats))
+    assert again.totals(date(2024, 3, 1), date(2024, 3, 31))['visit'] == 4
+
+
+def test_unknown_kind_rejected(log):
+    with pytest.raises(ValueError):
+        log.record('download')
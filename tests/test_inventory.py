@@ -0,0 +1,148 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+import engine
+import inventory
+
+
+def write_csv(path, region, gas, scale):
+    lines = ['region,gas,year,value']
+    lines += [f'{region},{gas},{year},{engine.FIXED_DATA[year] * scale!r}' for year in inventory.YEARS.tolist()]
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+@pytest.fixture
+def inventories(tmp_path):
+    (tmp_path / 'inventories').mkdir()
+    return inventory.Inventories(str(tmp_path / 'inventories'), str(tmp_path / 'data'), check_interval=0)
+
+
+def test_regional_inventory_scales_pathway(tmp_path, inventories):
+    write_csv(tmp_path / 'inventories' / 'seoul.csv', 'SEOUL', 'GHG', 0.1)
+    seoul = inventories.get('SEOUL', 'GHG')
+    assert seoul.source == 'seoul.csv'
+    assert seoul.base_emission == pytest.approx(engine.BASE_EMISSION * 0.1)
+
+    national = engine.calculate_batch(87.4, 2050, 50, 70, 85)
+    regional = engine.calculate_batch(87.4, 2050, 50, 70, 85, inventory=seoul)
+    assert np.allclose(regional['pathways'], national['pathways'] * 0.1, rtol=1e-12)
+    single = engine.calculate_scenario(87.4, 2050, 50, 70, 85, inventory=seoul)
+    assert [item['value'] for item in single] == regional['pathways'][0, len(engine.FIXED_VALUES):].tolist()
+
+
+def test_default_comes_from_engine_until_overridden(tmp_path, inventories):
+    assert inventories.get() is inventory.DEFAULT
+    assert [item.source for item in inventories.list()] == ['engine.py']
+
+    path = tmp_path / 'inventories' / 'kr.json'
+    series = {str(year): engine.FIXED_DATA[year] * 1.05 for year in inventory.YEARS.tolist()}
+    path.write_text(json.dumps({'region': 'KR', 'gas': 'GHG', 'series': series}), encoding='utf-8')
+    overridden = inventories.get()
+    assert overridden is not inventory.DEFAULT and overridden.source == 'kr.json'
+    assert overridden.ndc_2030 == pytest.approx(engine.FIXED_DATA[2030] * 1.05)
+    assert [item.source for item in inventories.list()] == ['kr.json']
+
+    # 파일을 고치면 버전(캐시 키)이 바뀌고, 지우면 engine.py 값으로 돌아감
+    series['2030'] = 3.0
+    path.write_text(json.dumps({'region': 'KR', 'gas': 'GHG', 'series': series}), encoding='utf-8')
+    os.utime(path, ns=(0, 10**9))
+    updated = inventories.get()
+    assert updated.ndc_2030 == 3.0 and updated.key != overridden.key
+    path.unlink()
+    assert inventories.get() is inventory.DEFAULT
+
+
+def test_bad_files_are_skipped_and_reported(tmp_path, inventories):
+    write_csv(tmp_path / 'inventories' / 'a.csv', 'BUSAN', 'CO2', 0.05)
+    write_csv(tmp_path / 'inventories' / 'b.csv', 'BUSAN', 'CO2', 0.06)  # 중복
+    (tmp_path / 'inventories' / 'c.csv').write_text('region,gas,year,value\nX,CO2,2018,1\n', encoding='utf-8')
+    (tmp_path / 'inventories' / 'd.json').write_text('{', encoding='utf-8')
+
+    assert inventories.get('BUSAN', 'CO2').source == 'a.csv'
+    assert sorted(error.split(':')[0] for error in inventories.errors) == ['b.csv', 'c.csv', 'd.json']
+    with pytest.raises(ValueError):
+        inventories.get('X', 'CO2')
+
+
+def test_cache_shared_between_instances(tmp_path, inventories):
+    write_csv(tmp_path / 'inventories' / 'seoul.csv', 'SEOUL', 'GHG', 0.1)
+    first = inventories.get('SEOUL', 'GHG')
+    cached = sorted(os.listdir(tmp_path / 'data'))
+    assert cached == [f'inventory-{first.version}.json', f'inventory-{first.version}.npy']
+
+    other = inventory.Inventories(str(tmp_path / 'inventories'), str(tmp_path / 'data'), check_interval=0)
+    assert isinstance(other.get('SEOUL', 'GHG').values, np.memmap)
+    assert sorted(os.listdir(tmp_path / 'data')) == cached
+
+
+def test_inventory_override_changes_results(tmp_path, client):
+    params = {'budget': 87.4, 'target_year': 2050, 'r35': 50, 'r40': 70, 'r45': 85}
+    national = client.post('/calculate', json=params).get_json()
+    assert client.post('/calculate', json={**params, 'region': 'SEOUL'}).status_code == 400
+
+    (tmp_path / 'inventories').mkdir()
+    series = {str(year): engine.FIXED_DATA[year] / 10 for year in inventory.YEARS.tolist()}
+    (tmp_path / 'inventories' / 'seoul.json').write_text(
+        json.dumps({'region': 'SEOUL', 'gas': 'GHG', 'series': series}), encoding='utf-8'
+    )
+    regional = client.post('/calculate', json={**params, 'region': 'SEOUL'}).get_json()
+    assert regional['scenario']['region'] == 'SEOUL'
+    assert regional['total_emission'] == pytest.approx(national['total_emission'] / 10, abs=1e-3)
+    batch = client.post('/calculate_batch', json={**params, 'region': 'SEOUL'}).get_json()
+    assert batch['total_emission'] == [regional['total_emission']]
+    assert client.post('/calculate', json=params).get_json() == national
+
+
+def test_national_override_applies_to_every_analysis(tmp_path, client):
+    params = {'budget': 87.4, 'target_year': 2050, 'r35': 50, 'r40': 70, 'r45': 85}
+    half = {**params, 'budget': 43.7}
+    requests = [
+        ('/calculate', params, half),
+        ('/solve', {**params, 'solve_for': 'r40'}, {**half, 'solve_for': 'r40'}),
+        ('/sensitivity', params, half),
+        ('/pareto', {'budget': 87.4, 'step': 25}, {'budget': 43.7, 'step': 25}),
+        ('/monte_carlo', {**params, 'samples': 10}, {**half, 'samples': 10}),
+        ('/calculate_sectors', params, half),
+    ]
+    national = [client.post(url, json=body).get_json() for url, body, _ in requests]
+    national_sweep = client.post('/export_sweep', json=params).get_data(as_text=True)
+
+    (tmp_path / 'inventories').mkdir()
+    series = {str(year): engine.FIXED_DATA[year] / 2 for year in inventory.YEARS.tolist()}
+    (tmp_path / 'inventories' / 'kr.json').write_text(
+        json.dumps({'region': 'KR', 'gas': 'GHG', 'series': series}), encoding='utf-8'
+    )
+    # 모든 배출량이 절반이면 예산도 절반일 때 감축률 역산 결과와 감축 속도는 같고 배출량은 절반
+    overridden = [client.post(url, json=body).get_json() for url, _, body in requests]
+    calculate, solve, sens, front, monte, sector = zip(national, overridden)
+    assert calculate[1]['total_emission'] == pytest.approx(calculate[0]['total_emission'] / 2, abs=1e-3)
+    assert solve[1]['value'] == pytest.approx(solve[0]['value'])
+    assert solve[1]['total_emission'] == pytest.approx([v / 2 for v in solve[0]['total_emission']], abs=1e-3)
+    assert sens[1]['total_emission'] == pytest.approx([v / 2 for v in sens[0]['total_emission']], abs=1e-3)
+    assert front[1]['r35'] == front[0]['r35'] and front[1]['max_reduction'] == front[0]['max_reduction']
+    assert monte[1]['total_emission']['mean'] == pytest.approx(monte[0]['total_emission']['mean'] / 2, abs=1e-3)
+    assert monte[1]['bands']['50'] == pytest.approx([v / 2 for v in monte[0]['bands']['50']], abs=1e-3)
+    assert sector[1]['national']['total_emission'] == pytest.approx(
+        [v / 2 for v in sector[0]['national']['total_emission']], abs=1e-3
+    )
+
+    column = national_sweep.splitlines()[0].split(',').index('total_emission')
+    national_row, overridden_row = (text.splitlines()[1].split(',') for text in (
+        national_sweep, client.post('/export_sweep', json=params).get_data(as_text=True)))
+    assert float(overridden_row[column]) == pytest.approx(float(national_row[column]) / 2, abs=1e-3)
+
+
+def test_default_falls_back_when_cache_unavailable(tmp_path, client, app_module, monkeypatch):
+    params = {'budget': 87.4, 'target_year': 2050, 'r35': 50, 'r40': 70, 'r45': 85}
+    national = client.post('/calculate', json=params).get_json()
+
+    def unavailable(force=False):
+        raise PermissionError('data/inventory-*.npy')
+
+    monkeypatch.setattr(app_module.inventories, 'refresh', unavailable)
+    assert client.post('/calculate', json=params).get_json() == national
+    assert client.post('/calculate', json={**params, 'region': 'KR'}).get_json() == national
+    assert client.post('/calculate', json={**params, 'region': 'SEOUL'}).status_code == 400
@@ -0,0 +1,76 @@
+import json
+import os
+import time
+
+import pytest
+
+import jobs
+import sweep
+
+SWEEP = {'budget': 87.4, 'target_year': [2045, 2050], 'r35': {'start': 40, 'stop': 60, 'step': 10},
+         'r40': 70, 'r45': 85}
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return jobs.JobQueue(str(tmp_path), workers=1)
+
+
+def wait_done(queue, job_id, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = queue.status(job_id)
+        if status['status'] not in jobs.ACTIVE:
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f'작업이 끝나지 않았습니다: {status}')
+
+
+def test_job_id_is_stable():
+    assert jobs.job_id('export_sweep', {'a': 1, 'b': 2}) == jobs.job_id('export_sweep', {'b': 2, 'a': 1})
+    assert jobs.job_id('export_sweep', {'a': 1}) != jobs.job_id('monte_carlo', {'a': 1})
+
+
+def test_sweep_job_matches_stream(queue):
+    status = queue.submit('export_sweep', SWEEP)
+    assert wait_done(queue, status['id'])['status'] == 'done'
+    with open(queue.result_path(status['id']), encoding='utf-8') as f:
+        assert f.read() == ''.join(sweep.stream(sweep.Grid(SWEEP), 'csv'))
+
+    # 같은 작업을 다시 제출하면 기존 결과를 그대로 반환
+    assert queue.submit('export_sweep', SWEEP)['status'] == 'done'
+
+
+def test_monte_carlo_job(queue):
+    status = queue.submit('monte_carlo', {'samples': 1000, 'seed': 1})
+    assert wait_done(queue, status['id'])['status'] == 'done'
+    with open(queue.result_path(status['id']), encoding='utf-8') as f:
+        assert json.load(f)['samples'] == 1000
+
+
+def test_invalid_job_rejected(queue):
+    with pytest.raises(ValueError):
+        queue.submit('monte_carlo', {'samples': 0})
+    with pytest.raises(ValueError):
+        queue.submit('report', {})
+    assert os.listdir(queue.directory) == []
+
+
+def test_prune_removes_expired_jobs(queue):
+    status = queue.submit('export_sweep', SWEEP)
+    wait_done(queue, status['id'])
+    orphan = os.path.join(queue.directory, f'{"0" * 32}.result.csv')
+    with open(orphan, 'w', encoding='utf-8'):
+        pass
+
+    assert queue.prune() == 0
+    assert queue.result_path(status['id']) is not None and os.path.exists(orphan)
+    os.utime(orphan, (0, 0))
+    assert queue.prune(ttl=-1) == 1
+    assert os.listdir(queue.directory) == []
+
+
+def test_invalid_ids_ignored(queue):
+    assert queue.status('../jobs') is None
+    assert queue.result_path('0' * 32) is None
+    assert queue.cancel('0' * 32) is None
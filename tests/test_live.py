@@ -0,0 +1,132 @@
+import json
+import threading
+
+import pytest
+
+import live
+
+
+def events(stream):
+    """SSE 스트림에서 (이벤트, 데이터)를 차례로 읽음 (keepalive 주석은 건너뜀)"""
+    for message in stream:
+        if message.startswith(':'):
+            continue
+        lines = dict(line.split(': ', 1) for line in message.strip().split('\n'))
+        yield lines['event'], json.loads(lines['data'])
+
+
+def test_series_diff():
+    assert live.series_diff(None, [1, 2]) is None
+    assert live.series_diff([1, 2, 3], [1, 2]) is None
+    assert live.series_diff([1, 2, 3, 4], [1, 2, 3, 5]) == [[3, 5]]
+    assert live.series_diff([1, 2, 3, 4], [1, 0, 0, 4]) is None  # 절반 이상 바뀜
+
+
+def test_latest_params_replace_pending_ones():
+    channels = live.LiveChannels()
+    channel = channels.open()
+    computed = []
+
+    def compute(params):
+        computed.append(params)
+        return {'values': [params, 0, 0, 0]}
+
+    stream = events(channels.stream(channel, compute))
+    assert next(stream) == ('ready', {'channel': channel.id})
+    for value in range(1, 6):
+        channel.update(value)
+    assert next(stream) == ('result', {'values': [5, 0, 0, 0], 'seq': 5})
+    channel.update(6)
+    assert next(stream) == ('result', {'diff': [[0, 6]], 'seq': 6})
+    assert computed == [5, 6]
+
+
+def test_result_dropped_when_newer_params_arrive():
+    channels = live.LiveChannels()
+    channel = channels.open()
+    started, release = threading.Event(), threading.Event()
+
+    def compute(params):
+        if params == 'slow':
+            started.set()
+            release.wait(5)
+        return {'values': [params]}
+
+    def update_during_compute():
+        started.wait(5)
+        channel.update('fast')
+        release.set()
+
+    stream = events(channels.stream(channel, compute))
+    next(stream)
+    channel.update('slow')
+    threading.Thread(target=update_during_compute).start()
+    assert next(stream) == ('result', {'values': ['fast'], 'seq': 2})
+    assert channels.dropped == 1
+
+
+def test_failed_compute_reported():
+    channels = live.LiveChannels()
+    channel = channels.open()
+
+    def compute(params):
+        raise ValueError('bad')
+
+    stream = events(channels.stream(channel, compute))
+    next(stream)
+    channel.update({})
+    assert next(stream) == ('failed', {'seq': 1, 'error': 'bad'})
+
+
+def test_close_ends_stream_and_frees_slot():
+    channels = live.LiveChannels(max_channels=1)
+    channel = channels.open()
+    with pytest.raises(RuntimeError):
+        channels.open()
+
+    stream = channels.stream(channel, lambda params: {'values': []})
+    next(stream)
+    threading.Timer(0.05, channels.close, args=(channel.id,)).start()
+    assert all(message.startswith(':') for message in stream)  # 닫힌 뒤에는 이벤트 없이 끝남
+    assert len(channels) == 0 and channels.get(channel.id) is None
+    channels.open()
+
+
+def test_idle_channel_closed():
+    channels = live.LiveChannels(keepalive=0.01, idle_timeout=0.05)
+    channel = channels.open()
+    messages = list(channels.stream(channel, lambda params: {'values': []}))
+    assert messages[0].startswith('event: ready') and ': keepalive\n\n' in messages
+    assert len(channels) == 0
+
+
+def test_live_routes(app_module, client):
+    params = {'budget': 87.4, 'target_year': 2050, 'r35': 50, 'r40': 70, 'r45': 85}
+    assert client.post('/live/unknown', json=params).status_code == 404
+    channel = app_module.live_channels.open()
+    assert client.post(f'/live/{channel.id}', json=params).get_json() == {'seq': 1}
+    assert client.post(f'/live/{channel.id}', json={'budget': 'x'}).status_code == 400
+    assert client.delete(f'/live/{channel.id}').status_code == 204
+    assert channel.closed
+    assert client.post(f'/live/{channel.id}', json=params).status_code == 404
+
+
+def test_shared_directory_delivers_updates_from_other_workers(tmp_path):
+    owner = live.LiveChannels(directory=str(tmp_path), poll_interval=0.005)
+    other = live.LiveChannels(directory=str(tmp_path), poll_interval=0.005)
+    channel = owner.open()
+    stream = events(owner.stream(channel, lambda params: {'values': [params['r35'], 0, 0, 0]}))
+    next(stream)
+
+    assert other.update(channel.id, {'r35': 50}) is None  # 다른 워커는 파일에만 씀
+    assert next(stream) == ('result', {'values': [50, 0, 0, 0], 'seq': 1})
+    assert owner.update(channel.id, {'r35': 60}) == 2
+    assert next(stream) == ('result', {'diff': [[0, 60]], 'seq': 2})
+    with pytest.raises(KeyError):
+        other.update('0' * 32, {})
+    with pytest.raises(KeyError):
+        other.update('../x', {})
+
+    other.close(channel.id)  # 다른 워커가 받은 DELETE도 채널을 닫음
+    assert list(stream) == []
+    assert len(owner) == 0 and list(tmp_path.iterdir()) == []
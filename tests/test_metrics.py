@@ -0,0 +1,56 @@
+import json
+import os
+import subprocess
+import sys
+
+import metrics
+
+
+def snapshot_file(directory, name, requests):
+    data = {'histograms': {}, 'counters': {'requests_total': [[['/calculate', 'POST', '200'], requests]]},
+            'collected': {}}
+    path = os.path.join(directory, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    return path
+
+
+def test_render_sums_live_workers(tmp_path):
+    current = metrics.Metrics(str(tmp_path))
+    current.increment('requests_total', ('/calculate', 'POST', '200'), 2)
+    snapshot_file(str(tmp_path), f'{os.getppid()}.json', 5)  # 살아 있는 다른 프로세스
+    assert 'netzero_requests_total{endpoint="/calculate",method="POST",status="200"} 7' in current.render()
+
+
+def test_stale_snapshots_accumulated(tmp_path):
+    current = metrics.Metrics(str(tmp_path))
+    current.increment('requests_total', ('/calculate', 'POST', '200'), 2)
+    exited = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'],
+                            capture_output=True, text=True, check=True)
+    dead = snapshot_file(str(tmp_path), f'{exited.stdout.strip()}.json', 5)
+    old = snapshot_file(str(tmp_path), f'{os.getppid()}.json', 3)
+    os.utime(old, (0, 0))  # 저장 주기 여러 번 동안 갱신되지 않음 (재시작 전 워커)
+
+    # 종료된 워커의 값은 누적 파일로 옮겨져 계속 합산되고, 다시 출력해도 두 번 더하지 않음
+    for _ in range(2):
+        assert 'netzero_requests_total{endpoint="/calculate",method="POST",status="200"} 10' in current.render()
+    assert not os.path.exists(dead) and not os.path.exists(old)
+    assert sorted(name for name in os.listdir(tmp_path) if name.endswith('.json')) == sorted(
+        [f'{os.getpid()}.json', metrics.ACCUMULATED]
+    )
+
+
+def test_reused_pid_snapshot_accumulated_before_overwrite(tmp_path):
+    snapshot_file(str(tmp_path), f'{os.getpid()}.json', 4)  # 같은 PID를 쓰던 이전 워커
+    current = metrics.Metrics(str(tmp_path))
+    current.increment('requests_total', ('/calculate', 'POST', '200'), 1)
+    assert 'netzero_requests_total{endpoint="/calculate",method="POST",status="200"} 5' in current.render()
+
+
+def test_request_hooks(client):
+    response = client.post('/calculate', json={'budget': 87.4, 'target_year': 2050, 'r35': 50, 'r40': 70, 'r45': 85})
+    stages = [item.split(';')[0] for item in response.headers['Server-Timing'].split(', ')]
+    assert stages == ['cache', 'compute', 'chart', 'serialize', 'total']
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'netzero_requests_total{endpoint="/calculate",method="POST",status="200"}' in text
+    assert 'netzero_stage_duration_seconds_count{endpoint="/calculate",stage="compute"}' in text
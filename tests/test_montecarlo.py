@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+import engine
+import montecarlo
+
+
+def test_fixed_inputs_give_deterministic_bands():
+    result = montecarlo.run({}, samples=1000, seed=1)
+    expected = engine.calculate_batch(**{key: montecarlo.DEFAULTS[key] for key in engine.PARAM_KEYS})
+
+    for j in range(len(result['percentiles'])):
+        assert np.allclose(result['bands'][:, j], expected['pathways'][0], rtol=0, atol=1e-9)
+    assert result['total_emission_mean'] == pytest.approx(expected['total_emission'][0])
+    assert np.allclose(result['total_emission_percentiles'], expected['total_emission'][0])
+    assert result['probability_within_budget'] == float(expected['over_emission'][0] == 0)
+
+
+def test_probability_is_exact_count(monkeypatch):
+    monkeypatch.setattr(montecarlo, 'CHUNK_SIZE', 700)  # 여러 청크로 나누어 합산
+    specs = {'budget': {'type': 'uniform', 'low': 60, 'high': 120},
+             'r35': {'type': 'normal', 'mean': 50, 'std': 10}}
+    result = montecarlo.run(specs, samples=5000, seed=7)
+
+    # 같은 시드 순서로 표본을 다시 뽑아 직접 셈
+    specs = {key: specs.get(key, montecarlo.DEFAULTS[key]) for key in montecarlo.PARAMS}
+    within = 0
+    for size, seed in zip([700] * 7 + [100], np.random.SeedSequence(7).spawn(8)):
+        draws = montecarlo._draw(specs, size, np.random.default_rng(seed))
+        total = engine.calculate_batch(0.0, draws['target_year'], draws['r35'], draws['r40'],
+                                       draws['r45'])['total_emission']
+        within += int((total <= draws['budget']).sum())
+    assert result['probability_within_budget'] == within / 5000
+
+
+def test_percentiles_close_to_exact(monkeypatch):
+    monkeypatch.setattr(montecarlo, 'CHUNK_SIZE', 2500)
+    specs = {'r40': {'type': 'triangular', 'low': 40, 'mode': 70, 'high': 90},
+             'target_year': {'type': 'choice', 'values': [2045, 2050]}}
+    result = montecarlo.run(specs, samples=10_000, seed=3, percentiles=[10, 50, 90])
+
+    specs = {key: specs.get(key, montecarlo.DEFAULTS[key]) for key in montecarlo.PARAMS}
+    totals = []
+    for seed in np.random.SeedSequence(3).spawn(4):
+        draws = montecarlo._draw(specs, 2500, np.random.default_rng(seed))
+        totals.append(engine.calculate_batch(0.0, draws['target_year'], draws['r35'], draws['r40'],
+                                             draws['r45'])['total_emission'])
+    exact = np.percentile(np.concatenate(totals), [10, 50, 90])
+    bin_width = montecarlo.TOTAL_MAX / montecarlo.TOTAL_BINS
+    assert np.all(np.abs(result['total_emission_percentiles'] - exact) <= 2 * bin_width)
+
+
+def test_process_pool_matches_serial(monkeypatch):
+    monkeypatch.setattr(montecarlo, 'CHUNK_SIZE', 1000)
+    specs = {'r45': {'type': 'uniform', 'low': 70, 'high': 100}}
+    serial = montecarlo.run(specs, samples=4000, seed=11)
+    parallel = montecarlo.run(specs, samples=4000, seed=11, workers=2)
+    assert np.array_equal(serial['bands'], parallel['bands'])
+    assert serial['probability_within_budget'] == parallel['probability_within_budget']
+
+
+def test_route_reuses_server_pool(app_module, client, monkeypatch):
+    monkeypatch.setattr(montecarlo, 'CHUNK_SIZE', 1000)
+    monkeypatch.setattr(app_module, 'simulation_pool', montecarlo.SimulationPool(2))
+    body = {'r45': {'type': 'uniform', 'low': 70, 'high': 100}, 'samples': 4000, 'seed': 11}
+    serial = montecarlo.summarize(montecarlo.run({'r45': body['r45']}, samples=4000, seed=11))
+
+    first = client.post('/monte_carlo', json={**body, 'workers': 64}).get_json()
+    pool = app_module.simulation_pool._pool
+    assert pool is not None and pool._max_workers == app_module.simulation_pool.workers
+    assert client.post('/monte_carlo', json=body).get_json() == first == serial
+    assert app_module.simulation_pool._pool is pool  # 요청마다 풀을 새로 만들지 않음
+    pool.shutdown()
+
+
+def test_invalid_specs_rejected():
+    with pytest.raises(ValueError):
+        montecarlo.run({'r35': {'type': 'lognormal'}}, samples=10)
+    with pytest.raises(ValueError):
+        montecarlo.run({'unknown': 1}, samples=10)
+    with pytest.raises(ValueError):
+        montecarlo.run({}, samples=montecarlo.MAX_SAMPLES + 1)
+
+
+def test_route_rejects_bad_input(client):
+    assert client.post('/monte_carlo', json={'samples': 0}).status_code == 400
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+import engine
+import pareto
+
+
+def brute_force_front(objectives):
+    """O(n²) 비지배 해 (값이 같은 해는 첫 번째만)"""
+    points = np.round(objectives, pareto.PRECISION)
+    mask = np.ones(len(points), dtype=bool)
+    for i, point in enumerate(points):
+        dominated = np.all(points <= point, axis=1) & np.any(points < point, axis=1)
+        duplicate_before = np.all(points[:i] == point, axis=1)
+        mask[i] = not dominated.any() and not duplicate_before.any()
+    return mask
+
+
+@pytest.mark.parametrize('dimensions', [2, 3])
+def test_mask_matches_brute_force(rng, dimensions):
+    for _ in range(20):
+        # 격자 값처럼 같은 값이 자주 나오도록 정수 목적값 사용
+        objectives = rng.integers(0, 12, (300, dimensions)).astype(float)
+        mask = pareto.pareto_mask(*objectives.T)
+        expected = brute_force_front(objectives)
+        # 값이 같은 해 중 어느 것을 남기는지는 정하지 않으므로 남은 점의 집합으로 비교
+        assert len(mask) == len(expected) and mask.sum() == expected.sum()
+        assert {tuple(p) for p in objectives[mask]} == {tuple(p) for p in objectives[expected]}
+
+
+@pytest.mark.parametrize('early_effort', [False, True])
+def test_front_is_non_dominated_and_matches_engine(early_effort):
+    result = pareto.pareto_front(87.4, step=10, early_effort=early_effort)
+    keys = pareto.OBJECTIVES if early_effort else pareto.OBJECTIVES[:2]
+    points = np.stack([result[key] for key in keys], axis=1)
+    assert brute_force_front(points).all()
+
+    expected = engine.calculate_batch(87.4, result['target_year'], result['r35'], result['r40'], result['r45'])
+    assert np.array_equal(result['total_emission'], expected['total_emission'])
+    assert np.array_equal(result['over_emission'], expected['over_emission'])
+
+
+def test_front_dominates_every_candidate():
+    result = pareto.pareto_front(87.4, step=20, year_min=2045, year_max=2050)
+    front = np.round(np.stack([result['over_emission'], result['max_reduction']], axis=1), pareto.PRECISION)
+    grid = pareto.rate_grid(20)
+    for target_year in range(2045, 2051):
+        objectives = pareto.evaluate(87.4, target_year, grid)
+        candidates = np.round(np.stack([objectives['over_emission'], objectives['max_reduction']], axis=1),
+                              pareto.PRECISION)
+        covered = np.all(front[None, :, :] <= candidates[:, None, :], axis=2).any(axis=1)
+        assert covered.all()
+
+
+def test_max_reduction_includes_drop_to_zero():
+    # 2045년 목표 + r45=50: 2045년 값은 0, 2044→2045 구간에 큰 감축
+    objectives = pareto.evaluate(1000.0, 2045, np.array([[50.0, 50.0, 50.0]]))
+    pathway = engine.calculate_batch(1000.0, 2045, 50, 50, 50)['pathways'][0]
+    drops = -np.diff(np.append(pathway[engine.SCENARIO_START_YEAR - engine.START_YEAR:], 0.0))
+    assert objectives['max_reduction'][0] == pytest.approx(drops.max() / engine.BASE_EMISSION * 100)
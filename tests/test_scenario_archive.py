@@ -0,0 +1,41 @@
+import io
+import json
+
+import pytest
+
+import scenario_archive
+
+SETTINGS = {'budget': 87.4, 'target_year': 2050, 'r35': 50, 'r40': 70, 'r45': 85}
+
+
+@pytest.mark.parametrize('fmt', ['zip', 'tar', 'ndjson'])
+def test_export_import_round_trip(client, fmt):
+    for i, r35 in enumerate([40, 50, 60]):
+        client.post('/save_scenario', json={'scenario': {**SETTINGS, 'r35': r35}, 'name': f'시나리오 {i + 1}'})
+    exported = client.get(f'/export_scenarios?format={fmt}')
+    assert exported.status_code == 200 and exported.headers['X-Total-Count'] == '3'
+    body = exported.get_data()
+
+    # 같은 내용을 다시 가져오면 모두 중복으로 건너뜀
+    result = client.post(f'/import_scenarios?format={fmt}', data=body).get_json()
+    assert result == {'success': True, 'imported': 0, 'duplicates': 3, 'failed': 0, 'errors': []}
+
+    for item in client.get('/load_scenarios').get_json():
+        client.delete(f"/delete_scenario/{item['filename']}")
+    result = client.post('/import_scenarios', data={'file': (io.BytesIO(body), 'backup.' + scenario_archive.FORMATS[fmt][1])}).get_json()
+    assert result['imported'] == 3
+    listed = client.get('/load_scenarios').get_json()
+    assert sorted(item['name'] for item in listed) == ['시나리오 1', '시나리오 2', '시나리오 3']
+
+
+def test_invalid_entries_reported(client):
+    lines = [
+        json.dumps({'name': '정상', 'settings': SETTINGS}),
+        json.dumps({'name': '설정 누락'}),
+        json.dumps({'name': '문자 예산', 'settings': {**SETTINGS, 'budget': 'x'}}),
+        '{',
+    ]
+    result = client.post('/import_scenarios?format=ndjson', data='\n'.join(lines).encode('utf-8')).get_json()
+    assert result['imported'] == 1 and result['failed'] == 3 and len(result['errors']) == 3
+    assert client.post('/import_scenarios?format=rar', data=b'').status_code == 400
+    assert client.get('/export_scenarios?format=rar').status_code == 400
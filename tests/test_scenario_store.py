@@ -0,0 +1,172 @@
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import montecarlo
+import scenario_store
+
+SETTINGS = {'budget': 87.4, 'target_year': 2050, 'r35': 50, 'r40': 70, 'r45': 85}
+
+
+def test_legacy_files_and_index_sync(tmp_path):
+    legacy = {'name': '시나리오 7', 'created_at': '2024-01-01T00:00:00', 'settings': SETTINGS}
+    (tmp_path / 'scenario_legacy.json').write_text(json.dumps(legacy, ensure_ascii=False), encoding='utf-8')
+    store = scenario_store.ScenarioStore(str(tmp_path))
+    store.sync()
+    assert store.load('scenario_legacy.json')['settings'] == SETTINGS
+    assert store.next_name_number() == 8
+
+    os.remove(tmp_path / 'scenario_legacy.json')
+    store.sync()
+    assert store.count() == 0
+
+
+@pytest.mark.parametrize('filename', ['../app.py', 'a.txt'])
+def test_paths_outside_directory_rejected(tmp_path, filename):
+    store = scenario_store.ScenarioStore(str(tmp_path))
+    with pytest.raises(ValueError):
+        store.load(filename)
+    with pytest.raises(ValueError):
+        store.delete(filename)
+
+
+def test_scenario_routes(client):
+    saved = client.post('/save_scenario', json={'scenario': SETTINGS, 'name': ''}).get_json()
+    assert saved['success'] and saved['name'] == '시나리오 1'
+    assert client.get('/get_next_scenario_name').get_json() == {'next_name': '시나리오 2'}
+
+    listed = client.get('/load_scenarios').get_json()
+    assert [item['filename'] for item in listed] == [saved['filename']]
+    assert client.get(f"/load_scenario/{saved['filename']}").get_json()['data']['settings'] == SETTINGS
+
+    assert client.delete(f"/delete_scenario/{saved['filename']}").get_json()['success']
+    assert not client.delete(f"/delete_scenario/{saved['filename']}").get_json()['success']
+    assert client.get('/load_scenarios').get_json() == []
+
+
+def run_threads(count, target):
+    """count개 스레드에서 target(i)를 동시에 실행하고 결과 목록 반환"""
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def run(i):
+        barrier.wait()
+        results[i] = target(i)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def save_in_process(directory, name, settings):
+    return scenario_store.ScenarioStore(directory).save(name, settings)[::2]
+
+
+def scenario_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith('.json'))
+
+
+def test_concurrent_identical_saves_create_one_file(tmp_path):
+    directory = str(tmp_path)
+    # 워커마다 따로 만든 저장소처럼 스레드마다 다른 인스턴스 사용
+    results = run_threads(16, lambda i: scenario_store.ScenarioStore(directory).save('시나리오 1', SETTINGS))
+
+    assert len({filename for filename, _, _ in results}) == 1
+    assert sum(created for _, _, created in results) == 1
+    assert len(scenario_files(directory)) == 1
+    assert len(os.listdir(tmp_path / 'objects')) == 1
+    assert not [name for name in os.listdir(directory) if name.endswith('.tmp')]
+    assert scenario_store.ScenarioStore(directory).count() == 1
+
+
+def test_concurrent_saves_from_processes(tmp_path):
+    directory = str(tmp_path)
+    names = [f'시나리오 {i % 4}' for i in range(12)]
+    settings = [{**SETTINGS, 'r35': 50 + i % 2} for i in range(12)]
+    context = multiprocessing.get_context(montecarlo.START_METHOD)
+    with ProcessPoolExecutor(max_workers=4, mp_context=context) as pool:
+        results = list(pool.map(save_in_process, [directory] * 12, names, settings))
+
+    # 이름·설정 조합은 4가지 (i % 4가 같으면 i % 2도 같음), 설정은 2가지
+    assert len({filename for filename, _ in results}) == 4
+    assert sum(created for _, created in results) == 4
+    assert len(scenario_files(directory)) == 4
+    assert len(os.listdir(tmp_path / 'objects')) == 2
+    store = scenario_store.ScenarioStore(directory)
+    store.sync()
+    assert store.count() == 4
+    for filename, _ in results:
+        assert store.load(filename)['settings']['r35'] in (50, 51)
+
+
+def test_same_settings_stored_once(tmp_path):
+    store = scenario_store.ScenarioStore(str(tmp_path))
+    first, _, _ = store.save('A', SETTINGS)
+    second, data, created = store.save('B', {**SETTINGS, 'r35': 50.0, 'budget': 87.4})
+    assert created and first != second
+    assert len(os.listdir(tmp_path / 'objects')) == 1
+    assert store.load(second)['settings'] == SETTINGS  # 처음 저장한 설정을 공유
+
+    filename, data, created = store.save('A', {**SETTINGS, 'target_year': 2050.0})
+    assert filename == first and not created
+
+
+def test_delete_removes_unreferenced_settings(tmp_path):
+    store = scenario_store.ScenarioStore(str(tmp_path))
+    first, _, _ = store.save('A', SETTINGS)
+    second, _, _ = store.save('B', SETTINGS)
+    object_path = os.path.join(store.objects_dir, os.listdir(store.objects_dir)[0])
+    os.utime(object_path, (0, 0))  # 저장 중인 설정으로 보지 않도록 오래된 파일로 만듦
+
+    assert store.delete(first)
+    assert os.path.exists(object_path)  # B가 아직 가리킴
+    assert store.delete(second)
+    assert not os.path.exists(object_path)
+    assert store.count() == 0 and scenario_files(tmp_path) == []
+    assert not store.delete(second)
+
+
+def test_delete_uses_index_without_rescanning(tmp_path, monkeypatch):
+    store = scenario_store.ScenarioStore(str(tmp_path))
+    filename, _, _ = store.save('A', SETTINGS)
+    monkeypatch.setattr(store, 'sync', lambda: pytest.fail('delete()가 디렉토리 전체를 다시 읽음'))
+    assert store.delete(filename)
+
+
+def test_filenames_outside_v2_pattern(tmp_path):
+    store = scenario_store.ScenarioStore(str(tmp_path))
+    v2_store = scenario_store.ScenarioStore(str(tmp_path), pattern='scenario_*.json')
+    for name in ('scenario 1', '!!!'):  # 'scenario_' 또는 기본 파일명 'scenario'로 시작하는 이름
+        filename, _, _ = store.save(name, SETTINGS)
+        assert filename.startswith(scenario_store.DEFAULT_PREFIX)
+    v2_filename, _, _ = store.save('시나리오 1', SETTINGS, prefix='scenario_')
+    assert [item['filename'] for item in v2_store.list_scenarios()] == [v2_filename]
+    assert store.count() == 3
+
+
+def test_delete_keeps_recent_settings(tmp_path):
+    store = scenario_store.ScenarioStore(str(tmp_path))
+    filename, _, _ = store.save('A', SETTINGS)
+    assert store.delete(filename)
+    assert len(os.listdir(store.objects_dir)) == 1
+    assert store.prune_objects(min_age=0) == 1
+
+
+def test_path_into_objects_rejected(tmp_path):
+    store = scenario_store.ScenarioStore(str(tmp_path))
+    with pytest.raises(ValueError):
+        store.load('objects/x.json')
+
+
+def test_save_route_reports_duplicate(client):
+    saved = client.post('/save_scenario', json={'scenario': SETTINGS, 'name': '기준'}).get_json()
+    assert not saved['duplicate']
+    duplicate = client.post('/save_scenario', json={'scenario': SETTINGS, 'name': '기준'}).get_json()
+    assert duplicate['duplicate'] and duplicate['filename'] == saved['filename']
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+import engine
+import sectors
+
+
+def test_fixed_years_sum_to_national_total():
+    result = sectors.calculate(87.4, 2050)
+    fixed = len(engine.FIXED_VALUES)
+    assert np.allclose(result['pathways'][:, 0, :fixed].sum(axis=0), engine.FIXED_VALUES, rtol=0, atol=1e-12)
+    assert result['pathways'][:, 0, fixed].sum() == pytest.approx(engine.FIXED_DATA[2030], abs=1e-12)
+
+
+def test_same_settings_in_every_sector_reproduce_national_pathway(rng):
+    n = 20
+    budget, target_year = rng.uniform(0, 200, n), rng.integers(2040, 2051, n)
+    r35, r40, r45 = (rng.uniform(0, 100, n) for _ in range(3))
+    overrides = {key: {'milestones': {2035: r35, 2040: r40, 2045: r45}} for key in sectors.SECTOR_KEYS}
+    result = sectors.calculate(budget, target_year, overrides)
+
+    # 보간이 기준연도 값에 대해 선형이므로 부문 합계가 국가 경로와 같음
+    expected = engine.calculate_batch(budget, target_year, r35, r40, r45)
+    assert np.allclose(result['national']['pathway'], expected['pathways'], rtol=0, atol=1e-9)
+    assert np.allclose(result['national']['total_emission'], expected['total_emission'], rtol=0, atol=1e-9)
+
+
+def test_sector_totals_and_budgets(rng):
+    result = sectors.calculate(87.4, 2050, {'power': {'target_year': 2045, 'budget': 10.0, 'shapes': 'spline'}})
+    assert np.allclose(result['total_emission'].sum(axis=0), result['national']['total_emission'])
+    assert result['target_year'][0, 0] == 2045
+    assert result['budget'][0, 0] == 10.0
+    assert result['budget'][1, 0] == pytest.approx(87.4 * sectors.SHARE_2018[1])
+    assert np.array_equal(result['over_emission'], np.maximum(0, result['total_emission'] - result['budget']))
+    power_after_target = result['pathways'][0, 0, 2046 - engine.START_YEAR:]
+    assert not power_after_target.any()
+
+
+def test_unknown_sector_rejected():
+    with pytest.raises(ValueError):
+        sectors.calculate(87.4, 2050, {'shipping': {}})
+    with pytest.raises(ValueError):
+        sectors.calculate(87.4, 2050, {'power': {'r35': 50}})
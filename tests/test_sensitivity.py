@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+import engine
+import sensitivity
+
+
+@pytest.fixture
+def base(rng):
+    n = 300
+    return (rng.uniform(0, 200, n), rng.integers(2040, 2051, n),
+            rng.uniform(0, 100, n), rng.uniform(0, 100, n), rng.uniform(0, 100, n))
+
+
+def engine_total(target_year, r35, r40, r45):
+    return engine.calculate_batch(0.0, target_year, r35, r40, r45)['total_emission']
+
+
+def test_total_matches_engine(base):
+    _, target_year, r35, r40, r45 = base
+    result = sensitivity.sensitivity(*base)
+    assert np.abs(result['total_emission'] - engine_total(target_year, r35, r40, r45)).max() <= 1e-12
+
+
+def test_rate_swings_and_derivatives_match_engine(base):
+    budget, target_year, r35, r40, r45 = base
+    result = sensitivity.sensitivity(*base, rate_delta=7.5)
+    rates = {'r35': r35, 'r40': r40, 'r45': r45}
+
+    for key in ('r35', 'r40', 'r45'):
+        parameter = result['parameters'][key]
+        for end in ('low', 'high'):
+            moved = {**rates, key: parameter[end]}
+            expected = engine_total(target_year, moved['r35'], moved['r40'], moved['r45'])
+            assert np.abs(parameter['total_emission'][end] - expected).max() <= 1e-12
+
+        # 누적 배출량이 감축률에 대해 선형이므로 1%p 차분이 편미분과 같음
+        step = {**rates, key: rates[key] + 1}
+        difference = engine_total(target_year, step['r35'], step['r40'], step['r45']) - result['total_emission']
+        assert np.abs(parameter['derivative']['total_emission'] - difference).max() <= 1e-12
+
+
+def test_target_year_swing_matches_engine(base):
+    budget, target_year, r35, r40, r45 = base
+    result = sensitivity.sensitivity(*base, year_delta=3)
+    parameter = result['parameters']['target_year']
+
+    assert np.all(parameter['low'] >= 2040) and np.all(parameter['high'] <= 2050)
+    for end in ('low', 'high'):
+        expected = engine_total(parameter[end], r35, r40, r45)
+        assert np.abs(parameter['total_emission'][end] - expected).max() <= 1e-12
+    later = engine_total(target_year + 1, r35, r40, r45)
+    assert np.abs(parameter['derivative']['total_emission'] - (later - result['total_emission'])).max() <= 1e-12
+
+
+def test_rate_at_target_year_has_no_effect():
+    result = sensitivity.sensitivity(87.4, 2045, 50, 70, 85)
+    assert result['parameters']['r45']['derivative']['total_emission'][0] == 0.0
+
+
+def test_negative_range_rejected():
+    with pytest.raises(ValueError):
+        sensitivity.sensitivity(87.4, 2050, 50, 70, 85, rate_delta=-1)
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+import engine
+import solver
+
+
+@pytest.mark.parametrize('solve_for', solver.RATE_KEYS)
+def test_solved_rate_meets_budget(rng, solve_for):
+    n = 200
+    target_year = rng.integers(2046, 2051, n)
+    rates = {key: rng.uniform(0, 100, n) for key in solver.RATE_KEYS}
+    # 해가 0-100% 안에 있도록 감축률 0%와 100%일 때의 누적 배출량 사이에서 예산을 고름
+    high, low = (engine.calculate_batch(0.0, target_year, **{**rates, solve_for: r})['total_emission']
+                 for r in (0.0, 100.0))
+    budget = low + rng.uniform(0, 1, n) * (high - low)
+
+    result = solver.solve(budget, target_year, *rates.values(), solve_for=solve_for)
+    solved = engine.calculate_batch(budget, target_year, **{**rates, solve_for: result['value']})
+    assert np.allclose(solved['total_emission'], budget, rtol=0, atol=1e-9)
+    assert result['feasible'].all()
+
+
+def test_rate_clipped_when_budget_unreachable():
+    result = solver.solve(0.0, 2050, 50, 70, 85, solve_for='r35')
+    assert result['value'][0] == 100.0
+    assert not result['feasible'][0]
+
+
+def test_target_year_is_latest_within_budget(rng):
+    n = 200
+    budget = rng.uniform(60, 120, n)
+    r35, r40, r45 = (rng.uniform(0, 100, n) for _ in range(3))
+    result = solver.solve(budget, None, r35, r40, r45, solve_for='target_year')
+
+    year = result['value']
+    totals = {y: engine.calculate_batch(budget, y, r35, r40, r45)['total_emission'] for y in range(2040, 2051)}
+    table = np.stack([totals[y] for y in range(2040, 2051)], axis=1)
+    within = table <= budget[:, None]
+    for i in range(n):
+        if within[i].any():
+            assert year[i] == 2040 + np.flatnonzero(within[i]).max()
+        else:
+            assert table[i, year[i] - 2040] == table[i].min()
+
+
+def test_cumulative_weights_are_linear_in_targets(rng):
+    target_year = rng.integers(2031, 2051, 100)
+    r35, r40, r45 = rng.uniform(0, 100, (3, 100))
+    weights = engine.cumulative_weights(target_year)
+    targets = np.hstack(engine.milestone_values(target_year, r35, r40, r45))
+    total = engine.FIXED_CUMULATIVE + (weights * targets).sum(axis=1)
+    expected = engine.calculate_batch(0.0, target_year, r35, r40, r45)['total_emission']
+    assert np.allclose(total, expected, rtol=0, atol=1e-12)
+
+
+def test_unknown_parameter_rejected():
+    with pytest.raises(ValueError):
+        solver.solve(87.4, 2050, 50, 70, 85, solve_for='budget')
+
+
+def test_solve_route_rejects_bad_input(client):
+    params = {'budget': 87.4, 'target_year': 2050, 'r35': 50, 'r40': 70, 'r45': 85}
+    assert client.post('/solve', json={**params, 'solve_for': 'budget'}).status_code == 400
@@ -0,0 +1,86 @@
+import csv
+import gzip
+import io
+import json
+
+import numpy as np
+import pytest
+
+import engine
+import sweep
+
+SPEC = {
+    'budget': [87.4, 100.123456789],
+    'target_year': {'start': 2045, 'stop': 2050, 'step': 5},
+    'r35': {'start': 40, 'stop': 40.3, 'step': 0.1},
+    'r40': 70,
+    'r45': [85, 1 / 3],
+}
+
+
+def test_axis_ranges_include_stop():
+    assert sweep.grid_axis('r35', {'start': 0, 'stop': 1, 'step': 0.25}).tolist() == [0, 0.25, 0.5, 0.75, 1]
+    assert sweep.grid_axis('target_year', {'start': 2040, 'stop': 2050, 'step': 5}).tolist() == [2040, 2045, 2050]
+    with pytest.raises(ValueError):
+        sweep.grid_axis('r35', {'start': 0, 'stop': 1, 'step': 0})
+    with pytest.raises(ValueError):
+        sweep.grid_axis('r35', [])
+
+
+def test_csv_rows_round_trip_parameters(monkeypatch):
+    monkeypatch.setattr(sweep, 'CHUNK_SIZE', 5)  # 여러 청크
+    grid = sweep.Grid(SPEC)
+    rows = list(csv.DictReader(io.StringIO(''.join(sweep.stream(grid, 'csv', precision=6)))))
+    assert len(rows) == grid.size == 2 * 2 * 4 * 1 * 2
+
+    params = {key: np.array([float(row[key]) for row in rows]) for key in engine.PARAM_KEYS}
+    expected = np.array(np.meshgrid(*grid.axes.values(), indexing='ij')).reshape(5, -1)
+    for k, key in enumerate(engine.PARAM_KEYS):
+        assert np.array_equal(params[key], expected[k])  # 입력 값 그대로 (최단 표현)
+
+    result = engine.calculate_batch(**params)
+    assert np.allclose([float(row['total_emission']) for row in rows], result['total_emission'], rtol=0, atol=5e-7)
+    assert [row['r40'] for row in rows[:2]] == ['70', '70']
+    year_columns = [str(year) for year in grid.years]
+    assert np.allclose([[float(row[c]) for c in year_columns] for row in rows], result['pathways'], rtol=0, atol=5e-7)
+
+
+def test_ndjson_matches_csv():
+    grid = sweep.Grid(SPEC)
+    lines = ''.join(sweep.stream(grid, 'ndjson')).splitlines()
+    rows = list(csv.DictReader(io.StringIO(''.join(sweep.stream(grid, 'csv')))))
+    assert len(lines) == len(rows)
+    for line, row in zip(lines, rows):
+        item = json.loads(line)
+        assert item['total_emission'] == float(row['total_emission'])
+        assert len(item['values']) == engine.pathway_length(item['target_year'])
+
+
+def test_gzip_stream_decompresses_to_same_text():
+    grid = sweep.Grid(SPEC)
+    text = ''.join(sweep.stream(grid, 'csv'))
+    assert gzip.decompress(b''.join(sweep.gzip_stream(sweep.stream(grid, 'csv')))).decode('utf-8') == text
+
+
+def test_format_param():
+    assert sweep.format_param(2050) == '2050'
+    assert sweep.format_param(50.0) == '50'
+    assert float(sweep.format_param(0.1 + 0.2)) == 0.1 + 0.2
+
+
+def test_grid_size_limit(monkeypatch):
+    monkeypatch.setattr(sweep, 'MAX_ROWS', 10)
+    with pytest.raises(ValueError):
+        sweep.Grid(SPEC)
+
+
+def test_export_sweep_route(client):
+    spec = {'budget': 87.4, 'target_year': [2045, 2050], 'r35': 50, 'r40': 70, 'r45': [80, 85]}
+    response = client.post('/export_sweep', json={**spec, 'gzip': True})
+    assert response.headers['X-Total-Count'] == '4'
+    lines = gzip.decompress(response.get_data()).decode('utf-8').splitlines()
+    assert len(lines) == 5
+    totals = [float(line.split(',')[5]) for line in lines[1:]]
+    expected = engine.calculate_batch(87.4, [2045, 2045, 2050, 2050], 50, 70, [80, 85, 80, 85])['total_emission']
+    assert np.allclose(totals, expected, rtol=0, atol=5e-4)
+    assert client.post('/export_sweep', json={**spec, 'format': 'xml'}).status_code == 400